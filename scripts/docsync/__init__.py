@@ -0,0 +1,15 @@
+"""Parallel documentation sync engine for agent-docs."""
+
+from .config import ConfigError, Project, SyncSettings, VersionSpec, load_config
+from .engine import SyncResult, sync_all, sync_project
+
+__all__ = [
+    "ConfigError",
+    "Project",
+    "SyncResult",
+    "SyncSettings",
+    "VersionSpec",
+    "load_config",
+    "sync_all",
+    "sync_project",
+]
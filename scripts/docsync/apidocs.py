@@ -0,0 +1,506 @@
+"""Render mkdocstrings ``::: identifier`` stubs into static API reference text.
+
+Pydantic's ``docs/api`` pages and the OpenAI Agents SDK's ``docs/ref``
+pages are mostly bare directives such as::
+
+    ::: pydantic.fields
+        options:
+          members:
+            - Field
+
+which only gain content when mkdocs imports the package during a site
+build. The ``mkdocstrings`` hook parses the upstream sources with
+:mod:`ast` instead, never importing them, and replaces each directive with
+the signatures and docstrings of the documented objects. The ``members``,
+``filters``, ``show_root_heading`` and ``heading_level`` options are
+honored, and re-exports are followed through ``import`` statements
+(including those under ``if TYPE_CHECKING:``).
+
+Options: ``source_roots``, the repository directories holding the packages
+(default ``["."]``, ``["src"]`` for a src layout). Directives naming
+packages that are not in the repository, e.g. ``pydantic_core``, are left
+as they are. Parsed modules are cached by blob id, so a sync only fetches
+and parses the modules that changed upstream.
+"""
+
+from __future__ import annotations
+
+import ast
+import json
+import logging
+import posixpath
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from .hooks import HookContext, hook
+from .reconcile import write_text_atomic
+
+log = logging.getLogger("docsync")
+
+# Bump when the parsed model changes, so cached modules are not reused.
+VERSION = 1
+
+_DIRECTIVE_RE = re.compile(r"^(?P<indent>[ \t]*):::[ \t]+(?P<ident>[\w.]+)[ \t]*$")
+_FENCE_RE = re.compile(r"^[ \t]*(`{3,}|~{3,})")
+# Private and dunder names are hidden unless a `members` list names them.
+_DEFAULT_FILTERS = ["!^_"]
+_PROPERTIES = {"property", "cached_property", "functools.cached_property"}
+_WIDTH = 88
+
+
+@dataclass
+class Doc:
+    """A documented object: a module, class, function, property or attribute."""
+
+    kind: str
+    name: str
+    signature: str = ""
+    doc: str = ""
+    members: dict[str, Doc] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Doc:
+        members = {k: cls.from_dict(v) for k, v in data.pop("members").items()}
+        return cls(**data, members=members)
+
+
+@dataclass
+class Module:
+    """What one source file defines and imports.
+
+    Imports are kept relative (``[level, dotted]``) so the parse of a blob
+    does not depend on where the file lives.
+    """
+
+    doc: Doc
+    imports: dict[str, tuple[int, str]]
+    star: list[tuple[int, str]]
+    exports: list[str] | None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Module:
+        return cls(
+            Doc.from_dict(data["doc"]),
+            {k: (v[0], v[1]) for k, v in data["imports"].items()},
+            [(level, name) for level, name in data["star"]],
+            data["exports"],
+        )
+
+
+def _short(node: ast.AST, limit: int = 120) -> str:
+    text = ast.unparse(node)
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+def _params(args: ast.arguments) -> list[str]:
+    def fmt(arg: ast.arg, default: ast.expr | None = None) -> str:
+        text = arg.arg
+        if arg.annotation is not None:
+            text += f": {ast.unparse(arg.annotation)}"
+        if default is not None:
+            sep = " = " if arg.annotation is not None else "="
+            text += sep + _short(default, 60)
+        return text
+
+    positional = [*args.posonlyargs, *args.args]
+    defaults: list[ast.expr | None] = [None] * (len(positional) - len(args.defaults))
+    defaults += args.defaults
+    out = [fmt(arg, default) for arg, default in zip(positional, defaults)]
+    if args.posonlyargs:
+        out.insert(len(args.posonlyargs), "/")
+    if args.vararg is not None:
+        out.append("*" + fmt(args.vararg))
+    elif args.kwonlyargs:
+        out.append("*")
+    out += [fmt(arg, default) for arg, default in zip(args.kwonlyargs, args.kw_defaults)]
+    if args.kwarg is not None:
+        out.append("**" + fmt(args.kwarg))
+    return out
+
+
+def _call(head: str, params: list[str], tail: str = "") -> str:
+    """``head(params)tail`` on one line, or one parameter per line if too wide."""
+    line = f"{head}({', '.join(params)}){tail}"
+    if len(line) <= _WIDTH or not params:
+        return line
+    return "\n".join([f"{head}(", *(f"    {p}," for p in params), f"){tail}"])
+
+
+def _function(node: ast.FunctionDef | ast.AsyncFunctionDef) -> Doc:
+    decorators = [ast.unparse(d) for d in node.decorator_list]
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ""
+    signature = _call(f"{prefix} {node.name}", _params(node.args), returns)
+    kind = "property" if _PROPERTIES.intersection(decorators) else "function"
+    lines = [f"@{d}" for d in decorators if d != "overload"] + [signature]
+    return Doc(kind, node.name, "\n".join(lines), ast.get_docstring(node) or "")
+
+
+def _class(node: ast.ClassDef) -> Doc:
+    bases = [ast.unparse(b) for b in node.bases]
+    bases += [ast.unparse(k) for k in node.keywords]
+    head = _call(f"class {node.name}", bases) if bases else f"class {node.name}"
+    lines = [f"@{ast.unparse(d)}" for d in node.decorator_list] + [head]
+    doc = Doc("class", node.name, "\n".join(lines), ast.get_docstring(node) or "")
+    doc.members = _members(node.body)
+    return doc
+
+
+def _attribute_doc(body: list[ast.stmt], index: int) -> str:
+    """The string literal following an assignment, mkdocstrings' attribute docstring."""
+    if index + 1 < len(body):
+        nxt = body[index + 1]
+        if isinstance(nxt, ast.Expr) and isinstance(nxt.value, ast.Constant):
+            if isinstance(nxt.value.value, str):
+                return ast.get_docstring(ast.Module([nxt], []), clean=True) or ""
+    return ""
+
+
+def _members(body: list[ast.stmt]) -> dict[str, Doc]:
+    out: dict[str, Doc] = {}
+    for index, node in enumerate(body):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            out[node.name] = _function(node)
+        elif isinstance(node, ast.ClassDef):
+            out[node.name] = _class(node)
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+            name = node.target.id
+            signature = f"{name}: {ast.unparse(node.annotation)}"
+            if node.value is not None:
+                signature += f" = {_short(node.value)}"
+            out[name] = Doc("attribute", name, signature, _attribute_doc(body, index))
+        elif (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+        ):
+            name = node.targets[0].id
+            doc = _attribute_doc(body, index)
+            out[name] = Doc("variable", name, f"{name} = {_short(node.value)}", doc)
+        elif isinstance(node, ast.If):
+            out.update(_members(node.body))
+            out.update(_members(node.orelse))
+        elif isinstance(node, ast.Try):
+            out.update(_members(node.body))
+    return out
+
+
+def _exports(tree: ast.Module) -> list[str] | None:
+    for node in tree.body:
+        if isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            if any(isinstance(t, ast.Name) and t.id == "__all__" for t in targets):
+                try:
+                    value = ast.literal_eval(node.value) if node.value is not None else None
+                except ValueError:
+                    return None
+                if isinstance(value, (list, tuple)):
+                    return [v for v in value if isinstance(v, str)]
+    return None
+
+
+def parse_module(source: str) -> Module:
+    """Parse one Python file without importing it."""
+    tree = ast.parse(source)
+    imports: dict[str, tuple[int, str]] = {}
+    star: list[tuple[int, str]] = []
+
+    def visit(body: list[ast.stmt]) -> None:
+        for node in body:
+            if isinstance(node, ast.ImportFrom):
+                for alias in node.names:
+                    target = ".".join(filter(None, [node.module, alias.name]))
+                    if alias.name == "*":
+                        star.append((node.level, node.module or ""))
+                    else:
+                        imports[alias.asname or alias.name] = (node.level, target)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        imports[alias.asname] = (0, alias.name)
+                    else:
+                        top = alias.name.partition(".")[0]
+                        imports[top] = (0, top)
+            elif isinstance(node, ast.If):
+                visit(node.body)
+                visit(node.orelse)
+            elif isinstance(node, ast.Try):
+                visit(node.body)
+
+    visit(tree.body)
+    doc = Doc("module", "", "", ast.get_docstring(tree) or "", _members(tree.body))
+    return Module(doc, imports, star, _exports(tree))
+
+
+def _absolute(module: str, package: bool, level: int, dotted: str) -> str:
+    if not level:
+        return dotted
+    parts = module.split(".") if package else module.split(".")[:-1]
+    parts = parts[: len(parts) - (level - 1)]
+    return ".".join([*parts, dotted] if dotted else parts)
+
+
+def _renamed(doc: Doc, name: str) -> Doc:
+    return Doc(doc.kind, name, doc.signature, doc.doc, doc.members)
+
+
+class Resolver:
+    """Look up dotted paths across parsed modules, following re-exports."""
+
+    def __init__(self, modules: dict[str, Module], packages: set[str]) -> None:
+        self.modules = modules
+        self.packages = packages
+
+    def resolve(self, dotted: str, depth: int = 0) -> Doc | None:
+        parts = dotted.split(".")
+        for i in range(len(parts), 0, -1):
+            name = ".".join(parts[:i])
+            if name in self.modules:
+                return self.lookup(name, parts[i:], depth)
+        return None
+
+    def lookup(self, module: str, path: list[str], depth: int = 0) -> Doc | None:
+        parsed = self.modules[module]
+        if not path:
+            return _renamed(parsed.doc, module.rpartition(".")[2])
+        if depth > 20:  # import cycles
+            return None
+        package = module in self.packages
+        name, *rest = path
+        found = parsed.doc.members.get(name)
+        if found is None and name in parsed.imports:
+            level, target = parsed.imports[name]
+            return self.resolve(
+                ".".join([_absolute(module, package, level, target), *rest]), depth + 1
+            )
+        if found is None:
+            for level, source in parsed.star:
+                other = _absolute(module, package, level, source)
+                if other in self.modules and (hit := self.lookup(other, path, depth + 1)):
+                    return hit
+            return None
+        for part in rest:
+            found = found.members.get(part)
+            if found is None:
+                return None
+        return found
+
+    def children(self, module: str | None, doc: Doc) -> list[tuple[str, Doc]]:
+        """Members shown by default: ``__all__`` of a module, else what it defines."""
+        if module is not None and doc.kind == "module":
+            exports = self.modules[module].exports
+            if exports is not None:
+                named = ((n, self.lookup(module, [n])) for n in exports)
+                return [(n, d) for n, d in named if d is not None]
+            # Undocumented module variables (loggers, type vars) are noise.
+            return [(n, d) for n, d in doc.members.items() if d.kind != "variable" or d.doc]
+        return list(doc.members.items())
+
+
+def _options(lines: list[str]) -> dict[str, Any]:
+    """The handful of mkdocstrings options this renderer needs, from YAML lines."""
+
+    def scalar(text: str) -> Any:
+        text = text.strip()
+        if text.startswith("[") and text.endswith("]"):
+            return [scalar(item) for item in text[1:-1].split(",") if item.strip()]
+        if text[:1] in "'\"" and text[-1:] == text[:1]:
+            return text[1:-1]
+        if text in ("true", "false"):
+            return text == "true"
+        return int(text) if text.isdigit() else text
+
+    options: dict[str, Any] = {}
+    key = None
+    for raw in lines:
+        text = raw.strip()
+        if not text or text.startswith("#"):
+            continue
+        if text.startswith("- ") and key is not None:
+            if not isinstance(options.get(key), list):
+                options[key] = []
+            options[key].append(scalar(text[2:]))
+        else:
+            key, _, value = (part.strip() for part in text.partition(":"))
+            if value:
+                options[key] = scalar(value)
+    return options
+
+
+def _selected(name: str, filters: list[str]) -> bool:
+    positive = [f for f in filters if not f.startswith("!")]
+    if any(re.search(f[1:], name) for f in filters if f.startswith("!")):
+        return False
+    return not positive or any(re.search(f, name) for f in positive)
+
+
+def render(
+    resolver: Resolver, ident: str, doc: Doc, options: dict[str, Any], indent: str = ""
+) -> list[str]:
+    """Markdown lines for one ``::: ident`` directive."""
+    level = int(options.get("heading_level", 2))
+    extra = options.get("filters") or []
+    filters = _DEFAULT_FILTERS + (extra if isinstance(extra, list) else [extra])
+    module = ident if ident in resolver.modules else None
+    out: list[str] = []
+
+    def block(obj: Doc, depth: int, heading: bool, path: str, members: Any = None) -> None:
+        if heading:
+            out.extend([f"{'#' * min(depth, 6)} `{obj.name}`", ""])
+        if obj.signature:
+            out.extend(["```python", *obj.signature.splitlines(), "```", ""])
+        if obj.doc:
+            out.extend([*obj.doc.splitlines(), ""])
+        if obj.kind not in ("module", "class") or members is False:
+            return
+        if isinstance(members, list):
+            picked = []
+            for name in map(str, members):
+                found = resolver.resolve(f"{path}.{name}") if obj.kind == "module" else None
+                found = found or obj.members.get(name)
+                if found is not None:
+                    picked.append((name, found))
+        else:
+            owner = path if obj.kind == "module" and path in resolver.modules else None
+            picked = [(n, d) for n, d in resolver.children(owner, obj) if _selected(n, filters)]
+        child_depth = depth + 1 if heading else depth
+        for name, child in picked:
+            # A re-exported submodule gets its docstring only, not its whole API.
+            nested = False if child.kind == "module" else None
+            block(_renamed(child, name), child_depth, True, f"{path}.{name}", nested)
+
+    show_root = options.get("show_root_heading", False)
+    root = _renamed(doc, ident.rpartition(".")[2])
+    block(root, level, bool(show_root), module or ident, options.get("members"))
+    while out and not out[-1]:
+        out.pop()
+    return [f"{indent}{line}" if line else line for line in out]
+
+
+def directives(text: str) -> list[tuple[int, int, str, str, dict[str, Any]]]:
+    """``(first, end, indent, identifier, options)`` for each directive, by line index."""
+    lines = text.splitlines()
+    found = []
+    fence = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if opening := _FENCE_RE.match(line):
+            mark = opening.group(1)
+            if fence is None:
+                fence = mark
+            elif mark[0] == fence[0] and len(mark) >= len(fence):
+                fence = None
+        elif fence is None and (match := _DIRECTIVE_RE.match(line)):
+            indent = match.group("indent")
+            end = i + 1
+            body_end = end
+            while end < len(lines):
+                nxt = lines[end]
+                if nxt.strip() and len(nxt) - len(nxt.lstrip()) <= len(indent):
+                    break
+                end += 1
+                if nxt.strip():
+                    body_end = end
+            options = _options(lines[i + 1 : body_end])
+            found.append((i, body_end, indent, match.group("ident"), options))
+            i = body_end
+            continue
+        i += 1
+    return found
+
+
+def expand(text: str, resolver: Resolver) -> tuple[str, int, int]:
+    """Replace every resolvable directive; return the text and (rendered, skipped)."""
+    lines = text.splitlines()
+    rendered = skipped = 0
+    for first, end, indent, ident, options in reversed(directives(text)):
+        doc = resolver.resolve(ident)
+        if doc is None:
+            skipped += 1
+            continue
+        lines[first:end] = render(resolver, ident, doc, options, indent)
+        rendered += 1
+    return "\n".join(lines) + ("\n" if text.endswith("\n") else ""), rendered, skipped
+
+
+def _module_name(rel: str) -> tuple[str, bool]:
+    """``("pkg.mod", is_package)`` for a path relative to a source root."""
+    parts = rel[: -len(".py")].split("/")
+    if parts[-1] == "__init__":
+        return ".".join(parts[:-1]), True
+    return ".".join(parts), False
+
+
+@hook("mkdocstrings", version=VERSION)
+def mkdocstrings(ctx: HookContext) -> None:
+    """Render ``::: identifier`` directives from the upstream Python sources."""
+    roots = [posixpath.normpath(r) for r in ctx.options.get("source_roots", ["."])]
+    pages: dict[str, str] = {}
+    for rel, path in ctx.files.items():
+        if rel.endswith(".md") and not path.is_symlink():
+            text = path.read_text(encoding="utf-8")
+            if ":::" in text and directives(text):
+                pages[rel] = text
+    if not pages:
+        return
+
+    tops = {ident.split(".")[0] for text in pages.values() for *_, ident, _ in directives(text)}
+    wanted = [
+        posixpath.normpath(posixpath.join(root, top + ext))
+        for root in roots
+        for top in tops
+        for ext in ("", ".py")
+    ]
+    oids = ctx.blob_ids(wanted, recursive=True)
+    files: dict[str, tuple[str, str, bool]] = {}  # module -> (path, oid, package)
+    for path, oid in oids.items():
+        if not path.endswith(".py"):
+            continue
+        for root in roots:
+            prefix = "" if root == "." else root + "/"
+            if path.startswith(prefix):
+                name, package = _module_name(path[len(prefix):])
+                files.setdefault(name, (path, oid, package))
+
+    modules: dict[str, Module] = {}
+    missing: list[str] = []
+    for name, (path, oid, _) in files.items():
+        entry = ctx.cache / oid[:2] / f"{oid}-v{VERSION}.json" if ctx.cache else None
+        if entry is not None and entry.is_file():
+            modules[name] = Module.from_dict(json.loads(entry.read_text()))
+        else:
+            missing.append(name)
+    sources = ctx.upstream(files[name][0] for name in missing)
+    for name in missing:
+        path, oid, _ = files[name]
+        if path not in sources:
+            continue
+        try:
+            modules[name] = parse_module(sources[path].decode("utf-8", "replace"))
+        except SyntaxError as exc:
+            log.warning("[%s] ⚠️  Cannot parse %s: %s", ctx.project.name, path, exc)
+            continue
+        if ctx.cache is not None:
+            entry = Path(ctx.cache, oid[:2], f"{oid}-v{VERSION}.json")
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(entry, json.dumps(asdict(modules[name]), separators=(",", ":")))
+
+    resolver = Resolver(modules, {name for name, (_, _, pkg) in files.items() if pkg})
+    rendered = skipped = 0
+    for rel, text in pages.items():
+        result, done, left = expand(text, resolver)
+        rendered += done
+        skipped += left
+        if done:
+            ctx.write_text(rel, result)
+    log.info(
+        "[%s] 📚 Rendered %d API directives from %d modules (%d parsed, %d unresolved)",
+        ctx.project.name,
+        rendered,
+        len(modules),
+        len(missing),
+        skipped,
+    )
@@ -0,0 +1,337 @@
+"""Offline benchmark of the sync pipeline against synthetic local repositories.
+
+``python -m docsync bench`` builds a bare repository with thousands of
+markdown files, a long history and large binaries that the sparse patterns
+exclude, then syncs it over ``file://`` with each fetch strategy:
+
+* ``cold``: empty mirror cache and empty destination;
+* ``noop``: upstream unchanged, so the commit short-circuit applies;
+* ``incremental``: one new upstream commit, fetched into the warm cache.
+
+For every run it reports wall time, bytes copied, files touched and, per
+phase, duration and peak disk usage of the scratch, cache and output trees.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .cache import MirrorCache, tree_size
+from .config import FETCH_MODES, Project, SyncSettings
+from .engine import SyncResult, sync_all, sync_project
+from .faultserver import Faults, GitFaultServer
+from .git import git
+from .retry import RetryPolicy
+from .sparse import SparseSpec
+
+BENCH_SPARSE = SparseSpec(include=("docs/",), exclude=("docs/img/",))
+
+_WORDS = (
+    "agent api async await body client config context data default dependency "
+    "docs endpoint error field handler header model module object option path "
+    "query request response return router schema server session settings state "
+    "stream task test token type user validation value version"
+).split()
+
+
+@dataclass(frozen=True)
+class FixtureSpec:
+    """Shape of the synthetic upstream repository."""
+
+    files: int = 3000
+    commits: int = 300
+    changes_per_commit: int = 10
+    binaries: int = 8
+    binary_kb: int = 2048
+    seed: int = 0
+
+
+@dataclass
+class PhaseStats:
+    seconds: float
+    peak_disk_bytes: int
+
+
+@dataclass
+class RunStats:
+    strategy: str
+    scenario: str
+    seconds: float
+    status: str
+    bytes_copied: int
+    files_touched: int
+    phases: dict[str, PhaseStats] = field(default_factory=dict)
+
+
+def _markdown(rng: random.Random, title: str) -> str:
+    parts = [f"# {title}\n"]
+    for section in range(rng.randint(2, 6)):
+        parts.append(f"\n## {' '.join(rng.choices(_WORDS, k=3)).title()} {section}\n\n")
+        for _ in range(rng.randint(1, 4)):
+            parts.append(" ".join(rng.choices(_WORDS, k=rng.randint(20, 80))) + ".\n\n")
+        if rng.random() < 0.4:
+            parts.append("```python\n" + f"{rng.choice(_WORDS)} = {rng.randint(0, 999)}\n" + "```\n")
+    return "".join(parts)
+
+
+def _data(payload: bytes) -> bytes:
+    return b"data %d\n" % len(payload) + payload + b"\n"
+
+
+def build_fixture(path: Path, spec: FixtureSpec) -> Path:
+    """Create a bare repository at ``path`` described by ``spec``.
+
+    History is written with ``git fast-import`` so deep fixtures build in
+    seconds. The repository allows partial-clone filters and fetching blobs by
+    id, like GitHub does.
+    """
+    rng = random.Random(spec.seed)
+    git("init", "--quiet", "--bare", "--initial-branch=main", str(path))
+    git("config", "uploadpack.allowFilter", "true", cwd=path)
+    git("config", "uploadpack.allowAnySHA1InWant", "true", cwd=path)
+
+    pages = [
+        f"docs/{rng.choice(_WORDS)}/{rng.choice(_WORDS)}-{i}.md" for i in range(spec.files)
+    ]
+    stream: list[bytes] = []
+    when = 1_600_000_000
+    for n in range(spec.commits):
+        when += 3600
+        stream.append(b"commit refs/heads/main\n")
+        stream.append(b"committer Bench <bench@example.com> %d +0000\n" % when)
+        stream.append(_data(b"commit %d" % n))
+        if n == 0:
+            changed = range(len(pages))
+            stream.append(b"M 100644 inline README.md\n" + _data(b"# Bench fixture\n"))
+        else:
+            changed = rng.sample(range(len(pages)), min(spec.changes_per_commit, len(pages)))
+        for i in changed:
+            text = _markdown(rng, f"Page {i} rev {n}").encode()
+            stream.append(b"M 100644 inline %s\n" % pages[i].encode() + _data(text))
+        if n % max(1, spec.commits // 4) == 0:
+            for b in range(spec.binaries):
+                blob = rng.randbytes(spec.binary_kb * 1024)
+                stream.append(b"M 100644 inline docs/img/asset-%d.bin\n" % b + _data(blob))
+                stream.append(b"M 100644 inline assets/large-%d.bin\n" % b + _data(blob[::-1]))
+    subprocess.run(
+        ["git", "fast-import", "--quiet"],
+        cwd=path,
+        input=b"".join(stream),
+        check=True,
+    )
+    return path
+
+
+def push_commit(bare: Path, changes: int, seed: int) -> None:
+    """Add one commit to ``bare`` touching ``changes`` existing pages."""
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory(prefix="docsync-bench-push-") as tmp:
+        work = Path(tmp)
+        git("clone", "--quiet", "--depth=1", bare.as_uri(), str(work))
+        pages = sorted(work.glob("docs/*/*.md"))
+        for page in rng.sample(pages, min(changes, len(pages))):
+            page.write_text(_markdown(rng, f"{page.stem} updated"))
+        git("add", "-A", cwd=work)
+        git(
+            "-c", "user.name=Bench", "-c", "user.email=bench@example.com",
+            "commit", "--quiet", "-m", "bench update", cwd=work,
+        )
+        git("push", "--quiet", "origin", "main", cwd=work)
+
+
+class DiskSampler:
+    """Poll the total size of ``root`` in the background."""
+
+    def __init__(self, root: Path, interval: float = 0.05) -> None:
+        self.root = root
+        self.interval = interval
+        self.samples: list[tuple[float, int]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        while True:
+            self.samples.append((time.monotonic(), tree_size(self.root)))
+            if self._stop.wait(self.interval):
+                break
+
+    def __enter__(self) -> DiskSampler:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.samples.append((time.monotonic(), tree_size(self.root)))
+
+    def peak(self, begin: float, end: float) -> int:
+        """Largest sample in ``[begin, end]``, or the first one after it."""
+        inside = [size for t, size in self.samples if begin <= t <= end]
+        if inside:
+            return max(inside)
+        after = [size for t, size in self.samples if t > end]
+        return after[0] if after else 0
+
+
+def _run(
+    strategy: str,
+    scenario: str,
+    project: Project,
+    work: Path,
+    settings: SyncSettings,
+) -> RunStats:
+    cache = MirrorCache(settings.cache_dir) if settings.cache_dir else None
+    with DiskSampler(work) as sampler:
+        result: SyncResult = sync_project(project, work / "out", settings, cache)
+    diff = result.diff
+    stats = RunStats(
+        strategy=strategy,
+        scenario=scenario,
+        seconds=result.seconds,
+        status="FAILED" if not result.ok else "skip" if result.skipped else "ok",
+        bytes_copied=diff.bytes_written if diff else 0,
+        files_touched=len(diff.added) + len(diff.modified) + len(diff.deleted) if diff else 0,
+    )
+    for name, begin, end in result.spans:
+        stats.phases[name] = PhaseStats(end - begin, sampler.peak(begin, end))
+    if result.error:
+        raise RuntimeError(f"{strategy}/{scenario}: {result.error}")
+    return stats
+
+
+def run_benchmark(spec: FixtureSpec, strategies: tuple[str, ...] = FETCH_MODES) -> list[RunStats]:
+    """Build a fixture once and run every scenario for each strategy."""
+    runs: list[RunStats] = []
+    with tempfile.TemporaryDirectory(prefix="docsync-bench-") as tmp:
+        base = Path(tmp)
+        fixture = build_fixture(base / "fixture.git", spec)
+        for strategy in strategies:
+            upstream = base / f"upstream-{strategy}.git"
+            shutil.copytree(fixture, upstream)
+            work = base / f"work-{strategy}"
+            (work / "scratch").mkdir(parents=True)
+            project = Project(
+                name=strategy,
+                repo=upstream.as_uri(),
+                branch="main",
+                dest="docs",
+                sparse=BENCH_SPARSE,
+            )
+            settings = SyncSettings(
+                jobs=1,
+                fetch_mode=strategy,
+                cache_dir=str(work / "cache"),
+                scratch_dir=str(work / "scratch"),
+            )
+            runs.append(_run(strategy, "cold", project, work, settings))
+            runs.append(_run(strategy, "noop", project, work, settings))
+            push_commit(upstream, spec.changes_per_commit, spec.seed + 1)
+            runs.append(_run(strategy, "incremental", project, work, settings))
+    return runs
+
+
+def format_report(runs: list[RunStats]) -> str:
+    """Render ``runs`` as a plain-text table, one row per phase."""
+    mib = 2**20
+    lines = [
+        f"{'strategy':<8}  {'scenario':<11}  {'phase':<9}  {'seconds':>7}  "
+        f"{'peak MiB':>8}  {'copied MiB':>10}  {'files':>5}"
+    ]
+    for run in runs:
+        lines.append(
+            f"{run.strategy:<8}  {run.scenario:<11}  {'(total)':<9}  {run.seconds:7.2f}  "
+            f"{'':>8}  {run.bytes_copied / mib:10.2f}  {run.files_touched:5}"
+        )
+        for name, phase in run.phases.items():
+            lines.append(
+                f"{'':<8}  {'':<11}  {name:<9}  {phase.seconds:7.2f}  "
+                f"{phase.peak_disk_bytes / mib:8.1f}"
+            )
+    return "\n".join(lines)
+
+
+def report_json(runs: list[RunStats]) -> str:
+    return json.dumps([asdict(r) for r in runs], indent=2)
+
+
+@dataclass
+class DrillStats:
+    project: str
+    faults: str
+    status: str
+    seconds: float
+    retries: int
+    requests: int
+    injected_failures: int
+
+
+def run_fault_drill(spec: FixtureSpec, timeout: float = 2.0) -> list[DrillStats]:
+    """Sync five copies of a fixture over HTTP while two upstreams misbehave.
+
+    ``flaky`` fails its first requests and must succeed after retries;
+    ``hung`` answers slower than ``timeout`` and must fail without delaying
+    the healthy projects, which must all publish.
+    """
+    scenarios = {
+        "healthy-1": Faults(),
+        "healthy-2": Faults(latency=0.05),
+        "healthy-3": Faults(failure_rate=0.1, seed=spec.seed),
+        "flaky": Faults(fail_first=3),
+        "hung": Faults(latency=timeout * 2),
+    }
+    with tempfile.TemporaryDirectory(prefix="docsync-drill-") as tmp:
+        base = Path(tmp)
+        fixture = build_fixture(base / "fixture.git", spec)
+        repos = base / "repos"
+        for name in scenarios:
+            shutil.copytree(fixture, repos / f"{name}.git")
+        with GitFaultServer(repos, {f"{n}.git": f for n, f in scenarios.items()}) as server:
+            projects = [
+                Project(
+                    name=name,
+                    repo=server.url(f"{name}.git"),
+                    branch="main",
+                    dest=f"out/{name}",
+                    sparse=BENCH_SPARSE,
+                )
+                for name in scenarios
+            ]
+            settings = SyncSettings(
+                jobs=len(projects),
+                fetch_mode="partial",
+                retry=RetryPolicy(attempts=4, timeout=timeout, base_delay=0.1, max_delay=1.0),
+            )
+            results = sync_all(projects, base, settings)
+    return [
+        DrillStats(
+            project=r.project.name,
+            faults=scenarios[r.project.name].describe(),
+            status="FAILED" if not r.ok else "ok",
+            seconds=r.seconds,
+            retries=sum(c.get("retries", 0) for c in r.counters.values()),
+            requests=scenarios[r.project.name].requests,
+            injected_failures=scenarios[r.project.name].failures,
+        )
+        for r in results
+    ]
+
+
+def format_drill(stats: list[DrillStats]) -> str:
+    lines = [
+        f"{'project':<10}  {'status':<6}  {'seconds':>7}  {'retries':>7}  "
+        f"{'requests':>8}  {'injected':>8}  faults"
+    ]
+    for s in stats:
+        lines.append(
+            f"{s.project:<10}  {s.status:<6}  {s.seconds:7.2f}  {s.retries:7}  "
+            f"{s.requests:8}  {s.injected_failures:8}  {s.faults}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,119 @@
+"""Persistent on-disk cache of upstream checkouts, with LRU eviction.
+
+Each cache entry is a regular sparse git checkout keyed by repository URL and
+fetch mode. Reusing it between runs turns every fetch after the first into an
+incremental one that only transfers new objects. Point the cache at a
+directory persisted by CI (e.g. ``actions/cache``) to keep it warm.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import logging
+import os
+import re
+import shutil
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+log = logging.getLogger("docsync")
+
+STAMP = ".docsync-last-used"
+
+
+def tree_size(path: Path) -> int:
+    """Bytes used by files under ``path``, counting hardlinked inodes once."""
+    total = 0
+    seen: set[tuple[int, int]] = set()
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                st = os.lstat(os.path.join(dirpath, name))
+            except FileNotFoundError:
+                continue
+            if st.st_nlink > 1:
+                if (st.st_dev, st.st_ino) in seen:
+                    continue
+                seen.add((st.st_dev, st.st_ino))
+            total += st.st_size
+    return total
+
+
+class MirrorCache:
+    """A directory of reusable checkouts bounded to ``max_bytes`` in total."""
+
+    def __init__(self, root: str | Path, max_bytes: int | None = None) -> None:
+        self.root = Path(root).expanduser()
+        self.max_bytes = max_bytes
+        self._used: set[Path] = set()
+
+    def entry_for(self, url: str, mode: str) -> Path:
+        """Return the cache directory for ``url`` fetched in ``mode``."""
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "-", url.rstrip("/").rsplit("/", 1)[-1])
+        digest = hashlib.sha256(url.encode()).hexdigest()[:12]
+        return self.root / f"{slug.removesuffix('.git')}-{digest}-{mode}"
+
+    @contextmanager
+    def checkout(self, url: str, mode: str) -> Iterator[Path]:
+        """Lock and yield the entry for ``url``, marking it as recently used.
+
+        The entry is removed if the body raises, so a half-fetched repository
+        never poisons later runs.
+        """
+        entry = self.entry_for(url, mode)
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(entry.with_name(entry.name + ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entry.mkdir(exist_ok=True)
+            try:
+                yield entry
+            except BaseException:
+                shutil.rmtree(entry, ignore_errors=True)
+                raise
+            (entry / STAMP).touch()
+            self._used.add(entry)
+
+    def entries(self) -> list[Path]:
+        """All cache entries, least recently used first."""
+        if not self.root.is_dir():
+            return []
+
+        def last_used(path: Path) -> float:
+            try:
+                return (path / STAMP).stat().st_mtime
+            except FileNotFoundError:
+                return 0.0
+
+        return sorted((p for p in self.root.iterdir() if p.is_dir()), key=last_used)
+
+    def evict(self) -> list[Path]:
+        """Drop least recently used entries until the cache fits ``max_bytes``.
+
+        Entries used by this process are kept even if they alone exceed the
+        limit. Returns the removed entries.
+        """
+        if self.max_bytes is None:
+            return []
+        entries = self.entries()
+        sizes = {e: tree_size(e) for e in entries}
+        total = sum(sizes.values())
+        removed: list[Path] = []
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry in self._used:
+                continue
+            lock_path = entry.with_name(entry.name + ".lock")
+            with open(lock_path, "w") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                shutil.rmtree(entry, ignore_errors=True)
+            lock_path.unlink(missing_ok=True)
+            total -= sizes[entry]
+            removed.append(entry)
+            log.info("🧹 Evicted cache entry %s (%.1f MiB)", entry.name, sizes[entry] / 2**20)
+        return removed
@@ -0,0 +1,263 @@
+"""Heading-aware markdown chunker shared by everything that reads the synced docs.
+
+Markdown is scanned once, line by line, and cut into sections at ATX
+headings. A ``#`` line never starts a section while it is inside
+
+- a fenced code block (```` ``` ```` or ``~~~``, possibly indented),
+- a MkDocs admonition (``!!! note`` / ``??? tip``: the indented lines after it),
+- a pymdown block (``/// note`` ... ``///``, used by FastAPI and SQLModel),
+- YAML front matter at the very top of the file.
+
+Each :class:`Chunk` carries its heading, anchor (an explicit ``{ #id }``
+or the MkDocs slug), the titles of its enclosing headings, and its byte
+range in the source. With ``max_bytes`` oversized sections are split
+further at blank lines outside those blocks.
+
+:class:`ChunkCache` memoizes results by content SHA-256, in memory and
+optionally on disk, so re-chunking an unchanged file costs one lookup.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+# Bump when chunk boundaries or anchors change, so cached results are not reused.
+VERSION = 2
+
+_HEADING_RE = re.compile(rb"^(#{1,6})[ \t]+(.*?)[ \t#]*\r?\n?$")
+_FENCE_RE = re.compile(rb"^[ \t]*(`{3,}|~{3,})")
+_ADMONITION_RE = re.compile(rb"^(!!!|\?\?\?\+?)[ \t]")
+_BLOCK_RE = re.compile(rb"^(/{3,})(.*)$")
+_ANCHOR_RE = re.compile(r"\s*\{\s*#([\w-]+)[^}]*\}\s*$")
+_ID_COUNT_RE = re.compile(r"^(.*)_([0-9]+)$")
+_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def slugify(value: str, separator: str = "-") -> str:
+    """The anchor MkDocs generates for a heading: ``markdown.extensions.toc.slugify``."""
+    # Replace Extended Latin characters with ASCII, i.e. "žlutý" => "zluty".
+    value = unicodedata.normalize("NFKD", value)
+    value = value.encode("ascii", "ignore").decode("ascii")
+    value = re.sub(r"[^\w\s-]", "", value).strip().lower()
+    return re.sub(rf"[{separator}\s]+", separator, value)
+
+
+def unique(anchor: str, used: set[str]) -> str:
+    """``anchor``, suffixed ``_1``, ``_2``... like the toc extension when already taken."""
+    while anchor in used or not anchor:
+        match = _ID_COUNT_RE.match(anchor)
+        if match:
+            anchor = f"{match.group(1)}_{int(match.group(2)) + 1}"
+        else:
+            anchor = f"{anchor}_1"
+    used.add(anchor)
+    return anchor
+
+
+def _heading_text(title: str) -> str:
+    """The text of a heading as rendered: links, images and tags reduced to their text."""
+    title = _LINK_RE.sub(r"\1", title)
+    return html.unescape(_TAG_RE.sub("", title))
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """A heading-delimited slice of one markdown file, addressed in bytes.
+
+    ``level`` is 0 for text before the first heading. ``part`` numbers the
+    pieces of a section that was split to respect ``max_bytes``.
+    """
+
+    title: str
+    anchor: str
+    level: int
+    breadcrumbs: tuple[str, ...]
+    offset: int
+    length: int
+    part: int = 0
+
+    @property
+    def trail(self) -> tuple[str, ...]:
+        """Breadcrumbs followed by the chunk's own title."""
+        return self.breadcrumbs + ((self.title,) if self.title else ())
+
+
+class _Section:
+    """Bookkeeping for the section being scanned."""
+
+    def __init__(self, title: str, anchor: str, level: int, crumbs: tuple[str, ...], start: int):
+        self.title = title
+        self.anchor = anchor
+        self.level = level
+        self.crumbs = crumbs
+        self.start = start
+        self.breaks: list[int] = []  # offsets where a split is allowed
+        self.blank = True
+
+    def emit(self, end: int, max_bytes: int | None) -> Iterator[Chunk]:
+        if end <= self.start or (self.blank and not self.title):
+            return
+        cuts = [self.start]
+        if max_bytes:
+            # Greedy: cut at the last allowed break before a piece outgrows
+            # max_bytes. A piece without any break stays whole.
+            candidate = None
+            for point in [*self.breaks, end]:
+                too_long = point - cuts[-1] > max_bytes
+                if too_long and candidate is not None and cuts[-1] < candidate < point:
+                    cuts.append(candidate)
+                candidate = point
+        cuts.append(end)
+        for part, (begin, stop) in enumerate(zip(cuts, cuts[1:])):
+            yield Chunk(self.title, self.anchor, self.level, self.crumbs, begin, stop - begin, part)
+
+
+def iter_chunks(lines: Iterable[bytes], max_bytes: int | None = None) -> Iterator[Chunk]:
+    """Yield the chunks of a markdown file given as lines (with line endings).
+
+    Chunks are yielded as soon as the next heading closes them, so a file
+    can be streamed without holding it in memory.
+    """
+    stack: list[tuple[int, str]] = []  # (level, title) of the enclosing headings
+    section = _Section("", "", 0, (), 0)
+    fence: bytes | None = None
+    blocks = 0  # open /// blocks
+    admonition = False
+    front_matter = False
+    anchors: set[str] = set()
+    offset = 0
+    for number, line in enumerate(lines):
+        stripped = line.strip()
+        splittable = False
+        if number == 0 and stripped == b"---":
+            front_matter = True
+        elif front_matter:
+            front_matter = stripped not in (b"---", b"...")
+        elif fence is not None:
+            closing = _FENCE_RE.match(line)
+            if closing and closing.group(1)[:1] == fence[:1] and len(closing.group(1)) >= len(fence):
+                if stripped == closing.group(1):
+                    fence = None
+        elif opening := _FENCE_RE.match(line):
+            fence = opening.group(1)
+        elif block := _BLOCK_RE.match(line):
+            blocks = blocks - 1 if not block.group(2).strip() and blocks else blocks + 1
+        elif blocks:
+            pass
+        elif admonition and (not stripped or line[:1] in (b" ", b"\t")):
+            pass
+        elif _ADMONITION_RE.match(line):
+            admonition = True
+        else:
+            admonition = False
+            heading = _HEADING_RE.match(line)
+            if heading:
+                yield from section.emit(offset, max_bytes)
+                level = len(heading.group(1))
+                text = heading.group(2).decode("utf-8", "replace")
+                custom = _ANCHOR_RE.search(text)
+                title = text[: custom.start()].strip() if custom else text
+                if custom:
+                    anchor = custom.group(1)
+                    anchors.add(anchor)
+                else:
+                    anchor = unique(slugify(_heading_text(title)), anchors)
+                while stack and stack[-1][0] >= level:
+                    stack.pop()
+                section = _Section(title, anchor, level, tuple(t for _, t in stack), offset)
+                stack.append((level, title))
+            elif not stripped:
+                splittable = True
+        if stripped and not front_matter and stripped != b"---":
+            section.blank = False
+        offset += len(line)
+        if splittable:
+            section.breaks.append(offset)
+    yield from section.emit(offset, max_bytes)
+
+
+def chunk_markdown(data: bytes, max_bytes: int | None = None) -> list[Chunk]:
+    """All chunks of an in-memory markdown file."""
+    return list(iter_chunks(data.splitlines(keepends=True), max_bytes))
+
+
+class ChunkCache:
+    """Chunk results keyed by content SHA-256, kept in memory and under ``root``.
+
+    With ``max_entries`` the in-memory copy is a least recently used cache of
+    that many files, so a long-running process seeing many revisions stays
+    bounded; the on-disk copy is unaffected.
+    """
+
+    def __init__(self, root: str | Path | None = None, max_entries: int | None = None) -> None:
+        self.root = Path(root).expanduser() if root is not None else None
+        self.max_entries = max_entries
+        self._memory: OrderedDict[tuple[str, int | None], list[Chunk]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember(self, key: tuple[str, int | None], chunks: list[Chunk]) -> None:
+        with self._lock:
+            self._memory[key] = chunks
+            self._memory.move_to_end(key)
+            while self.max_entries is not None and len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, sha256: str, max_bytes: int | None) -> Path:
+        assert self.root is not None
+        return self.root / sha256[:2] / f"{sha256}-v{VERSION}-{max_bytes or 0}.json"
+
+    def chunks(
+        self, data: bytes, sha256: str | None = None, max_bytes: int | None = None
+    ) -> list[Chunk]:
+        """Chunks of ``data``; ``sha256`` may be passed when already known."""
+        sha256 = sha256 or hashlib.sha256(data).hexdigest()
+        key = (sha256, max_bytes)
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+        if cached is None and self.root is not None:
+            try:
+                rows = json.loads(self._path(sha256, max_bytes).read_text())
+            except (FileNotFoundError, ValueError):
+                pass
+            else:
+                cached = [
+                    Chunk(**{**row, "breadcrumbs": tuple(row["breadcrumbs"])}) for row in rows
+                ]
+                self._remember(key, cached)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        result = chunk_markdown(data, max_bytes)
+        self._remember(key, result)
+        if self.root is not None:
+            self._store(self._path(sha256, max_bytes), result)
+        return result
+
+    def _store(self, path: Path, chunks: list[Chunk]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as fh:
+                json.dump([asdict(c) for c in chunks], fh, separators=(",", ":"))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.lexists(tmp):
+                os.unlink(tmp)
+            raise
@@ -0,0 +1,589 @@
+"""Command line interface: ``python -m docsync <command>``."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from pathlib import Path
+
+from . import publish
+from .config import DEFAULT_CONFIG, FETCH_MODES, ConfigError, Project, SyncSettings, load_config
+from .engine import format_timings, sync_all
+from .feed import write_feed
+from .manifest import load_manifest
+from .metrics import collect, to_markdown, write_metrics
+from .pack import CODECS
+from .reconcile import file_sha256
+from .retry import RetryPolicy
+from .sparse import SparseSpec
+from .store import BlobStore
+
+log = logging.getLogger("docsync")
+
+
+def _cmd_sync(args: argparse.Namespace) -> int:
+    settings = load_config(args.config)
+    projects = settings.select(args.projects)
+    settings = replace(
+        settings,
+        jobs=args.jobs or settings.jobs,
+        fetch_mode=args.fetch_mode or settings.fetch_mode,
+        cache_dir=args.cache_dir,
+        cache_max_mb=args.cache_max_mb or settings.cache_max_mb,
+        store=None if args.no_store else args.store or settings.store,
+        index=None if args.no_index else settings.index,
+        retry=replace(
+            settings.retry,
+            attempts=args.attempts or settings.retry.attempts,
+            timeout=args.timeout or settings.retry.timeout,
+        ),
+        force=args.force,
+    )
+    log.info(
+        "Syncing %d project(s) with %d worker(s), %s fetch",
+        len(projects), settings.jobs, settings.fetch_mode,
+    )
+    run_at = datetime.now(timezone.utc)
+    start = time.monotonic()
+    results = sync_all(projects, Path(args.root), settings)
+    wall = time.monotonic() - start
+    print(format_timings(results, wall))
+    if args.metrics_json or args.metrics_prom:
+        write_metrics(
+            collect(results, run_at, wall),
+            Path(args.metrics_json) if args.metrics_json else None,
+            Path(args.metrics_prom) if args.metrics_prom else None,
+        )
+    if args.feed:
+        count = write_feed(Path(args.root) / args.feed, results, run_at)
+        log.info("📰 Wrote %d change record(s) to %s", count, args.feed)
+    merging = None
+    if settings.index:
+        from .index import merge_in_background
+
+        index_dir = Path(args.root) / settings.index
+        _update_index(settings, Path(args.root), index_dir)
+        merging = merge_in_background(index_dir)
+    if settings.tokens:
+        try:
+            _update_tokens(settings, Path(args.root))
+        except ConfigError as exc:
+            # An exact sidecar without tiktoken keeps its counts; missing
+            # sections fall back to the calibrated estimator.
+            log.warning("⚠️  Token counts not updated: %s", exc)
+    if args.pack:
+        _build_pack(settings, Path(args.root), Path(args.pack), args.pack_codec)
+    if merging is not None:
+        merging.join()
+    return 0 if all(r.ok for r in results) else 1
+
+
+def _build_pack(settings: SyncSettings, root: Path, out: Path, codec: str | None) -> None:
+    from .pack import write_pack
+    from .versions import published_trees
+
+    stats = write_pack(out, published_trees(settings.projects, root), root, codec)
+    mib = 2**20
+    log.info(
+        "📦 Packed %d file(s), %.1f MiB -> %.1f MiB, into %s (%d of %d frames reused)",
+        stats.files, stats.raw_bytes / mib, stats.packed_bytes / mib, out,
+        stats.reused, stats.frames,
+    )
+
+
+def _update_index(
+    settings: SyncSettings, root: Path, index_dir: Path, rebuild: bool = False
+) -> None:
+    from .chunker import ChunkCache
+    from .index import update_index
+    from .versions import published_trees
+
+    chunks = ChunkCache(root / settings.chunks if settings.chunks else None)
+    trees = published_trees(settings.projects, root)
+    stats = update_index(trees, root, index_dir, rebuild, chunks)
+    log.info(
+        "🔎 Indexed %d changed file(s) into %d section(s), tombstoned %d, "
+        "%d unchanged, %d segment(s), in %.2fs",
+        stats.documents, stats.sections, stats.deleted, stats.unchanged,
+        stats.segments, stats.seconds,
+    )
+
+
+def _update_tokens(
+    settings: SyncSettings,
+    root: Path,
+    exact: bool | None = None,
+    encoding: str | None = None,
+    rebuild: bool = False,
+) -> None:
+    from .chunker import ChunkCache
+    from .tokens import DEFAULT_ENCODING, update_token_counts
+    from .versions import published_trees
+
+    assert settings.tokens
+    chunks = ChunkCache(root / settings.chunks if settings.chunks else None)
+    stats = update_token_counts(
+        published_trees(settings.projects, root), root, root / settings.tokens, chunks,
+        exact, encoding or DEFAULT_ENCODING, rebuild,
+    )
+    log.info(
+        "🧮 Counted tokens of %d changed page(s), dropped %d; %d page(s), %d section(s), "
+        "%d token(s) in total, in %.2fs",
+        stats.counted, stats.removed, stats.pages, stats.sections, stats.tokens, stats.seconds,
+    )
+
+
+def _cmd_tokens(args: argparse.Namespace) -> int:
+    from .tokens import DEFAULT_ESTIMATOR, TokenCounts
+    from .versions import published_trees
+
+    settings = load_config(args.config)
+    if args.sidecar:
+        settings = replace(settings, tokens=args.sidecar)
+    if not settings.tokens:
+        raise ConfigError("no token sidecar configured (set sync.tokens or pass --sidecar)")
+    root = Path(args.root)
+    exact = True if args.encoding and args.exact is None else args.exact
+    _update_tokens(settings, root, exact, args.encoding, args.rebuild)
+    counts = TokenCounts.load(root / settings.tokens)
+    for project, manifest in published_trees(settings.projects, root):
+        pages = sections = total = 0
+        for f in manifest.files:
+            rows = counts.pages.get(f.sha256) if f.path.endswith(".md") else None
+            if rows is not None:
+                pages += 1
+                sections += len(rows)
+                total += sum(row[3] for row in rows)
+        print(f"{project.name:<24} {pages:>6} pages {sections:>7} sections {total:>11,} tokens")
+    if counts.encoding is None:
+        print(f"estimated ({1 / DEFAULT_ESTIMATOR.ascii:.1f} ASCII bytes per token)")
+        return 0
+    rows = [row for page in counts.pages.values() for row in page]
+    error = sum(abs(counts.estimator.estimate_sizes(r[1], r[2]) - r[3]) for r in rows)
+    print(
+        f"exact ({counts.encoding}); calibrated estimator: "
+        f"{1 / counts.estimator.ascii:.2f} ASCII / {1 / counts.estimator.other:.2f} other "
+        f"bytes per token, absolute error {error / max(1, sum(r[3] for r in rows)):.1%}"
+    )
+    return 0
+
+
+def _index_dir(args: argparse.Namespace, settings: SyncSettings) -> Path:
+    location = args.index or settings.index
+    if not location:
+        raise ConfigError("no search index configured (set sync.index or pass --index)")
+    return Path(args.root) / location
+
+
+def _cmd_index(args: argparse.Namespace) -> int:
+    from .index import merge_segments
+
+    settings = load_config(args.config)
+    index_dir = _index_dir(args, settings)
+    _update_index(settings, Path(args.root), index_dir, args.rebuild)
+    merge_segments(index_dir)
+    return 0
+
+
+def _cmd_search(args: argparse.Namespace) -> int:
+    from .index import SearchIndex
+
+    settings = load_config(args.config)
+    start = time.monotonic()
+    with SearchIndex(_index_dir(args, settings)) as index:
+        loaded = time.monotonic()
+        hits = index.search(" ".join(args.query), args.limit, args.project)
+        elapsed = time.monotonic() - loaded
+        if args.json:
+            for hit in hits:
+                s = hit.section
+                print(json.dumps({
+                    "score": round(hit.score, 4),
+                    "project": s.project,
+                    "path": s.path,
+                    "title": s.title,
+                    "anchor": s.anchor,
+                    "breadcrumbs": list(s.breadcrumbs),
+                    "offset": s.offset,
+                    "length": s.length,
+                }))
+            return 0
+        for hit in hits:
+            s = hit.section
+            where = f"{index.dests[s.project]}/{s.path}" + (f"#{s.anchor}" if s.anchor else "")
+            print(f"{hit.score:6.2f}  {where}")
+            if s.title:
+                print(f"        {' › '.join(s.breadcrumbs + (s.title,))}")
+            print(f"        {index.snippet(Path(args.root), hit)}")
+    log.info(
+        "%d hit(s) in %.1f ms (index opened in %.1f ms)",
+        len(hits), elapsed * 1000, (loaded - start) * 1000,
+    )
+    return 0
+
+
+def _cmd_serve(args: argparse.Namespace) -> int:
+    from .mcp_server import DocsService, build_server
+
+    if args.transport == "stdio":
+        # stdout carries the protocol; keep log lines off it.
+        _log_to_stderr()
+    settings = load_config(args.config)
+    service = DocsService(
+        settings,
+        Path(args.root),
+        _index_dir(args, settings),
+        Path(args.corpus) if args.corpus else None,
+        args.cache_entries,
+    )
+    server = build_server(service)
+    log.info("🛰️  Serving %s over %s", ", ".join(service.stats()["projects"]), args.transport)
+    try:
+        if args.transport == "stdio":
+            server.run(transport="stdio")
+        else:
+            server.run(transport="streamable-http", host=args.host, port=args.port)
+    finally:
+        log.info("%s", json.dumps(service.stats()["latency"]))
+    return 0
+
+
+def _log_to_stderr() -> None:
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.StreamHandler):
+            handler.setStream(sys.stderr)
+
+
+def _cmd_context(args: argparse.Namespace) -> int:
+    from .mcp_server import DocsService
+    from .packer import ContextPacker
+
+    if not args.query and not args.page:
+        raise ConfigError("give a query, --page, or both")
+    _log_to_stderr()  # stdout carries the packed context
+    settings = load_config(args.config)
+    service = DocsService(
+        settings, Path(args.root), _index_dir(args, settings),
+        Path(args.corpus) if args.corpus else None,
+    )
+    packer = ContextPacker(service)
+    start = time.monotonic()
+    if args.query:
+        query = " ".join(args.query)
+        limit = service.index().total if args.page else args.candidates
+        candidates = packer.query_candidates(query, args.project, limit)
+        if args.page:
+            # Rank only the sections of the given pages.
+            pages = {tuple(p.partition("#")[0].split("/", 1)) for p in args.page}
+            candidates = [c for c in candidates if (c.project, c.path) in pages]
+    else:
+        try:
+            candidates = packer.page_candidates(args.page)
+        except KeyError as exc:
+            raise ConfigError(exc.args[0]) from None
+    packed = packer.pack(candidates, args.budget, args.similarity)
+    elapsed = time.monotonic() - start
+    if args.json:
+        for s in packed.sections:
+            print(json.dumps({
+                "project": s.project,
+                "path": s.path,
+                "anchor": s.anchor,
+                "title": s.title,
+                "breadcrumbs": list(s.breadcrumbs),
+                "score": round(s.score, 4),
+                "tokens": s.tokens,
+                "text": s.text,
+            }))
+    else:
+        sys.stdout.write(packed.render())
+    log.info(
+        "🧳 Packed %d of %d section(s) into ~%d of %d tokens in %.1f ms "
+        "(%d translation(s), %d near-duplicate(s), %d over budget)",
+        len(packed.sections), packed.candidates, packed.tokens, packed.budget,
+        elapsed * 1000, packed.translations, packed.duplicates, packed.too_large,
+    )
+    return 0
+
+
+def _cmd_pack(args: argparse.Namespace) -> int:
+    from .pack import PackReader
+
+    if args.action == "build":
+        _build_pack(load_config(args.config), Path(args.root), Path(args.pack), args.codec)
+        return 0
+    with PackReader(args.pack) as pack:
+        if args.action == "ls":
+            for entry in pack:
+                print(f"{entry.size:>9}  {entry.project}  {entry.path}")
+            return 0
+        if args.project is None or args.path is None:
+            raise ConfigError("pack cat needs a project and a path")
+        try:
+            data = pack.read(args.project, args.path)
+        except KeyError:
+            raise FileNotFoundError(f"{args.project}/{args.path} is not in {args.pack}") from None
+    sys.stdout.buffer.write(data)
+    return 0
+
+
+def _cmd_metrics_summary(args: argparse.Namespace) -> int:
+    print(to_markdown(json.loads(Path(args.metrics).read_text())), end="")
+    return 0
+
+
+def _cmd_bench(args: argparse.Namespace) -> int:
+    from .bench import (
+        FixtureSpec,
+        format_drill,
+        format_report,
+        report_json,
+        run_benchmark,
+        run_fault_drill,
+    )
+
+    spec = FixtureSpec(
+        files=args.files,
+        commits=args.commits,
+        binaries=args.binaries,
+        binary_kb=args.binary_kb,
+    )
+    logging.getLogger("docsync").setLevel(logging.WARNING)
+    if args.faults:
+        drill = run_fault_drill(spec)
+        print(format_drill(drill))
+        healthy = all(d.status == "ok" for d in drill if d.project != "hung")
+        return 0 if healthy and any(d.status != "ok" for d in drill) else 1
+    runs = run_benchmark(spec, tuple(args.strategy) if args.strategy else FETCH_MODES)
+    print(report_json(runs) if args.json else format_report(runs))
+    return 0
+
+
+def _cmd_store(args: argparse.Namespace) -> int:
+    settings = load_config(args.config)
+    root = Path(args.root)
+    location = args.store or settings.store
+    if not location:
+        raise ConfigError("no object store configured (set sync.store or pass --store)")
+    store = BlobStore(root / location)
+    if args.action == "dedupe":
+        linked = 0
+        for project in settings.select([]):
+            dest = root / project.dest
+            manifest = load_manifest(dest)
+            if manifest is None:
+                continue
+            for entry in manifest.files:
+                path = dest / entry.path
+                if path.is_symlink() or not path.is_file():
+                    continue
+                if file_sha256(path) != entry.sha256:
+                    log.warning("[%s] ⚠️  %s differs from its manifest, skipped", project.name, entry.path)
+                    continue
+                store.install(path, entry.sha256, path)
+                linked += 1
+        log.info("🔗 Linked %d file(s) from %s", linked, location)
+    elif args.action == "gc":
+        log.info("🧹 Removed %d unreferenced object(s)", store.gc())
+    stats = store.stats()
+    mib = 2**20
+    print(
+        f"objects: {stats.objects}  unique: {stats.bytes / mib:.1f} MiB  "
+        f"links: {stats.links}  linked: {stats.linked_bytes / mib:.1f} MiB"
+    )
+    return 0
+
+
+def _cmd_rollback(args: argparse.Namespace) -> int:
+    settings = load_config(args.config)
+    projects = settings.select(args.projects)
+    for project in projects:
+        prev = publish.previous_path(Path(args.root) / project.dest)
+        if not prev.is_dir():
+            raise FileNotFoundError(f"no previous generation to roll back to: {prev}")
+    for project in projects:
+        publish.rollback(Path(args.root) / project.dest)
+        log.info("[%s] ↩️  Rolled back %s to its previous generation", project.name, project.dest)
+    return 0
+
+
+def _cmd_sync_one(args: argparse.Namespace) -> int:
+    project = Project(
+        name=Path(args.repo).name.removesuffix(".git"),
+        repo=args.repo,
+        branch=args.branch,
+        dest=args.dest,
+        sparse=SparseSpec.from_patterns(args.patterns),
+    )
+    settings = SyncSettings(
+        jobs=1,
+        fetch_mode=args.fetch_mode or "full",
+        cache_dir=args.cache_dir,
+        cache_max_mb=args.cache_max_mb,
+        retry=RetryPolicy(
+            attempts=args.attempts or RetryPolicy.attempts,
+            timeout=args.timeout or RetryPolicy.timeout,
+        ),
+        force=args.force,
+    )
+    results = sync_all([project], Path(args.root), settings)
+    return 0 if results[0].ok else 1
+
+
+def _add_sync_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--cache-dir",
+        default=os.environ.get("DOCSYNC_CACHE_DIR") or None,
+        help="reuse checkouts from this directory between runs (env: DOCSYNC_CACHE_DIR)",
+    )
+    p.add_argument("--cache-max-mb", type=int, help="evict least recently used entries above this size")
+    p.add_argument(
+        "--force", action="store_true", help="sync even if the upstream commit is unchanged"
+    )
+    p.add_argument("--attempts", type=int, help="tries per network operation (default: sync.attempts)")
+    p.add_argument("--timeout", type=float, help="seconds before a git network call is killed")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="docsync", description=__doc__)
+    parser.add_argument("--root", default=".", help="repository root (default: cwd)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("sync", help="sync projects from the config file")
+    p.add_argument("projects", nargs="*", help="project names (default: all)")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.add_argument("-j", "--jobs", type=int, help="parallel fetches (default: from config)")
+    p.add_argument("--fetch-mode", choices=FETCH_MODES, help="override sync.fetch_mode")
+    _add_sync_args(p)
+    p.add_argument("--feed", help="write a JSON Lines feed of changed paths to this file")
+    p.add_argument("--store", help="hardlink files from this object store (default: sync.store)")
+    p.add_argument("--no-store", action="store_true", help="copy files instead of linking them")
+    p.add_argument("--metrics-json", help="write per-phase metrics as JSON to this file")
+    p.add_argument("--metrics-prom", help="write per-phase metrics as a Prometheus textfile")
+    p.add_argument("--no-index", action="store_true", help="skip updating the search index")
+    p.add_argument("--pack", help="also write every synced tree into this single-file pack")
+    p.add_argument("--pack-codec", choices=CODECS, help="pack compression (default: zstd if available)")
+    p.set_defaults(func=_cmd_sync)
+
+    p = sub.add_parser("metrics-summary", help="render a metrics JSON file as Markdown")
+    p.add_argument("metrics", help="file written by sync --metrics-json")
+    p.set_defaults(func=_cmd_metrics_summary)
+
+    p = sub.add_parser("store", help="inspect or maintain the content-addressed object store")
+    p.add_argument("action", choices=("stats", "dedupe", "gc"))
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.add_argument("--store", help="object store directory (default: sync.store)")
+    p.set_defaults(func=_cmd_store)
+
+    p = sub.add_parser("index", help="update the BM25 search index from the synced trees")
+    p.add_argument("--rebuild", action="store_true", help="reindex every file from scratch")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.add_argument("--index", help="index directory (default: sync.index)")
+    p.set_defaults(func=_cmd_index)
+
+    p = sub.add_parser("tokens", help="update and summarize the per-section token counts")
+    mode = p.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--exact", action="store_true", default=None,
+        help="count with a real tokenizer (needs tiktoken) and calibrate the estimator",
+    )
+    mode.add_argument(
+        "--estimate", dest="exact", action="store_false", help="switch back to byte estimates"
+    )
+    p.add_argument("--encoding", help="tiktoken encoding for --exact (default: o200k_base)")
+    p.add_argument("--rebuild", action="store_true", help="recount every page from scratch")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.add_argument("--sidecar", help="token count file (default: sync.tokens)")
+    p.set_defaults(func=_cmd_tokens)
+
+    p = sub.add_parser("search", help="rank synced markdown sections for a query")
+    p.add_argument("query", nargs="+")
+    p.add_argument("-n", "--limit", type=int, default=10, help="number of hits (default: 10)")
+    p.add_argument("--project", help="only search this project")
+    p.add_argument("--json", action="store_true", help="print hits as JSON Lines")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.add_argument("--index", help="index directory (default: sync.index)")
+    p.set_defaults(func=_cmd_search)
+
+    p = sub.add_parser("serve", help="serve search and pages to agents over MCP")
+    p.add_argument("--transport", choices=("stdio", "streamable-http"), default="stdio")
+    p.add_argument("--host", default=os.getenv("STREAMABLE_HTTP_HOST", "127.0.0.1"))
+    p.add_argument("--port", type=int, default=int(os.getenv("STREAMABLE_HTTP_PORT", "18080")))
+    p.add_argument("--corpus", help="read pages from this memory-mapped pack instead of the tree")
+    p.add_argument("--cache-entries", type=int, default=2048, help="parsed pages kept in memory")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.add_argument("--index", help="index directory (default: sync.index)")
+    p.set_defaults(func=_cmd_serve)
+
+    p = sub.add_parser("context", help="pack the best sections for a query into a token budget")
+    p.add_argument("query", nargs="*")
+    p.add_argument(
+        "--page", action="append", default=[], metavar="PROJECT/PATH[#ANCHOR]",
+        help="pack these pages in order (with a query: rank only their sections)",
+    )
+    p.add_argument("-b", "--budget", type=int, default=8000, help="token budget (default: 8000)")
+    p.add_argument("--project", help="only use this project")
+    p.add_argument("--candidates", type=int, default=200, help="search hits to consider")
+    p.add_argument(
+        "--similarity", type=float, default=0.8,
+        help="drop sections at least this similar to a packed one (default: 0.8)",
+    )
+    p.add_argument("--json", action="store_true", help="print packed sections as JSON Lines")
+    p.add_argument("--corpus", help="read pages from this memory-mapped pack instead of the tree")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.add_argument("--index", help="index directory (default: sync.index)")
+    p.set_defaults(func=_cmd_context)
+
+    p = sub.add_parser("pack", help="build or read a single-file corpus pack")
+    p.add_argument("action", choices=("build", "ls", "cat"))
+    p.add_argument("pack", help="pack file")
+    p.add_argument("project", nargs="?", help="project of the document to print (cat)")
+    p.add_argument("path", nargs="?", help="path of the document within the project (cat)")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.add_argument("--codec", choices=CODECS, help="compression (default: zstd if available)")
+    p.set_defaults(func=_cmd_pack)
+
+    p = sub.add_parser("rollback", help="swap projects back to their previous sync")
+    p.add_argument("projects", nargs="+", help="project names")
+    p.add_argument("--config", default=DEFAULT_CONFIG, help="path to projects.toml")
+    p.set_defaults(func=_cmd_rollback)
+
+    p = sub.add_parser("bench", help="benchmark sync strategies on a synthetic local repo")
+    p.add_argument("--files", type=int, default=3000, help="markdown files in the fixture")
+    p.add_argument("--commits", type=int, default=300, help="commits of history")
+    p.add_argument("--binaries", type=int, default=8, help="large excluded binaries")
+    p.add_argument("--binary-kb", type=int, default=2048, help="size of each binary")
+    p.add_argument("--strategy", action="append", choices=FETCH_MODES, help="repeatable")
+    p.add_argument("--json", action="store_true", help="print results as JSON")
+    p.add_argument(
+        "--faults",
+        action="store_true",
+        help="instead, sync over a local HTTP git server that injects latency and failures",
+    )
+    p.set_defaults(func=_cmd_bench)
+
+    p = sub.add_parser("sync-one", help="sync a single ad-hoc repository")
+    p.add_argument("repo")
+    p.add_argument("branch")
+    p.add_argument("dest")
+    p.add_argument("patterns", nargs="*")
+    p.add_argument("--fetch-mode", choices=FETCH_MODES, help="full (default) or partial")
+    _add_sync_args(p)
+    p.set_defaults(func=_cmd_sync_one)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (ConfigError, FileNotFoundError) as exc:
+        log.error("error: %s", exc)
+        return 2
@@ -0,0 +1,301 @@
+"""Loading and validation of the project registry, ``projects.toml``."""
+
+from __future__ import annotations
+
+import re
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from .hooks import HOOKS
+from .retry import RetryPolicy
+from .sparse import SparseSpec, is_glob
+
+DEFAULT_CONFIG = Path(__file__).resolve().parent.parent / "projects.toml"
+DEFAULT_JOBS = 4
+FETCH_MODES = ("full", "partial")
+
+_NAME_RE = re.compile(r"^[a-z0-9][a-z0-9._-]*$")
+_PROJECT_KEYS = {
+    "name", "repo", "branch", "dest", "include", "exclude", "patterns", "hooks", "versions",
+}
+_VERSION_KEYS = {"tags", "keep", "dest", "prereleases"}
+_SYNC_KEYS = {
+    "jobs", "fetch_mode", "cache_max_mb", "store", "index", "chunks", "tokens", "attempts",
+    "timeout", "backoff",
+}
+
+
+class ConfigError(ValueError):
+    """Raised when the project configuration is missing or malformed."""
+
+
+@dataclass(frozen=True)
+class HookSpec:
+    """A post-processing hook reference and its options."""
+
+    name: str
+    options: dict[str, Any] = field(default_factory=dict, hash=False)
+
+
+@dataclass(frozen=True)
+class VersionSpec:
+    """Which release tags of a project are mirrored side by side."""
+
+    tags: str
+    keep: int
+    dest: str
+    prereleases: bool = False
+
+
+@dataclass(frozen=True)
+class Project:
+    """A single upstream repository mirrored into ``dest``.
+
+    ``tag`` is set on the per-release snapshots derived from ``versions``;
+    those track the tag instead of ``branch``.
+    """
+
+    name: str
+    repo: str
+    branch: str
+    dest: str
+    sparse: SparseSpec
+    hooks: tuple[HookSpec, ...] = ()
+    versions: VersionSpec | None = None
+    tag: str | None = None
+
+    @property
+    def patterns(self) -> tuple[str, ...]:
+        """The sparse-checkout patterns the include/exclude rules compile to."""
+        return self.sparse.patterns
+
+    @property
+    def ref(self) -> str:
+        """The upstream ref this project tracks."""
+        return f"refs/tags/{self.tag}" if self.tag else f"refs/heads/{self.branch}"
+
+    @property
+    def tracking_ref(self) -> str:
+        """The local ref the upstream ref is fetched into."""
+        return f"refs/tags/{self.tag}" if self.tag else f"refs/remotes/origin/{self.branch}"
+
+
+@dataclass(frozen=True)
+class SyncSettings:
+    """Top-level settings shared by every project."""
+
+    jobs: int = DEFAULT_JOBS
+    fetch_mode: str = "full"
+    cache_dir: str | None = None
+    cache_max_mb: int | None = None
+    scratch_dir: str | None = None
+    store: str | None = None
+    index: str | None = None
+    chunks: str | None = None
+    tokens: str | None = None
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    force: bool = False
+    projects: tuple[Project, ...] = field(default_factory=tuple)
+
+    def select(self, names: list[str]) -> list[Project]:
+        """Return the projects named in ``names``, or all of them if empty."""
+        if not names:
+            return list(self.projects)
+        by_name = {p.name: p for p in self.projects}
+        unknown = [n for n in names if n not in by_name]
+        if unknown:
+            raise ConfigError(f"unknown project(s): {', '.join(unknown)}")
+        return [by_name[n] for n in names]
+
+
+def _require_str(entry: dict, key: str, where: str) -> str:
+    value = entry.get(key)
+    if not isinstance(value, str) or not value:
+        raise ConfigError(f"{where}: '{key}' must be a non-empty string")
+    return value
+
+
+def _str_list(entry: dict, key: str, where: str) -> list[str]:
+    value = entry.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(v, str) and v for v in value):
+        raise ConfigError(f"{where}: '{key}' must be a list of non-empty strings")
+    return value
+
+
+def _check_rule(rule: str, key: str, where: str) -> None:
+    if rule.startswith(("/", "!")) or "\\" in rule:
+        raise ConfigError(f"{where}: {key} rule {rule!r} must be a plain repo-relative path or glob")
+    parts = rule.rstrip("/").split("/")
+    if any(p in ("", ".", "..") for p in parts):
+        raise ConfigError(f"{where}: {key} rule {rule!r} has an empty or relative segment")
+    if is_glob(rule) and rule.endswith("/"):
+        raise ConfigError(f"{where}: {key} rule {rule!r} cannot be both a glob and a directory")
+
+
+def _sparse(entry: dict, where: str) -> SparseSpec:
+    if "patterns" in entry:
+        if "include" in entry or "exclude" in entry:
+            raise ConfigError(f"{where}: use either 'patterns' or 'include'/'exclude', not both")
+        spec = SparseSpec.from_patterns(_str_list(entry, "patterns", where))
+    else:
+        spec = SparseSpec(
+            tuple(_str_list(entry, "include", where)),
+            tuple(_str_list(entry, "exclude", where)),
+        )
+    if not spec.include:
+        raise ConfigError(f"{where}: at least one 'include' rule is required")
+    for rule in spec.include:
+        _check_rule(rule, "include", where)
+    for rule in spec.exclude:
+        _check_rule(rule, "exclude", where)
+        probe = rule + "x" if rule.endswith("/") else rule
+        if not is_glob(rule) and not any(SparseSpec((inc,)).selects(probe) for inc in spec.include):
+            raise ConfigError(f"{where}: exclude rule {rule!r} is not inside any include rule")
+    return spec
+
+
+def _hooks(entry: dict, where: str) -> tuple[HookSpec, ...]:
+    raw = entry.get("hooks", [])
+    if not isinstance(raw, list):
+        raise ConfigError(f"{where}: 'hooks' must be a list")
+    specs = []
+    for item in raw:
+        if isinstance(item, str):
+            item = {"name": item}
+        if not isinstance(item, dict) or not isinstance(item.get("name"), str):
+            raise ConfigError(f"{where}: each hook must be a name or a table with a 'name'")
+        options = {k: v for k, v in item.items() if k != "name"}
+        if item["name"] not in HOOKS:
+            known = ", ".join(sorted(HOOKS)) or "none"
+            raise ConfigError(f"{where}: unknown hook {item['name']!r} (known: {known})")
+        specs.append(HookSpec(item["name"], options))
+    return tuple(specs)
+
+
+def _dest(entry: dict, where: str, key: str = "dest") -> str:
+    dest = _require_str(entry, key, where)
+    path = PurePosixPath(dest)
+    if path.is_absolute() or ".." in path.parts or path.name.startswith("."):
+        raise ConfigError(f"{where}: '{key}' must be a relative path inside the repository")
+    return path.as_posix()
+
+
+def _versions(entry: dict, dest: str, where: str) -> VersionSpec | None:
+    raw = entry.get("versions")
+    if raw is None:
+        return None
+    where = f"{where}: versions"
+    if not isinstance(raw, dict):
+        raise ConfigError(f"{where}: must be a table")
+    unknown = set(raw) - _VERSION_KEYS
+    if unknown:
+        raise ConfigError(f"{where}: unknown key(s): {', '.join(sorted(unknown))}")
+    keep = raw.get("keep", 3)
+    if not isinstance(keep, int) or keep < 1:
+        raise ConfigError(f"{where}: 'keep' must be a positive integer")
+    prereleases = raw.get("prereleases", False)
+    if not isinstance(prereleases, bool):
+        raise ConfigError(f"{where}: 'prereleases' must be true or false")
+    return VersionSpec(
+        tags=_require_str(raw, "tags", where),
+        keep=keep,
+        dest=_dest(raw, where) if "dest" in raw else f"{dest}-versions",
+        prereleases=prereleases,
+    )
+
+
+def _project(entry: Any, where: str) -> Project:
+    if not isinstance(entry, dict):
+        raise ConfigError(f"{where}: must be a table")
+    unknown = set(entry) - _PROJECT_KEYS
+    if unknown:
+        raise ConfigError(f"{where}: unknown key(s): {', '.join(sorted(unknown))}")
+    name = _require_str(entry, "name", where)
+    if not _NAME_RE.match(name):
+        raise ConfigError(f"{where}: name {name!r} must be lowercase letters, digits, '.', '_' or '-'")
+    repo = _require_str(entry, "repo", where)
+    if not re.match(r"^(https|ssh|git|file)://", repo):
+        raise ConfigError(f"{where}: repo {repo!r} must be an https://, ssh://, git:// or file:// URL")
+    dest = _dest(entry, where)
+    return Project(
+        name=name,
+        repo=repo,
+        branch=_require_str(entry, "branch", where),
+        dest=dest,
+        sparse=_sparse(entry, where),
+        hooks=_hooks(entry, where),
+        versions=_versions(entry, dest, where),
+    )
+
+
+def load_config(path: str | Path = DEFAULT_CONFIG) -> SyncSettings:
+    """Parse and validate ``path`` into :class:`SyncSettings`."""
+    path = Path(path)
+    try:
+        with path.open("rb") as fh:
+            data = tomllib.load(fh)
+    except FileNotFoundError:
+        raise ConfigError(f"config file not found: {path}") from None
+    except tomllib.TOMLDecodeError as exc:
+        raise ConfigError(f"{path}: {exc}") from None
+
+    projects: list[Project] = []
+    for i, entry in enumerate(data.get("project", [])):
+        projects.append(_project(entry, f"{path}: project #{i + 1}"))
+
+    names = [p.name for p in projects]
+    for name in {n for n in names if names.count(n) > 1}:
+        raise ConfigError(f"{path}: duplicate project name '{name}'")
+    dests = sorted(
+        PurePosixPath(d)
+        for p in projects
+        for d in (p.dest, p.versions.dest if p.versions else None)
+        if d is not None
+    )
+    for a, b in zip(dests, dests[1:]):
+        if a == b or a in b.parents:
+            raise ConfigError(f"{path}: destinations '{a}' and '{b}' overlap")
+
+    sync = data.get("sync", {})
+    unknown = set(sync) - _SYNC_KEYS
+    if unknown:
+        raise ConfigError(f"{path}: unknown [sync] key(s): {', '.join(sorted(unknown))}")
+    jobs = sync.get("jobs", DEFAULT_JOBS)
+    if not isinstance(jobs, int) or jobs < 1:
+        raise ConfigError(f"{path}: 'sync.jobs' must be a positive integer")
+    fetch_mode = sync.get("fetch_mode", "full")
+    if fetch_mode not in FETCH_MODES:
+        raise ConfigError(f"{path}: 'sync.fetch_mode' must be one of {', '.join(FETCH_MODES)}")
+    cache_max_mb = sync.get("cache_max_mb")
+    if cache_max_mb is not None and (not isinstance(cache_max_mb, int) or cache_max_mb < 1):
+        raise ConfigError(f"{path}: 'sync.cache_max_mb' must be a positive integer")
+    for key in ("store", "index", "chunks", "tokens"):
+        value = sync.get(key)
+        if value is not None and (not isinstance(value, str) or not value):
+            raise ConfigError(f"{path}: 'sync.{key}' must be a non-empty path")
+    defaults = RetryPolicy()
+    attempts = sync.get("attempts", defaults.attempts)
+    if not isinstance(attempts, int) or attempts < 1:
+        raise ConfigError(f"{path}: 'sync.attempts' must be a positive integer")
+    for key in ("timeout", "backoff"):
+        value = sync.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+            raise ConfigError(f"{path}: 'sync.{key}' must be a positive number of seconds")
+    policy = RetryPolicy(
+        attempts=attempts,
+        timeout=float(sync.get("timeout", defaults.timeout)),
+        base_delay=float(sync.get("backoff", defaults.base_delay)),
+    )
+    return SyncSettings(
+        jobs=jobs,
+        fetch_mode=fetch_mode,
+        cache_max_mb=cache_max_mb,
+        store=sync.get("store"),
+        index=sync.get("index"),
+        chunks=sync.get("chunks"),
+        tokens=sync.get("tokens"),
+        retry=policy,
+        projects=tuple(projects),
+    )
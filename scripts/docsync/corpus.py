@@ -0,0 +1,110 @@
+"""Read-only, memory-mapped access to a corpus pack.
+
+A :class:`Corpus` maps a pack file (see :mod:`docsync.pack`) once and hands
+out ``memoryview`` slices of the mapping. Built with ``--codec none``, the
+documents are stored verbatim, so lookups copy nothing and every process
+that opens the same file shares one set of page-cache pages::
+
+    with Corpus("agent-docs.corpus") as corpus:
+        page = corpus.get("pydantic/docs/concepts/models.md")
+        for path, body in corpus.iter("fastapi"):
+            ...
+
+Compressed packs, such as the zstd pack the sync writes by default, can be
+opened too, but each lookup then decompresses into a private buffer.
+Release every view before closing the corpus; ``mmap`` refuses to close
+while slices are still exported.
+"""
+
+from __future__ import annotations
+
+import mmap
+from pathlib import Path
+from typing import Any, Iterator
+
+from .pack import MAGIC, TRAILER, PackEntry, decompressor, locate_index, parse_index
+
+
+class Corpus:
+    """A pack mapped into memory; documents are addressed as ``"<project>/<path>"``."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as fh:
+            self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            if self._view[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{self.path} is not a docsync pack")
+            offset, length = locate_index(self._view[-TRAILER.size :])
+            index = parse_index(self._view[offset : offset + length])
+        except BaseException:
+            self.close()
+            raise
+        self.codec: str = index["codec"]
+        self.created: str = index["created"]
+        self._projects: dict[str, dict[str, Any]] = index["projects"]
+        self._entries: dict[str, PackEntry] = {
+            f"{e.project}/{e.path}": e for e in index["files"]
+        }
+        self._by_project: dict[str, list[PackEntry]] = {}
+        for entry in index["files"]:
+            self._by_project.setdefault(entry.project, []).append(entry)
+        self._decompress = None if self.codec == "none" else decompressor(self.codec)
+
+    def __enter__(self) -> Corpus:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+
+    @property
+    def zero_copy(self) -> bool:
+        """Whether :meth:`get` returns slices of the mapping itself."""
+        return self._decompress is None
+
+    def _body(self, entry: PackEntry) -> memoryview:
+        frame = self._view[entry.offset : entry.offset + entry.length]
+        if self._decompress is None:
+            return frame
+        with frame:
+            return memoryview(self._decompress(frame))
+
+    def get(self, path: str) -> memoryview:
+        """The bytes of ``"<project>/<path>"``; raises ``KeyError`` if absent."""
+        return self._body(self._entries[path])
+
+    def text(self, path: str) -> str:
+        """Decoded UTF-8 text of a document (a private copy)."""
+        with self.get(path) as body:
+            return str(body, "utf-8")
+
+    def iter(self, project: str) -> Iterator[tuple[str, memoryview]]:
+        """Yield ``(path, bytes)`` for every document of ``project``, in pack order."""
+        for entry in self._by_project.get(project, ()):
+            yield entry.path, self._body(entry)
+
+    def metadata(self, path: str) -> PackEntry:
+        """Size, SHA-256 and location of a document, without touching its bytes."""
+        return self._entries[path]
+
+    def project(self, name: str) -> dict[str, Any]:
+        """Source metadata of a project: dest, repo, branch, tag, commit, synced_at."""
+        return self._projects[name]
+
+    @property
+    def projects(self) -> list[str]:
+        return list(self._projects)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
@@ -0,0 +1,349 @@
+"""Fetch upstream repositories concurrently and copy their docs into place."""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+from . import publish, versions
+from .cache import MirrorCache
+from .config import Project, SyncSettings
+from .git import git, object_stats, timeout
+from .hooks import HOOK_CACHE, HookContext, run_hooks
+from .manifest import (
+    MANIFEST, Manifest, file_entries, hooks_fingerprint, load_manifest, write_manifest,
+)
+from .reconcile import TreeDiff, collect_files, reconcile, write_text_atomic
+from .retry import retry
+from .store import BlobStore
+
+log = logging.getLogger("docsync")
+
+T = TypeVar("T")
+
+SYNC_INFO = ".sync-info.md"
+MANAGED_FILES = frozenset({SYNC_INFO, MANIFEST})
+
+
+@dataclass
+class SyncResult:
+    """Outcome of syncing one project."""
+
+    project: Project
+    seconds: float = 0.0
+    error: str | None = None
+    skipped: bool = False
+    commit: str | None = None
+    previous_commit: str | None = None
+    diff: TreeDiff | None = None
+    spans: list[tuple[str, float, float]] = field(default_factory=list)
+    counters: dict[str, dict[str, int]] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def phases(self) -> dict[str, float]:
+        """Seconds spent in each phase, in the order the phases ran."""
+        return {name: end - begin for name, begin, end in self.spans}
+
+    def count(self, phase: str, counter: str, value: int) -> None:
+        """Add ``value`` to ``counter`` of ``phase``."""
+        counters = self.counters.setdefault(phase, {})
+        counters[counter] = counters.get(counter, 0) + value
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the monotonic start and end time of the enclosed block."""
+        begin = time.monotonic()
+        try:
+            yield
+        finally:
+            self.spans.append((name, begin, time.monotonic()))
+
+
+def remote_head(project: Project) -> str:
+    """Resolve the tracked ref's commit with a single ``ls-remote`` round trip."""
+    refs = {}
+    for line in git("ls-remote", project.repo, project.ref).splitlines():
+        sha, _, name = line.partition("\t")
+        refs[name] = sha
+    # Annotated tags are listed twice; the peeled ``^{}`` entry is the commit.
+    sha = refs.get(project.ref + "^{}") or refs.get(project.ref)
+    if sha is None:
+        raise RuntimeError(f"{project.ref} not found in {project.repo}")
+    return sha
+
+
+def _prepare_repo(project: Project, workdir: Path) -> None:
+    """Initialise ``workdir`` as a checkout of ``project.repo``, or reuse it."""
+    if (workdir / ".git").is_dir():
+        git("remote", "set-url", "origin", project.repo, cwd=workdir)
+    else:
+        git("init", "--quiet", cwd=workdir)
+        git("remote", "add", "origin", project.repo, cwd=workdir)
+    git("config", "remote.origin.tagOpt", "--no-tags", cwd=workdir)
+
+
+def _update_worktree(project: Project, workdir: Path) -> None:
+    """Force the work tree to the fetched ref, dropping stray files."""
+    if project.tag:
+        git("checkout", "--quiet", "-f", "--detach", project.tracking_ref, cwd=workdir)
+    else:
+        git("checkout", "--quiet", "-f", "-B", project.branch, project.tracking_ref, cwd=workdir)
+    git("clean", "--quiet", "-ffdx", cwd=workdir)
+
+
+def _fetch(project: Project, workdir: Path) -> None:
+    """Fetch ``project.ref`` of ``project.repo`` into ``workdir``."""
+    _prepare_repo(project, workdir)
+    log.info("[%s] 📥 Fetching %s...", project.name, project.ref)
+    git("fetch", "--quiet", "origin", f"+{project.ref}:{project.tracking_ref}", cwd=workdir)
+    git("sparse-checkout", "set", "--no-cone", *project.patterns, cwd=workdir)
+
+
+def _fetch_partial(project: Project, workdir: Path) -> None:
+    """Blobless, depth-1 fetch of ``project`` into ``workdir``.
+
+    Only commits and trees are fetched; blobs are fetched lazily by the
+    checkout, and only for paths inside the sparse rules. The fetched trees
+    let exclusions be compiled into cone mode, which git evaluates much
+    faster than arbitrary patterns.
+    """
+    _prepare_repo(project, workdir)
+    git("config", "remote.origin.promisor", "true", cwd=workdir)
+    git("config", "remote.origin.partialclonefilter", "blob:none", cwd=workdir)
+
+    log.info("[%s] 📥 Fetching %s (depth 1, blob:none)...", project.name, project.ref)
+    refspec = f"+{project.ref}:{project.tracking_ref}"
+    git("fetch", "--quiet", "--depth=1", "--filter=blob:none", "origin", refspec, cwd=workdir)
+
+    def list_dirs(directory: str) -> list[str]:
+        tree = f"{project.tracking_ref}:{directory}"
+        return git("ls-tree", "-d", "--name-only", tree, cwd=workdir).splitlines()
+
+    cone = project.sparse.cone(list_dirs)
+    if cone is not None:
+        git("sparse-checkout", "set", "--cone", *cone, cwd=workdir)
+    else:
+        git("sparse-checkout", "set", "--no-cone", *project.patterns, cwd=workdir)
+    log.info("[%s] 📋 Using %s sparse checkout", project.name, "cone" if cone else "non-cone")
+
+
+def write_sync_info(project: Project, dest: Path, commit: str, now: datetime) -> None:
+    """Write the human-readable ``.sync-info.md`` metadata file."""
+    patterns = "\n".join(f"  - {p}" for p in project.patterns)
+    ref = f"- **Tag**: {project.tag}" if project.tag else f"- **Branch**: {project.branch}"
+    write_text_atomic(
+        dest / SYNC_INFO,
+        "# Sync Information\n"
+        "\n"
+        f"- **Source Repository**: {project.repo}\n"
+        f"{ref}\n"
+        f"- **Commit**: {commit}\n"
+        f"- **Last Synced**: {now:%Y-%m-%d %H:%M:%S UTC}\n"
+        "- **Sync Patterns**:\n"
+        f"{patterns}\n"
+        "\n"
+        "---\n"
+        "*This directory is automatically synced. Do not edit files directly.*\n",
+    )
+
+
+def _retrying(result: SyncResult, phase: str, settings: SyncSettings, fn: Callable[[], T]) -> T:
+    """Run the network operation ``fn`` under the configured timeout and retry policy."""
+    policy = settings.retry
+    with timeout(policy.timeout):
+        return retry(
+            fn,
+            policy,
+            f"[{result.project.name}] ⚠️  {phase}",
+            on_retry=lambda attempt, exc: result.count(phase, "retries", 1),
+        )
+
+
+def _count_transfer(
+    result: SyncResult, phase: str, before: tuple[int, int], after: tuple[int, int]
+) -> None:
+    result.count(phase, "objects_fetched", max(0, after[0] - before[0]))
+    result.count(phase, "bytes_received", max(0, after[1] - before[1]))
+
+
+@contextmanager
+def _workdir(project: Project, settings: SyncSettings, cache: MirrorCache | None) -> Iterator[Path]:
+    """Yield a scratch checkout directory, persistent if ``cache`` is set."""
+    if cache is None:
+        with tempfile.TemporaryDirectory(
+            prefix=f"docsync-{project.name}-", dir=settings.scratch_dir
+        ) as tmp:
+            yield Path(tmp)
+    else:
+        with cache.checkout(project.repo, settings.fetch_mode) as entry:
+            yield entry
+
+
+def sync_project(
+    project: Project,
+    root: Path,
+    settings: SyncSettings,
+    cache: MirrorCache | None = None,
+    store: BlobStore | None = None,
+) -> SyncResult:
+    """Sync a single project into ``root / project.dest``."""
+    result = SyncResult(project)
+    start = time.monotonic()
+    log.info("[%s] 🔄 Syncing %s to %s", project.name, project.repo, project.dest)
+    dest = root / project.dest
+    try:
+        with result.phase("probe"):
+            head = _retrying(result, "probe", settings, lambda: remote_head(project))
+            previous = load_manifest(dest)
+        result.previous_commit = previous.commit if previous is not None else None
+        if not settings.force and previous is not None and previous.is_current(project, head):
+            log.info("[%s] ⏭️  Up to date at %s, skipping", project.name, head[:12])
+            result.skipped = True
+            result.commit = head
+            result.seconds = time.monotonic() - start
+            return result
+        with (
+            _workdir(project, settings, cache) as workdir,
+            tempfile.TemporaryDirectory(
+                prefix=f"docsync-{project.name}-hooks-", dir=settings.scratch_dir
+            ) as scratch,
+        ):
+            before = object_stats(workdir) if (workdir / ".git").is_dir() else (0, 0)
+            with result.phase("fetch"):
+                fetch = _fetch_partial if settings.fetch_mode == "partial" else _fetch
+                _retrying(result, "fetch", settings, lambda: fetch(project, workdir))
+                after_fetch = object_stats(workdir)
+                _count_transfer(result, "fetch", before, after_fetch)
+            with result.phase("checkout"):
+                _retrying(result, "checkout", settings, lambda: _update_worktree(project, workdir))
+                result.commit = git("rev-parse", "HEAD", cwd=workdir).strip()
+                files = collect_files(workdir, project.sparse.selects)
+                # Partial clones fetch the sparse blobs lazily during checkout.
+                _count_transfer(result, "checkout", after_fetch, object_stats(workdir))
+            if not files:
+                log.warning("[%s] ⚠️  No files matched sparse-checkout patterns", project.name)
+            if project.hooks:
+                with result.phase("hooks"), timeout(settings.retry.timeout):
+                    ctx = HookContext(project, workdir, Path(scratch), result.commit, files, previous)
+                    ctx.cache_root = root / HOOK_CACHE
+                    ctx.policy = settings.retry
+                    run_hooks(ctx)
+            with result.phase("reconcile"):
+                staged = publish.stage(dest)
+                result.diff = reconcile(files, staged, keep=MANAGED_FILES, store=store)
+                diff = result.diff
+                result.count("reconcile", "files_written", len(diff.added) + len(diff.modified))
+                result.count("reconcile", "files_deleted", len(diff.deleted))
+                result.count("reconcile", "bytes_written", diff.bytes_written)
+            log.info("[%s] 📋 %s", project.name, result.diff.summary())
+            with result.phase("manifest"):
+                sizes = {rel: os.lstat(path).st_size for rel, path in files.items()}
+                entries = file_entries(workdir, sizes, result.diff.hashes, previous)
+                now = datetime.now(timezone.utc)
+                write_sync_info(project, staged, result.commit, now)
+                write_manifest(
+                    staged,
+                    Manifest(
+                        repo=project.repo,
+                        branch=project.branch,
+                        tag=project.tag,
+                        commit=result.commit,
+                        patterns=list(project.patterns),
+                        hooks=hooks_fingerprint(project),
+                        synced_at=now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        files=entries,
+                    ),
+                )
+            with result.phase("publish"):
+                publish.publish(dest)
+    except Exception as exc:  # reported per project, never aborts the pool
+        publish.discard(dest)
+        result.error = str(exc)
+        log.error("[%s] ❌ Sync failed: %s", project.name, exc)
+    else:
+        log.info("[%s] ✅ Sync completed", project.name)
+    result.seconds = time.monotonic() - start
+    return result
+
+
+def _snapshot_jobs(
+    projects: list[Project], root: Path, settings: SyncSettings, pool: ThreadPoolExecutor
+) -> tuple[list[Project], list[SyncResult]]:
+    """Discover release tags in parallel; return snapshots to sync and prune results."""
+    versioned = [p for p in projects if p.versions is not None]
+    pending: list[Project] = []
+    results: list[SyncResult] = []
+    for plan in pool.map(lambda p: versions.plan(p, root, settings), versioned):
+        spec = plan.project.versions
+        if plan.error is not None:
+            failed = replace(plan.project, name=f"{plan.project.name}@versions", dest=spec.dest)
+            results.append(SyncResult(failed, error=plan.error))
+            continue
+        pending.extend(plan.pending)
+        for tag in plan.stale:
+            result = SyncResult(versions.snapshot(plan.project, tag))
+            start = time.monotonic()
+            try:
+                result.diff, result.previous_commit = versions.prune(plan.project, tag, root)
+            except OSError as exc:
+                result.error = str(exc)
+                log.error("[%s] ❌ Prune failed: %s", result.project.name, exc)
+            result.seconds = time.monotonic() - start
+            results.append(result)
+    return pending, results
+
+
+def sync_all(projects: list[Project], root: Path, settings: SyncSettings) -> list[SyncResult]:
+    """Sync ``projects`` with at most ``settings.jobs`` fetches in flight.
+
+    Projects with a ``versions`` table also get one job per release tag that
+    is new since the last run; snapshots that fell out of the window are removed.
+    """
+    cache = None
+    if settings.cache_dir:
+        max_bytes = settings.cache_max_mb * 2**20 if settings.cache_max_mb else None
+        cache = MirrorCache(settings.cache_dir, max_bytes)
+    store = BlobStore(root / settings.store) if settings.store else None
+    results: list[SyncResult] = []
+    workers = max(1, settings.jobs)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docsync") as pool:
+        snapshots, results = _snapshot_jobs(projects, root, settings, pool)
+        jobs = projects + snapshots
+        futures = [pool.submit(sync_project, p, root, settings, cache, store) for p in jobs]
+        for future in as_completed(futures):
+            results.append(future.result())
+    if cache is not None:
+        cache.evict()
+    # Keep each project's snapshots right after it, newest tag first.
+    order = {p.name: i for i, p in enumerate(projects)}
+    results.sort(key=lambda r: versions.version_key(r.project.tag or ""), reverse=True)
+    results.sort(key=lambda r: (order[r.project.name.partition("@")[0]], r.project.tag is not None))
+    return results
+
+
+def format_timings(results: list[SyncResult], wall: float) -> str:
+    """Render a plain-text timing table for ``results``."""
+    width = max([len(r.project.name) for r in results] + [7])
+    lines = [f"{'project':<{width}}  {'status':<6}  seconds  added  modified  deleted"]
+    for r in results:
+        status = "FAILED" if not r.ok else "skip" if r.skipped else "ok"
+        line = f"{r.project.name:<{width}}  {status:<6}  {r.seconds:7.2f}"
+        if r.diff is not None:
+            d = r.diff
+            line += f"  {len(d.added):5}  {len(d.modified):8}  {len(d.deleted):7}"
+        lines.append(line)
+    serial = sum(r.seconds for r in results)
+    lines.append(f"{'total':<{width}}  {'':<6}  {wall:7.2f}  (serial sum {serial:.2f})")
+    return "\n".join(lines)
@@ -0,0 +1,153 @@
+"""Local smart-HTTP git server that injects latency and failures.
+
+Serves the bare repositories below a directory through ``git http-backend``
+so the sync engine can be exercised over a real network transport, with
+per-repository :class:`Faults` to delay responses, fail the first requests,
+or fail at random. Used by ``docsync bench --faults``.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+
+@dataclass
+class Faults:
+    """Misbehaviour injected into requests for one repository."""
+
+    latency: float = 0.0
+    fail_first: int = 0
+    failure_rate: float = 0.0
+    status: int = 503
+    seed: int = 0
+    requests: int = field(default=0, init=False)
+    failures: int = field(default=0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    def describe(self) -> str:
+        parts = []
+        if self.latency:
+            parts.append(f"+{self.latency:g}s latency")
+        if self.fail_first:
+            parts.append(f"first {self.fail_first} requests fail")
+        if self.failure_rate:
+            parts.append(f"{self.failure_rate:.0%} of requests fail")
+        return ", ".join(parts) or "none"
+
+    def should_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            fail = self.requests <= self.fail_first or self._rng.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+            return fail
+
+
+def _read_chunked(rfile) -> bytes:
+    body = bytearray()
+    while True:
+        size = int(rfile.readline().split(b";")[0].strip(), 16)
+        if size == 0:
+            rfile.readline()
+            return bytes(body)
+        body += rfile.read(size)
+        rfile.readline()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: GitFaultServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+    def _serve(self) -> None:
+        path, _, query = self.path.partition("?")
+        repo = path.lstrip("/").split(".git", 1)[0] + ".git"
+        faults = self.server.faults.get(repo, Faults())
+        # Drain the request body first, even for an injected failure: left on
+        # a keep-alive socket it would be parsed as the next request.
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = _read_chunked(self.rfile)
+        else:
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if faults.latency:
+            time.sleep(faults.latency)
+        if faults.should_fail():
+            self.send_response(faults.status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        env = {
+            **os.environ,
+            "GIT_PROJECT_ROOT": str(self.server.root),
+            "GIT_HTTP_EXPORT_ALL": "1",
+            "REQUEST_METHOD": self.command,
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "CONTENT_TYPE": self.headers.get("Content-Type", ""),
+            "CONTENT_LENGTH": str(len(body)),
+            "HTTP_CONTENT_ENCODING": self.headers.get("Content-Encoding", ""),
+            "GIT_PROTOCOL": self.headers.get("Git-Protocol", ""),
+            "REMOTE_ADDR": self.client_address[0],
+        }
+        proc = subprocess.run(
+            ["git", "http-backend"], input=body, env=env, capture_output=True
+        )
+        head, _, payload = proc.stdout.partition(b"\r\n\r\n")
+        status = 200
+        headers = []
+        for line in head.decode("latin-1").split("\r\n"):
+            key, _, value = line.partition(":")
+            if key.lower() == "status":
+                status = int(value.split()[0])
+            elif key:
+                headers.append((key, value.strip()))
+        self.send_response(status)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_GET = do_POST = _serve
+
+
+class GitFaultServer(ThreadingHTTPServer):
+    """Serve ``root``'s bare repositories on ``127.0.0.1`` with injected faults.
+
+    ``faults`` maps a repository path relative to ``root`` (e.g.
+    ``"flaky.git"``) to the :class:`Faults` applied to it.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, root: Path, faults: dict[str, Faults] | None = None) -> None:
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.root = Path(root)
+        self.faults = faults or {}
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def url(self, repo: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/{repo}"
+
+    def __enter__(self) -> GitFaultServer:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
@@ -0,0 +1,48 @@
+"""JSON Lines feed of the paths each sync run added, modified or deleted."""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .engine import SyncResult
+from .reconcile import write_text_atomic
+
+
+def feed_records(results: Iterable[SyncResult], run_at: datetime) -> Iterator[dict]:
+    """Yield one record per changed path, grouped by project, sorted by path."""
+    stamp = run_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+    for result in results:
+        diff = result.diff
+        if diff is None or not diff.changed:
+            continue
+        changes = [(p, "added") for p in diff.added]
+        changes += [(p, "modified") for p in diff.modified]
+        changes += [(p, "deleted") for p in diff.deleted]
+        for path, change in sorted(changes):
+            yield {
+                "run": stamp,
+                "project": result.project.name,
+                "dest": result.project.dest,
+                "path": path,
+                "change": change,
+                "old_sha256": diff.old_hashes.get(path),
+                "new_sha256": diff.hashes.get(path) if change != "deleted" else None,
+                "old_commit": result.previous_commit,
+                "new_commit": result.commit,
+            }
+
+
+def write_feed(path: Path, results: Iterable[SyncResult], run_at: datetime) -> int:
+    """Write the feed for this run to ``path``; returns the number of records.
+
+    Nothing is written when no project changed, so an idle run leaves the
+    previous feed (and the working tree) untouched.
+    """
+    lines = [json.dumps(r, sort_keys=True) for r in feed_records(results, run_at)]
+    if lines:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(path, "\n".join(lines) + "\n")
+    return len(lines)
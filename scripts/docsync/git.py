@@ -0,0 +1,87 @@
+"""Thin subprocess wrapper around the ``git`` command line."""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+_timeout = threading.local()
+
+
+class GitError(RuntimeError):
+    """Raised when a git command exits with a non-zero status or times out."""
+
+    def __init__(
+        self, args: list[str], returncode: int, stderr: str, timed_out: bool = False
+    ) -> None:
+        self.args_ = args
+        self.returncode = returncode
+        self.stderr = stderr
+        self.timed_out = timed_out
+        if timed_out:
+            detail = "timed out"
+        else:
+            lines = stderr.strip().splitlines()
+            fatal = [line for line in lines if line.startswith(("fatal:", "error:"))]
+            detail = (fatal or lines or ["no output"])[0]
+        super().__init__(f"git {' '.join(args)} failed ({returncode}): {detail}")
+
+
+@contextmanager
+def timeout(seconds: float | None) -> Iterator[None]:
+    """Bound every :func:`git` call made by this thread inside the block."""
+    saved = getattr(_timeout, "seconds", None)
+    _timeout.seconds = seconds
+    try:
+        yield
+    finally:
+        _timeout.seconds = saved
+
+
+def _run(args: tuple[str, ...], cwd: str | Path | None, input: bytes | None) -> bytes:
+    try:
+        proc = subprocess.run(
+            ["git", *args],
+            cwd=cwd,
+            input=input,
+            capture_output=True,
+            timeout=getattr(_timeout, "seconds", None),
+            # Never block on a credential prompt in CI.
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+    except subprocess.TimeoutExpired as exc:
+        stderr = exc.stderr.decode(errors="replace") if isinstance(exc.stderr, bytes) else ""
+        raise GitError(list(args), -1, stderr, timed_out=True) from None
+    if proc.returncode != 0:
+        raise GitError(list(args), proc.returncode, proc.stderr.decode(errors="replace"))
+    return proc.stdout
+
+
+def git(*args: str, cwd: str | Path | None = None, input: str | None = None) -> str:
+    """Run ``git`` with ``args`` in ``cwd`` and return its stdout."""
+    stdin = input.encode() if input is not None else None
+    return _run(args, cwd, stdin).decode(errors="replace")
+
+
+def git_bytes(*args: str, cwd: str | Path | None = None, input: bytes | None = None) -> bytes:
+    """Like :func:`git`, for commands whose output is binary (e.g. ``cat-file --batch``)."""
+    return _run(args, cwd, input)
+
+
+def object_stats(cwd: str | Path) -> tuple[int, int]:
+    """Return ``(objects, bytes)`` held by the repository at ``cwd``.
+
+    Deltas of these around a fetch approximate what was transferred, since
+    fetched packs are stored as received.
+    """
+    fields = {}
+    for line in git("count-objects", "-v", cwd=cwd).splitlines():
+        key, _, value = line.partition(":")
+        fields[key.strip()] = int(value.strip() or 0)
+    objects = fields.get("count", 0) + fields.get("in-pack", 0)
+    kib = fields.get("size", 0) + fields.get("size-pack", 0)
+    return objects, kib * 1024
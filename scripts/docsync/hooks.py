@@ -0,0 +1,198 @@
+"""Post-processing hooks run on a project's files before they are published.
+
+A hook receives a :class:`HookContext` describing the fresh checkout and the
+set of files about to be published, and may rewrite, add or drop entries in
+``ctx.files``. Hooks never modify the checkout itself: rewritten content is
+written under ``ctx.scratch`` so the reconciler compares it like any other
+file. Hooks are registered by name with :func:`hook` and referenced from
+``projects.toml``.
+
+Hooks that need upstream files outside the sparse checkout (code samples,
+Python sources) read them with :meth:`HookContext.upstream`, which fetches
+every missing blob in one batch and keeps a copy keyed by blob id, so later
+syncs read unchanged files from disk.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable
+
+from .git import GitError, git, git_bytes
+from .retry import RetryPolicy, retry
+
+if TYPE_CHECKING:
+    from .config import Project
+    from .manifest import Manifest
+
+log = logging.getLogger("docsync")
+
+# Persistent hook state (blob copies, per-hook caches), relative to the repo root.
+HOOK_CACHE = ".docsync/hooks"
+
+HookFn = Callable[["HookContext"], None]
+
+HOOKS: dict[str, HookFn] = {}
+HOOK_VERSIONS: dict[str, int] = {}
+
+
+def hook(name: str, version: int = 1) -> Callable[[HookFn], HookFn]:
+    """Register the decorated function as the hook called ``name``.
+
+    Bump ``version`` whenever the hook's output changes for the same input;
+    it is part of the manifest's hook fingerprint, so published trees are
+    rebuilt even if their upstream commit is unchanged.
+    """
+
+    def register(fn: HookFn) -> HookFn:
+        if name in HOOKS:
+            raise ValueError(f"hook {name!r} is already registered")
+        HOOKS[name] = fn
+        HOOK_VERSIONS[name] = version
+        return fn
+
+    return register
+
+
+@dataclass
+class HookContext:
+    """Everything a hook may read or change for one project sync."""
+
+    project: Project
+    workdir: Path
+    scratch: Path
+    commit: str
+    files: dict[str, Path]
+    previous: Manifest | None = None
+    options: dict[str, Any] = field(default_factory=dict)
+    cache_root: Path | None = None
+    policy: RetryPolicy = field(default_factory=RetryPolicy)
+    name: str = ""
+
+    @property
+    def cache(self) -> Path | None:
+        """A directory the running hook may keep state in across syncs."""
+        return self.cache_root / self.name if self.cache_root is not None else None
+
+    def write_text(self, rel: str, text: str) -> Path:
+        """Publish ``text`` at ``rel`` instead of (or in addition to) upstream's file."""
+        path = self.scratch / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+        self.files[rel] = path
+        return path
+
+    def blob_ids(self, paths: Iterable[str], recursive: bool = False) -> dict[str, str]:
+        """Blob ids of repository files at ``commit``; absent paths are left out.
+
+        With ``recursive``, directories in ``paths`` list every file below them.
+        """
+        wanted = sorted(set(paths))
+        if not wanted:
+            return {}
+        flags = ["-z", "--full-tree", *(["-r"] if recursive else [])]
+        listing = git("ls-tree", *flags, self.commit, "--", *wanted, cwd=self.workdir)
+        oids: dict[str, str] = {}
+        for record in filter(None, listing.split("\0")):
+            meta, _, rel = record.partition("\t")
+            _, kind, oid = meta.split()
+            if kind == "blob":
+                oids[rel] = oid
+        return oids
+
+    def upstream(self, paths: Iterable[str]) -> dict[str, bytes]:
+        """Contents of repository files at ``commit``, sparse-checked-out or not.
+
+        Paths missing from the commit are left out of the result. In a
+        partial clone the blobs not yet present locally are fetched with a
+        single request.
+        """
+        oids = self.blob_ids(paths)
+        blobs: dict[str, bytes] = {}
+        for oid in set(oids.values()):
+            if (cached := self._blob_path(oid)) is not None and cached.is_file():
+                blobs[oid] = cached.read_bytes()
+        missing = sorted(set(oids.values()) - blobs.keys())
+        if missing:
+            self._fetch_blobs(missing)
+            blobs.update(_cat_blobs(self.workdir, missing))
+            for oid in missing:
+                if (cached := self._blob_path(oid)) is not None:
+                    _write_atomic(cached, blobs[oid])
+        return {rel: blobs[oid] for rel, oid in oids.items()}
+
+    def _blob_path(self, oid: str) -> Path | None:
+        if self.cache_root is None:
+            return None
+        return self.cache_root / "blobs" / oid[:2] / oid
+
+    def _fetch_blobs(self, oids: list[str]) -> None:
+        """Download the blobs of ``oids`` absent from a partial clone in one request."""
+        try:
+            promisor = git("config", "--get", "remote.origin.promisor", cwd=self.workdir)
+        except GitError:
+            return  # a full clone already has every blob
+        if promisor.strip() != "true":
+            return
+        # --missing=print marks absent objects instead of lazily fetching them one by one.
+        listing = git(
+            "rev-list", "--objects", "--no-walk", "--missing=print", self.commit, cwd=self.workdir
+        )
+        wanted = set(oids)
+        absent = [line[1:] for line in listing.splitlines() if line[1:] in wanted]
+        if not absent:
+            return
+        log.info("[%s] 📥 Fetching %d upstream files for hooks", self.project.name, len(absent))
+        noop = "fetch.negotiationAlgorithm=noop"  # the wanted blobs are known exactly
+        flags = ("--quiet", "--no-tags", "--no-write-fetch-head", "--filter=blob:none", "--stdin")
+        request = "".join(f"{oid}\n" for oid in absent)
+        retry(
+            lambda: git("-c", noop, "fetch", *flags, "origin", cwd=self.workdir, input=request),
+            self.policy,
+            f"[{self.project.name}] ⚠️  hook fetch",
+        )
+
+
+def _cat_blobs(workdir: Path, oids: list[str]) -> dict[str, bytes]:
+    request = "".join(f"{oid}\n" for oid in oids).encode()
+    out = git_bytes("cat-file", "--batch", cwd=workdir, input=request)
+    blobs: dict[str, bytes] = {}
+    pos = 0
+    for oid in oids:
+        end = out.index(b"\n", pos)
+        header = out[pos:end].split()
+        if header[-1] == b"missing":
+            raise RuntimeError(f"blob {oid} is missing from the clone")
+        size = int(header[2])
+        blobs[oid] = out[end + 1 : end + 1 + size]
+        pos = end + 2 + size
+    return blobs
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def run_hooks(ctx: HookContext) -> None:
+    """Run every hook configured for ``ctx.project`` in order."""
+    for spec in ctx.project.hooks:
+        ctx.options = dict(spec.options)
+        ctx.name = spec.name
+        HOOKS[spec.name](ctx)
+
+
+# Built-in hooks register themselves on import.
+from . import apidocs, includes, llmstxt  # noqa: E402,F401
@@ -0,0 +1,228 @@
+"""Expand FastAPI-style ``{* docs_src/... *}`` code includes at sync time.
+
+FastAPI and SQLModel pull their code samples into pages with directives
+such as::
+
+    {* ../../docs_src/python_types/tutorial001_py310.py ln[1:8] hl[2] *}
+
+which ``markdown-include-variants`` renders when the site is built. The
+sparse checkout never contains ``docs_src``, so the ``fastapi-includes``
+hook fetches every referenced file in one batch and replaces each directive
+with a fenced code block:
+
+- ``ln[a:b,c]`` keeps only those 1-based lines (``ln[0]`` keeps the whole
+  file); skipped runs become an "omitted" comment, as on the rendered site;
+- ``hl[...]`` becomes ``hl_lines``, renumbered to the lines that were kept.
+
+Directives inside fenced code blocks are documentation of the syntax and are
+left alone. Directive paths are relative to the ``base`` option: the directory holding
+``mkdocs.yml`` (``docs/en`` for FastAPI, the repository root by default).
+Expanded pages are cached under the hook cache, keyed by the page's hash
+and the blob ids of everything it includes, so unchanged pages are never
+expanded twice.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import posixpath
+import re
+from pathlib import Path
+
+from .hooks import HookContext, hook
+from .reconcile import write_text_atomic
+
+log = logging.getLogger("docsync")
+
+# Bump when the generated markdown changes, so cached expansions are not reused.
+VERSION = 2
+
+_DIRECTIVE_RE = re.compile(
+    r"^(?P<indent>[ \t]*)\{\*[ \t]+(?P<path>\S+)"
+    r"(?P<args>(?:[ \t]+\w+\[[^\]\n]*\])*)[ \t]*\*\}[ \t]*$",
+    re.MULTILINE,
+)
+_ARG_RE = re.compile(r"(\w+)\[([^\]]*)\]")
+_FENCE_RE = re.compile(r"^[ \t]*(`{3,}|~{3,})")
+_LANGUAGES = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".sh": "bash",
+    ".yml": "yaml",
+    ".yaml": "yaml",
+    ".toml": "toml",
+    ".json": "json",
+    ".html": "html",
+    ".css": "css",
+    ".sql": "sql",
+}
+_COMMENTS = {".js": "//", ".ts": "//", ".css": "/*", ".html": "<!--", ".json": "//"}
+_OMITTED = ("Code above omitted 👆", "Code here omitted 👈", "Code below omitted 👇")
+
+
+def _ranges(spec: str) -> list[tuple[int, int]]:
+    """Parse ``"1:8,10,12:14"`` into inclusive ``(first, last)`` pairs."""
+    ranges = []
+    for part in spec.split(","):
+        first, _, last = part.strip().partition(":")
+        if first:
+            ranges.append((int(first), int(last or first)))
+    return ranges
+
+
+def _compact(numbers: list[int]) -> str:
+    """``[1, 2, 3, 7]`` as the ``hl_lines`` value ``"1-3 7"``."""
+    runs: list[list[int]] = []
+    for n in sorted(set(numbers)):
+        if runs and n == runs[-1][1] + 1:
+            runs[-1][1] = n
+        else:
+            runs.append([n, n])
+    return " ".join(str(a) if a == b else f"{a}-{b}" for a, b in runs)
+
+
+def render(source: str, title: str, args: str, indent: str = "") -> str:
+    """The fenced block replacing one directive whose arguments are ``args``."""
+    options = {name: _ranges(value) for name, value in _ARG_RE.findall(args)}
+    lines = source.splitlines()
+    suffix = Path(title).suffix
+    keep = options.get("ln")
+    if keep and keep != [(0, 0)]:
+        wanted = {n for first, last in keep for n in range(first, last + 1)}
+    else:
+        wanted = set(range(1, len(lines) + 1))
+
+    comment = _COMMENTS.get(suffix, "#")
+    close = " -->" if comment == "<!--" else " */" if comment == "/*" else ""
+    body: list[str] = []
+    numbers: dict[int, int] = {}  # source line -> line in the block
+    gap = False
+    for number, line in enumerate(lines, start=1):
+        if number in wanted:
+            if gap:
+                marker = _OMITTED[0] if not body else _OMITTED[1]
+                body.append(f"{comment} {marker}{close}")
+                gap = False
+            body.append(line)
+            numbers[number] = len(body)
+        else:
+            gap = True
+    if gap and body:
+        body.append(f"{comment} {_OMITTED[2]}{close}")
+
+    attrs = [_LANGUAGES.get(suffix, suffix.lstrip(".")), f'title="{title}"']
+    highlight = [
+        numbers[n] for first, last in options.get("hl", ()) for n in range(first, last + 1)
+        if n in numbers
+    ]
+    if highlight:
+        attrs.append(f'hl_lines="{_compact(highlight)}"')
+    longest = max((len(m) for m in re.findall(r"`{3,}", source)), default=0)
+    fence = "`" * max(3, longest + 1)
+    block = [f"{fence}{' '.join(attrs)}", *body, fence]
+    return "\n".join(f"{indent}{line}" if line else line for line in block)
+
+
+def directives(text: str) -> list[re.Match[str]]:
+    """The directive lines of ``text`` that are outside fenced code blocks."""
+    found = []
+    fence = None
+    start = 0
+    for line in text.splitlines(keepends=True):
+        end = start + len(line.rstrip("\r\n"))
+        if opening := _FENCE_RE.match(line):
+            mark = opening.group(1)
+            if fence is None:
+                fence = mark
+            elif mark[0] == fence[0] and len(mark) >= len(fence):
+                fence = None
+        elif fence is None and (match := _DIRECTIVE_RE.match(text, start, end)):
+            found.append(match)
+        start += len(line)
+    return found
+
+
+def expand(text: str, base: str, sources: dict[str, str]) -> tuple[str, int]:
+    """Replace every directive whose file is in ``sources``; return the count too."""
+    parts = []
+    count = last = 0
+    for match in directives(text):
+        path = posixpath.normpath(posixpath.join(base, match.group("path")))
+        if path not in sources:
+            continue
+        block = render(sources[path], path, match.group("args"), match.group("indent"))
+        parts += [text[last : match.start()], block]
+        last = match.end()
+        count += 1
+    return "".join(parts) + text[last:], count
+
+
+def _targets(text: str, base: str) -> set[str]:
+    paths = set()
+    for match in directives(text):
+        path = posixpath.normpath(posixpath.join(base, match.group("path")))
+        if not path.startswith("../") and path != "..":
+            paths.add(path)
+    return paths
+
+
+def _cache_key(text: str, base: str, targets: set[str], oids: dict[str, str]) -> str:
+    key = hashlib.sha256(f"v{VERSION}\0{base}\0{text}".encode())
+    for target in sorted(targets):
+        key.update(f"\0{target}={oids.get(target, '')}".encode())
+    return key.hexdigest()
+
+
+@hook("fastapi-includes", version=VERSION)
+def fastapi_includes(ctx: HookContext) -> None:
+    """Inline the ``docs_src`` files referenced by ``{* ... *}`` directives."""
+    base = posixpath.normpath(str(ctx.options.get("base", ".")))
+    pages: dict[str, tuple[str, set[str]]] = {}
+    for rel, path in ctx.files.items():
+        if rel.endswith(".md") and not path.is_symlink():
+            text = path.read_text(encoding="utf-8")
+            if "{*" in text and (targets := _targets(text, base)):
+                pages[rel] = (text, targets)
+    if not pages:
+        return
+
+    # Blob ids come from the already-fetched trees; contents are only needed
+    # for pages whose expansion is not cached yet.
+    oids = ctx.blob_ids(set().union(*(targets for _, targets in pages.values())))
+    cached: dict[str, Path] = {}
+    stale: dict[str, Path | None] = {}
+    for rel, (text, targets) in pages.items():
+        digest = _cache_key(text, base, targets, oids)
+        entry = ctx.cache / digest[:2] / f"{digest}.md" if ctx.cache is not None else None
+        if entry is not None and entry.is_file():
+            cached[rel] = entry
+        else:
+            stale[rel] = entry
+
+    wanted = set().union(*(pages[rel][1] for rel in stale)) & oids.keys()
+    sources = {
+        path: data.decode("utf-8", "replace") for path, data in ctx.upstream(wanted).items()
+    }
+    expanded = dangling = 0
+    for rel, entry in stale.items():
+        text = pages[rel][0]
+        result, count = expand(text, base, sources)
+        expanded += count
+        dangling += len(directives(text)) - count
+        ctx.write_text(rel, result)
+        if entry is not None:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(entry, result)
+    for rel, entry in cached.items():
+        ctx.write_text(rel, entry.read_text(encoding="utf-8"))
+    log.info(
+        "[%s] 🧩 Expanded %d includes in %d pages (%d pages reused from cache)",
+        ctx.project.name,
+        expanded,
+        len(stale),
+        len(cached),
+    )
+    if dangling:
+        log.warning("[%s] ⚠️  %d includes point at missing files", ctx.project.name, dangling)
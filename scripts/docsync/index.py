@@ -0,0 +1,530 @@
+"""Full-text BM25 search over the heading-delimited sections of every synced tree.
+
+Every ``.md`` file listed in a manifest is split into heading sections by
+:mod:`docsync.chunker` and each section is indexed as one document, with
+the titles of its enclosing headings. The index directory holds::
+
+    index.json              format, segments, tombstones, project -> dest map,
+                            and the SHA-256 and segment of every indexed file
+    seg-<id>/sections.json  section table: project, path, title, anchor, offset, length,
+                            tokens, breadcrumbs
+    seg-<id>/lexicon.json   term -> [start, document frequency]
+    seg-<id>/postings.bin   native uint32 array; per term, section ids then term frequencies
+
+Segments are immutable. An update compares the manifests' SHA-256 with the
+ones recorded in ``index.json``, tokenizes only added and changed files
+into one new segment, and tombstones the stale copies in older segments, so
+its cost follows the size of the diff. Small segments are merged on a
+size-tiered policy (see :func:`merge_segments`), which also drops
+tombstoned sections; merging reuses the postings rather than re-tokenizing.
+
+Postings are memory-mapped and read as ``memoryview`` casts, so opening an
+index only parses the JSON tables.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import heapq
+import json
+import logging
+import math
+import mmap
+import re
+import shutil
+import threading
+import time
+import uuid
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from .chunker import VERSION as CHUNKER_VERSION, Chunk, ChunkCache
+from .config import Project
+from .manifest import Manifest
+from .reconcile import write_text_atomic
+
+log = logging.getLogger("docsync")
+
+FORMAT = 3
+INDEX_FILE = "index.json"
+K1 = 1.2
+B = 0.75
+# Size-tiered merging: segments whose live section counts fall within one
+# power of MERGE_FACTOR (above MERGE_FLOOR) form a tier; a tier holding
+# MERGE_FACTOR segments is merged into one. Segments that are mostly
+# tombstones are rewritten on their own.
+MERGE_FACTOR = 4
+MERGE_FLOOR = 1000
+MAX_DEAD_RATIO = 0.5
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from if in into is it its of on or so that the then "
+    "this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased alphanumeric terms of ``text``, minus a few stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+@dataclass(frozen=True)
+class Section:
+    """A heading-delimited slice of one markdown file, addressed in bytes."""
+
+    project: str
+    path: str
+    title: str
+    anchor: str
+    offset: int
+    length: int
+    tokens: int = 0
+    breadcrumbs: tuple[str, ...] = ()
+
+
+Postings = dict[str, list[tuple[int, int]]]
+
+
+def _sections_of(
+    project: str, path: str, data: bytes, chunks: list[Chunk]
+) -> Iterator[tuple[Section, list[str]]]:
+    for chunk in chunks:
+        body = data[chunk.offset : chunk.offset + chunk.length].decode("utf-8", "replace")
+        # Enclosing headings are indexed too, so "Check it" under "First Steps" matches both.
+        terms = tokenize(" ".join(chunk.breadcrumbs)) + tokenize(body)
+        section = Section(
+            project, path, chunk.title, chunk.anchor, chunk.offset, chunk.length, len(terms),
+            chunk.breadcrumbs,
+        )
+        yield section, terms
+
+
+def _write_segment(path: Path, sections: list[Section], postings: Postings) -> int:
+    lexicon: dict[str, list[int]] = {}
+    packed = array("I")
+    for term in sorted(postings):
+        docs = postings[term]
+        if not docs:
+            continue
+        lexicon[term] = [len(packed), len(docs)]
+        packed.extend(d for d, _ in docs)
+        packed.extend(tf for _, tf in docs)
+    path.mkdir(parents=True)
+    with open(path / "postings.bin", "wb") as fh:
+        packed.tofile(fh)
+    rows = [
+        [s.project, s.path, s.title, s.anchor, s.offset, s.length, s.tokens, s.breadcrumbs]
+        for s in sections
+    ]
+    (path / "sections.json").write_text(json.dumps(rows, separators=(",", ":")))
+    (path / "lexicon.json").write_text(json.dumps(lexicon, separators=(",", ":")))
+    return len(lexicon)
+
+
+def write_segment(path: Path, sections: list[Section], tokens: list[list[str]]) -> int:
+    """Write an immutable segment for ``sections``; returns the number of terms."""
+    postings: Postings = {}
+    for doc, terms in enumerate(tokens):
+        for term, tf in Counter(terms).items():
+            postings.setdefault(term, []).append((doc, tf))
+    return _write_segment(path, sections, postings)
+
+
+class Segment:
+    """A read-only segment with memory-mapped postings."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.name = path.name
+        self.sections = [
+            Section(*row[:-1], tuple(row[-1]))
+            for row in json.loads((path / "sections.json").read_text())
+        ]
+        self.lexicon: dict[str, list[int]] = json.loads((path / "lexicon.json").read_text())
+        self._mmap: mmap.mmap | None = None
+        self._postings = memoryview(b"").cast("I")
+        with open(path / "postings.bin", "rb") as fh:
+            if fh.seek(0, 2):
+                self._mmap = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                self._postings = memoryview(self._mmap).cast("I")
+
+    def postings(self, term: str) -> tuple[memoryview, memoryview] | None:
+        """Section ids and term frequencies of ``term``, or ``None``."""
+        hit = self.lexicon.get(term)
+        if hit is None:
+            return None
+        start, df = hit
+        return self._postings[start : start + df], self._postings[start + df : start + 2 * df]
+
+    def live(self, dead: set[tuple[str, str]]) -> list[bool]:
+        """Per section, whether its file is not tombstoned."""
+        return [(s.project, s.path) not in dead for s in self.sections]
+
+    def close(self) -> None:
+        self._postings.release()
+        if self._mmap is not None:
+            self._mmap.close()
+
+
+@dataclass
+class IndexState:
+    """The contents of ``index.json``."""
+
+    projects: dict[str, str] = field(default_factory=dict)
+    segments: list[str] = field(default_factory=list)
+    # project -> path -> [sha256, segment holding its live sections]
+    files: dict[str, dict[str, list[str]]] = field(default_factory=dict)
+    # segment -> files whose sections in that segment are stale
+    tombstones: dict[str, set[tuple[str, str]]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, index_dir: Path) -> IndexState | None:
+        """Read ``index.json``; ``None`` if missing or in an older format."""
+        try:
+            meta = json.loads((index_dir / INDEX_FILE).read_text())
+        except FileNotFoundError:
+            return None
+        # Sections hold chunker anchors and offsets: a new chunker means a rebuild.
+        if meta.get("format") != FORMAT or meta.get("chunker") != CHUNKER_VERSION:
+            return None
+        return cls(
+            projects=meta["projects"],
+            segments=meta["segments"],
+            files=meta["files"],
+            tombstones={seg: {tuple(k) for k in keys} for seg, keys in meta["tombstones"].items()},
+        )
+
+    def save(self, index_dir: Path) -> None:
+        tombstones = {
+            seg: sorted([list(k) for k in keys])
+            for seg, keys in self.tombstones.items()
+            if keys and seg in self.segments
+        }
+        meta = {
+            "format": FORMAT,
+            "chunker": CHUNKER_VERSION,
+            "projects": self.projects,
+            "segments": self.segments,
+            "tombstones": tombstones,
+            "files": self.files,
+        }
+        write_text_atomic(index_dir / INDEX_FILE, json.dumps(meta, separators=(",", ":")) + "\n")
+
+    def bury(self, project: str, path: str) -> None:
+        """Tombstone the currently indexed copy of a file and forget it."""
+        _, segment = self.files[project].pop(path)
+        self.tombstones.setdefault(segment, set()).add((project, path))
+
+
+@contextmanager
+def _locked(index_dir: Path) -> Iterator[None]:
+    """Serialize writers of ``index.json`` (updates and merge commits)."""
+    index_dir.mkdir(parents=True, exist_ok=True)
+    with open(index_dir / ".lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def _new_segment_name() -> str:
+    return f"seg-{uuid.uuid4().hex[:12]}"
+
+
+def _remove_orphans(index_dir: Path, state: IndexState) -> None:
+    keep = set(state.segments)
+    for old in index_dir.glob("seg-*"):
+        if old.name not in keep:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+@dataclass(frozen=True)
+class Hit:
+    score: float
+    section: Section
+
+
+@dataclass
+class IndexStats:
+    documents: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    sections: int = 0
+    terms: int = 0
+    segments: int = 0
+    seconds: float = 0.0
+
+
+class SearchIndex:
+    """Query an index directory written by :func:`update_index`."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        state = IndexState.load(self.path)
+        if state is None:
+            raise FileNotFoundError(f"no search index in {self.path}; run 'docsync index'")
+        self.dests = state.projects
+        self.segments = [Segment(self.path / name) for name in state.segments]
+        self._live = [s.live(state.tombstones.get(s.name, set())) for s in self.segments]
+        self.total = sum(sum(live) for live in self._live)
+        tokens = sum(
+            sec.tokens
+            for segment, live in zip(self.segments, self._live)
+            for sec, alive in zip(segment.sections, live)
+            if alive
+        )
+        self.avgdl = tokens / self.total if self.total else 0.0
+
+    def __enter__(self) -> SearchIndex:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for segment in self.segments:
+            segment.close()
+
+    def search(self, query: str, limit: int = 10, project: str | None = None) -> list[Hit]:
+        """The ``limit`` best BM25 matches for ``query``, optionally within one project.
+
+        Document frequencies still count tombstoned sections until their
+        segment is merged, as in most segment-based engines.
+        """
+        idf: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            df = sum(s.lexicon[term][1] for s in self.segments if term in s.lexicon)
+            if df:
+                idf[term] = math.log(1 + (self.total - df + 0.5) / (df + 0.5))
+        hits: list[Hit] = []
+        for segment, live in zip(self.segments, self._live):
+            scores: dict[int, float] = {}
+            for term, weight in idf.items():
+                found = segment.postings(term)
+                if found is None:
+                    continue
+                for doc, tf in zip(*found):
+                    if not live[doc]:
+                        continue
+                    norm = K1 * (1 - B + B * segment.sections[doc].tokens / self.avgdl)
+                    scores[doc] = scores.get(doc, 0.0) + weight * tf * (K1 + 1) / (tf + norm)
+            for doc, score in scores.items():
+                section = segment.sections[doc]
+                if project is None or section.project == project:
+                    hits.append(Hit(score, section))
+        return heapq.nlargest(limit, hits, key=lambda h: h.score)
+
+    def snippet(self, root: Path, hit: Hit, width: int = 160) -> str:
+        """The first ``width`` characters of a hit's body, whitespace collapsed."""
+        section = hit.section
+        path = root / self.dests[section.project] / section.path
+        try:
+            with open(path, "rb") as fh:
+                fh.seek(section.offset)
+                data = fh.read(section.length)
+        except OSError:
+            return ""
+        body = data.decode("utf-8", "replace")
+        if section.title:
+            body = body.partition("\n")[2]
+        text = " ".join(body.split())
+        return text if len(text) <= width else text[: width - 1] + "…"
+
+
+def update_index(
+    trees: Iterable[tuple[Project, Manifest]],
+    root: Path,
+    index_dir: Path,
+    rebuild: bool = False,
+    chunks: ChunkCache | None = None,
+) -> IndexStats:
+    """Bring the index in ``index_dir`` up to date with the synced trees.
+
+    Only files whose manifest SHA-256 differs from the indexed one are read
+    and tokenized; they go into a single new segment. Files that changed or
+    disappeared are tombstoned in the segment that held them.
+    """
+    start = time.monotonic()
+    stats = IndexStats()
+    chunks = chunks or ChunkCache()
+    with _locked(index_dir):
+        state = None if rebuild else IndexState.load(index_dir)
+        if state is None:
+            state = IndexState()
+            rebuild = True
+        current: dict[str, dict[str, str]] = {}
+        dests: dict[str, str] = {}
+        for project, manifest in trees:
+            dests[project.name] = project.dest
+            current[project.name] = {
+                f.path: f.sha256 for f in manifest.files if f.path.endswith(".md")
+            }
+
+        sections: list[Section] = []
+        tokens: list[list[str]] = []
+        for project in list(state.files):
+            for path in list(state.files[project]):
+                if path not in current.get(project, {}):
+                    state.bury(project, path)
+                    stats.deleted += 1
+            if not state.files[project]:
+                del state.files[project]
+        name = _new_segment_name()
+        for project, files in current.items():
+            indexed = state.files.setdefault(project, {})
+            for path, sha256 in files.items():
+                if path in indexed and indexed[path][0] == sha256:
+                    stats.unchanged += 1
+                    continue
+                source = root / dests[project] / path
+                readable = source.is_file() and not source.is_symlink()
+                if path in indexed:
+                    # Tombstoned even when the new copy can't be read, so the
+                    # old sections don't stay searchable.
+                    state.bury(project, path)
+                    stats.deleted += not readable
+                if not readable:
+                    continue
+                data = source.read_bytes()
+                found = chunks.chunks(data, sha256)
+                for section, terms in _sections_of(project, path, data, found):
+                    sections.append(section)
+                    tokens.append(terms)
+                indexed[path] = [sha256, name]
+                stats.documents += 1
+            if not indexed:
+                del state.files[project]
+
+        state.projects = dests
+        if sections:
+            stats.terms = write_segment(index_dir / name, sections, tokens)
+            state.segments.append(name)
+        if stats.documents or stats.deleted or rebuild or not (index_dir / INDEX_FILE).exists():
+            state.save(index_dir)
+        if rebuild:
+            _remove_orphans(index_dir, state)
+    stats.sections = len(sections)
+    stats.segments = len(state.segments)
+    stats.seconds = time.monotonic() - start
+    return stats
+
+
+def _tiers(sizes: dict[str, int]) -> dict[int, list[str]]:
+    tiers: dict[int, list[str]] = {}
+    for name, size in sizes.items():
+        tier = 0 if size < MERGE_FLOOR else 1 + int(math.log(size / MERGE_FLOOR, MERGE_FACTOR))
+        tiers.setdefault(tier, []).append(name)
+    return tiers
+
+
+def _pick_merge(index_dir: Path, state: IndexState) -> list[str] | None:
+    sizes: dict[str, int] = {}
+    for name in state.segments:
+        rows = json.loads((index_dir / name / "sections.json").read_text())
+        dead = state.tombstones.get(name, set())
+        live = sum((project, path) not in dead for project, path, *_ in rows)
+        if rows and (len(rows) - live) / len(rows) > MAX_DEAD_RATIO:
+            return [name]
+        sizes[name] = live
+    for _, names in sorted(_tiers(sizes).items()):
+        if len(names) >= MERGE_FACTOR:
+            return sorted(names, key=sizes.__getitem__)[:MERGE_FACTOR]
+    return None
+
+
+def _merge(
+    index_dir: Path, names: list[str], dead: dict[str, set[tuple[str, str]]], target: str
+) -> bool:
+    """Write ``target`` holding the live sections of ``names``, reusing their postings.
+
+    Returns ``False`` without writing anything if no section is still live.
+    """
+    segments = [Segment(index_dir / name) for name in names]
+    try:
+        sections: list[Section] = []
+        remaps: list[list[int]] = []
+        for segment in segments:
+            remap = []
+            for section, alive in zip(segment.sections, segment.live(dead.get(segment.name, set()))):
+                remap.append(len(sections) if alive else -1)
+                if alive:
+                    sections.append(section)
+            remaps.append(remap)
+        if not sections:
+            return False
+        postings: Postings = {}
+        for segment, remap in zip(segments, remaps):
+            for term in segment.lexicon:
+                ids, tfs = segment.postings(term)
+                merged = postings.setdefault(term, [])
+                merged.extend((remap[d], tf) for d, tf in zip(ids, tfs) if remap[d] >= 0)
+                ids.release()
+                tfs.release()
+        _write_segment(index_dir / target, sections, postings)
+        return True
+    finally:
+        for segment in segments:
+            segment.close()
+
+
+def merge_segments(index_dir: Path) -> int:
+    """Merge segments until no tier is full; returns the number of merges.
+
+    The merge itself runs without the lock, so updates and queries proceed
+    meanwhile; files tombstoned in the inputs during the merge are carried
+    over to the merged segment when it is committed.
+    """
+    merges = 0
+    while True:
+        with _locked(index_dir):
+            state = IndexState.load(index_dir)
+            if state is None:
+                return merges
+            names = _pick_merge(index_dir, state)
+            if names is None:
+                return merges
+            snapshot = {n: set(state.tombstones.get(n, set())) for n in names}
+        target = _new_segment_name()
+        written = _merge(index_dir, names, snapshot, target)
+        with _locked(index_dir):
+            state = IndexState.load(index_dir)
+            if state is None or not set(names) <= set(state.segments):
+                shutil.rmtree(index_dir / target, ignore_errors=True)
+                return merges
+            late: set[tuple[str, str]] = set()
+            for name in names:
+                late |= state.tombstones.pop(name, set()) - snapshot[name]
+            if late:
+                state.tombstones[target] = late
+            position = state.segments.index(names[0])
+            state.segments = [n for n in state.segments if n not in names]
+            if written:
+                state.segments.insert(position, target)
+            for files in state.files.values():
+                for entry in files.values():
+                    if entry[1] in names:
+                        entry[1] = target
+            state.save(index_dir)
+            _remove_orphans(index_dir, state)
+        merges += 1
+        if written:
+            log.info("🧩 Merged %d index segment(s) into %s", len(names), target)
+        else:
+            log.info("🧩 Dropped %d fully tombstoned index segment(s)", len(names))
+
+
+def merge_in_background(index_dir: Path) -> threading.Thread:
+    """Start :func:`merge_segments` on a worker thread and return it."""
+
+    def run() -> None:
+        try:
+            merge_segments(index_dir)
+        except Exception as exc:  # a failed merge leaves the committed index intact
+            log.warning("⚠️  Index merge failed: %s", exc)
+
+    thread = threading.Thread(target=run, name="docsync-index-merge")
+    thread.start()
+    return thread
@@ -0,0 +1,432 @@
+"""Generate ``llms.txt`` and ``llms-full.txt`` for a mirrored project.
+
+Following the llms.txt convention, ``llms.txt`` is a markdown index: the
+site name, a one-line summary, then the pages as ``- [Title](path):
+description`` lines in navigation order, under one section per top-level
+navigation group. Top-level pages stay where the navigation puts them; a run
+of them forms a section named after its first page.
+``llms-full.txt`` concatenates the pages themselves in the same order.
+
+The page order and titles come from the ``nav`` of the project's
+``mkdocs.yml`` (fetched from upstream if it lies outside the sparse rules)
+or from Streamlit's ``menu.md``; without either, pages are grouped by
+directory. Descriptions are taken from front matter, else from the first
+paragraph of the page.
+
+Both files respect a token budget: ``llms.txt`` shortens descriptions and
+then drops trailing entries, ``llms-full.txt`` skips pages that no longer fit
+and lists them as links at the end. Output is cached by the content hashes
+of the pages and navigation, so it is only regenerated when pages change.
+
+Options: ``mkdocs`` (path of ``mkdocs.yml``, default ``"mkdocs.yml"``),
+``menu`` (path of a Streamlit ``menu.md``, used instead of ``mkdocs``),
+``budget`` and ``full_budget`` (tokens; default 16000 and 250000).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import posixpath
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+from urllib.parse import quote
+
+from . import tokens
+from .hooks import HookContext, hook
+from .reconcile import write_text_atomic
+
+log = logging.getLogger("docsync")
+
+# Bump when the generated files change, so cached output is not reused.
+VERSION = 2
+
+LLMS_TXT = "llms.txt"
+LLMS_FULL_TXT = "llms-full.txt"
+DEFAULT_BUDGET = 16_000
+DEFAULT_FULL_BUDGET = 250_000
+_DESCRIPTION_CHARS = 200
+
+_SKIP_PARAGRAPH = (
+    "#", "!!!", "???", "///", "```", "~~~", "<", "{*", "{{", "{%", ":::", "![", "[![", "|", ">",
+    "---", "***",
+)
+_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)|\[([^\]]*)\]\[[^\]]*\]")
+_NAV_PAIR_RE = re.compile(r"""^(?:'([^']*)'|"([^"]*)"|([^'":][^:]*?))\s*:(?:\s+(.+))?$""")
+_TAG_RE = re.compile(r"<[^>]+>")
+_EMPHASIS_RE = re.compile(r"(\*\*|__|\*|`)")
+
+
+@dataclass(frozen=True)
+class Entry:
+    """One page in navigation order; ``section`` is ``None`` for top-level pages."""
+
+    section: str | None
+    title: str
+    path: str  # repository-relative
+
+
+def front_matter(text: str) -> dict[str, str]:
+    """Top-level ``key: value`` pairs of a page's YAML front matter."""
+    if not text.startswith("---\n"):
+        return {}
+    end = text.find("\n---", 4)
+    if end < 0:
+        return {}
+    out = {}
+    for line in text[4:end].splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key and not key[0].isspace():
+            out[key.strip()] = value.strip().strip("\"'")
+    return out
+
+
+def _strip_front_matter(text: str) -> str:
+    if text.startswith("---\n") and (end := text.find("\n---", 4)) >= 0:
+        return text[text.find("\n", end + 1) + 1 :]
+    return text
+
+
+def first_heading(text: str) -> str | None:
+    fence = False
+    for line in _strip_front_matter(text).splitlines():
+        if line.lstrip().startswith(("```", "~~~")):
+            fence = not fence
+        elif not fence and line.startswith("# "):
+            return re.sub(r"\s*\{[^}]*\}\s*$", "", line[2:]).strip() or None
+    return None
+
+
+def _title(path: str, text: str) -> str:
+    """Front matter title, first H1, or the file name as mkdocs would show it."""
+    found = front_matter(text).get("title") or first_heading(text)
+    if found:
+        return found
+    stem = posixpath.basename(path).rsplit(".", 1)[0]
+    if stem in ("index", "README", "_index"):
+        stem = posixpath.basename(posixpath.dirname(path)) or stem
+    return stem.replace("-", " ").replace("_", " ").capitalize()
+
+
+def _plain(text: str) -> str:
+    text = _LINK_RE.sub(lambda m: m.group(1) or m.group(2) or "", text)
+    text = _EMPHASIS_RE.sub("", _TAG_RE.sub("", text))
+    return " ".join(text.split())
+
+
+def description(text: str) -> str:
+    """Front matter ``description``, else the page's first prose paragraph."""
+    meta = front_matter(text)
+    if meta.get("description"):
+        return _shorten(meta["description"], _DESCRIPTION_CHARS)
+    paragraph: list[str] = []
+    fence = False
+    skip: str | None = None  # end marker of a block being skipped ("" for a blank line)
+    for line in _strip_front_matter(text).splitlines():
+        stripped = line.strip()
+        if skip is not None:
+            if (skip and skip in stripped) or (not skip and not stripped):
+                skip = None
+            continue
+        if stripped.startswith(("```", "~~~")):
+            fence = not fence
+            continue
+        if fence:
+            continue
+        if paragraph and not stripped:
+            break
+        if not stripped or line[:1] in (" ", "\t") and not paragraph:
+            continue
+        if stripped.startswith(_SKIP_PARAGRAPH) and not paragraph:
+            raw = re.match(r"<(style|script|pre)\b", stripped)
+            if raw and f"</{raw.group(1)}>" not in stripped:
+                skip = f"</{raw.group(1)}>"
+            elif stripped.startswith("<"):
+                skip = ""  # an HTML block runs to the next blank line
+            continue
+        paragraph.append(stripped)
+    return _shorten(_plain(" ".join(paragraph)), _DESCRIPTION_CHARS)
+
+
+def _shorten(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    if limit <= 0:
+        return ""
+    return text[:limit].rsplit(" ", 1)[0].rstrip(",.;:") + "…"
+
+
+def _scalar(text: str) -> str:
+    text = text.strip()
+    if text[:1] in "'\"" and text[-1:] == text[:1]:
+        return text[1:-1]
+    return text
+
+
+def parse_mkdocs(text: str) -> tuple[dict[str, str], list[Any]]:
+    """Top-level scalars and the ``nav`` tree of an ``mkdocs.yml``.
+
+    Only the subset of YAML that navigation uses is understood: nested
+    lists of ``path``, ``Title: path`` and ``Title:`` groups. A nav item is
+    ``(title or None, path)`` or ``(title, [children])``.
+    """
+    settings: dict[str, str] = {}
+    root: list[Any] = []
+    stack: list[tuple[int, list[Any]]] = []
+    in_nav = False
+    for line in text.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        indent = len(line) - len(line.lstrip())
+        if indent == 0 and not line.startswith("-"):
+            key, _, value = line.partition(":")
+            in_nav = key.strip() == "nav"
+            if value.strip():
+                settings[key.strip()] = _scalar(value)
+            stack = [(-1, root)]
+            continue
+        if not in_nav or not line.lstrip().startswith("- "):
+            continue
+        item = line.lstrip()[2:].strip()
+        while len(stack) > 1 and stack[-1][0] >= indent:
+            stack.pop()
+        siblings = stack[-1][1]
+        pair = _NAV_PAIR_RE.match(item)
+        if pair is None:
+            siblings.append((None, _scalar(item)))
+            continue
+        title = next(g for g in pair.group(1, 2, 3) if g is not None)
+        if pair.group(4):
+            siblings.append((title, _scalar(pair.group(4))))
+        else:
+            children: list[Any] = []
+            siblings.append((title, children))
+            stack.append((indent, children))
+    return settings, root
+
+
+def mkdocs_entries(nav: list[Any], docs_dir: str) -> Iterator[tuple[list[str], str | None, str]]:
+    """Yield ``(groups, title, path)`` for every local markdown page in ``nav``."""
+
+    def walk(items: list[Any], groups: list[str]) -> Iterator[tuple[list[str], str | None, str]]:
+        for title, value in items:
+            if isinstance(value, list):
+                yield from walk(value, [*groups, title])
+            elif value.endswith(".md") and "://" not in value:
+                yield groups, title, posixpath.normpath(posixpath.join(docs_dir, value))
+
+    yield from walk(nav, [])
+
+
+def menu_entries(menu: str, slugs: dict[str, str]) -> Iterator[tuple[list[str], str | None, str]]:
+    """Yield ``(groups, title, path)`` from Streamlit's ``menu.md`` site menu."""
+    category = None
+    for line in menu.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("- category:"):
+            category = _scalar(stripped.partition(":")[2])
+        elif stripped.startswith("url:") and category is not None:
+            url = _scalar(stripped.partition(":")[2]).rstrip("/")
+            if url in slugs:
+                *groups, title = [part.strip() for part in category.split(" / ")]
+                # A top-level category's own page opens its section.
+                yield groups or [title], title, slugs[url]
+            category = None
+
+
+def _entries(
+    raw: Iterator[tuple[list[str], str | None, str]], pages: dict[str, str]
+) -> list[Entry]:
+    entries: list[Entry] = []
+    seen: set[str] = set()
+    for groups, title, path in raw:
+        if path not in pages or path in seen:
+            continue
+        seen.add(path)
+        title = title or _title(path, pages[path])
+        section = groups[0] if groups else None
+        trail = [*groups[1:], title]
+        if len(trail) > 1 and trail[-1] == trail[-2]:  # a group's own index page
+            trail.pop()
+        title = " / ".join(trail)
+        entries.append(Entry(section, title, path))
+    return entries
+
+
+def _directory_entries(pages: dict[str, str]) -> list[Entry]:
+    def key(path: str) -> tuple[str, bool, str]:
+        folder = posixpath.dirname(path)
+        return folder, not posixpath.basename(path).startswith(("index.", "README.")), path
+
+    entries = []
+    prefix = posixpath.commonpath(list(pages)) if len(pages) > 1 else ""
+    for path in sorted(pages, key=key):
+        rest = path[len(prefix) :].lstrip("/")
+        section = rest.split("/")[0] if "/" in rest else None
+        entries.append(Entry(section, _title(path, pages[path]), path))
+    return entries
+
+
+def sections(entries: list[Entry]) -> list[tuple[str, list[Entry]]]:
+    """Consecutive runs of ``entries`` sharing a section, in order, with their headings."""
+    runs: list[tuple[str, list[Entry]]] = []
+    current: object = object()
+    for entry in entries:
+        if entry.section != current:
+            runs.append((entry.section or entry.title, []))
+            current = entry.section
+        runs[-1][1].append(entry)
+    return runs
+
+
+def _line(entry: Entry, about: str, limit: int | None) -> str:
+    if limit is not None:
+        about = _shorten(about, limit)
+    link = f"- [{entry.title}]({quote(entry.path)})"
+    return link + (f": {about}" if about else "")
+
+
+def render_index(
+    title: str, summary: str, entries: list[Entry], pages: dict[str, str], budget: int
+) -> str:
+    """``llms.txt`` within ``budget`` tokens."""
+    described = {e.path: description(pages[e.path]) for e in entries}
+
+    def build(limit: int | None, count: int) -> str:
+        lines = [f"# {title}", ""]
+        if summary:
+            lines += [f"> {summary}", ""]
+        for section, members in sections(entries[:count]):
+            lines += [f"## {section}", ""]
+            for entry in members:
+                lines.append(_line(entry, described[entry.path], limit))
+            lines.append("")
+        if count < len(entries):
+            lines.append(f"*{len(entries) - count} more pages omitted to fit the token budget.*")
+        return "\n".join(lines).rstrip("\n") + "\n"
+
+    if tokens.estimate(text := build(None, len(entries))) <= budget:
+        return text
+
+    def largest(fits: Callable[[int], bool], high: int) -> int:
+        low = 0
+        while low < high:
+            mid = (low + high + 1) // 2
+            if fits(mid):
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    # Shorten every description evenly before dropping any entry.
+    if tokens.estimate(build(0, len(entries))) <= budget:
+        limit = largest(lambda n: tokens.estimate(build(n, len(entries))) <= budget, 200)
+        return build(limit, len(entries))
+    count = largest(lambda n: tokens.estimate(build(0, n)) <= budget, len(entries))
+    return build(0, count)
+
+
+def render_full(
+    title: str, summary: str, entries: list[Entry], pages: dict[str, str], budget: int
+) -> str:
+    """``llms-full.txt``: page bodies in navigation order within ``budget`` tokens."""
+    header = [f"# {title}", ""] + ([f"> {summary}", ""] if summary else [])
+    head = "\n".join(header)
+    bodies: list[tuple[Entry, str, int]] = []
+    for entry in entries:
+        body = _strip_front_matter(pages[entry.path]).strip()
+        part = f"\n---\n\nSource: {entry.path}\n\n{body}\n"
+        bodies.append((entry, part, tokens.estimate(part)))
+
+    def omitted(skipped: list[Entry]) -> str:
+        if not skipped:
+            return ""
+        links = "".join(f"- [{e.title}]({quote(e.path)})\n" for e in skipped)
+        return f"\n---\n\n## Omitted to fit the token budget\n\n{links}"
+
+    kept: list[int] = []
+    used = tokens.estimate(head)
+    for i, (_, _, cost) in enumerate(bodies):
+        if used + cost <= budget:
+            kept.append(i)
+            used += cost
+    # The list of skipped pages costs tokens too; drop the last pages until it fits.
+    while True:
+        chosen = set(kept)
+        skipped = [e for i, (e, _, _) in enumerate(bodies) if i not in chosen]
+        tail = omitted(skipped)
+        if not kept or used + tokens.estimate(tail) <= budget:
+            break
+        used -= bodies[kept.pop()][2]
+    return head + "".join(bodies[i][1] for i in kept) + tail
+
+
+@hook("llms-txt", version=VERSION)
+def llms_txt(ctx: HookContext) -> None:
+    """Write ``llms.txt`` and ``llms-full.txt`` at the root of the published tree."""
+    options = ctx.options
+    budget = int(options.get("budget", DEFAULT_BUDGET))
+    full_budget = int(options.get("full_budget", DEFAULT_FULL_BUDGET))
+    nav_path = str(options.get("menu") or options.get("mkdocs", "mkdocs.yml"))
+
+    pages: dict[str, str] = {}
+    for rel, path in ctx.files.items():
+        if rel.endswith(".md") and rel not in (LLMS_TXT, LLMS_FULL_TXT) and not path.is_symlink():
+            pages[rel] = path.read_text(encoding="utf-8", errors="replace")
+    if not pages:
+        return
+    if nav_path in ctx.files:
+        nav_source = ctx.files[nav_path].read_text(encoding="utf-8")
+    else:
+        nav_source = ctx.upstream([nav_path]).get(nav_path, b"").decode("utf-8", "replace")
+
+    key = hashlib.sha256(
+        json.dumps([VERSION, budget, full_budget, nav_path, nav_source]).encode()
+    )
+    for rel in sorted(pages):
+        key.update(f"\0{rel}\0{hashlib.sha256(pages[rel].encode()).hexdigest()}".encode())
+    digest = key.hexdigest()
+    cached = ctx.cache / digest[:2] / digest if ctx.cache is not None else None
+    if cached is not None and (cached / LLMS_FULL_TXT).is_file():
+        ctx.write_text(LLMS_TXT, (cached / LLMS_TXT).read_text(encoding="utf-8"))
+        ctx.write_text(LLMS_FULL_TXT, (cached / LLMS_FULL_TXT).read_text(encoding="utf-8"))
+        log.info("[%s] 🗺️  llms.txt unchanged, reused from cache", ctx.project.name)
+        return
+
+    title, summary = ctx.project.name, ""
+    if options.get("menu"):
+        slugs = {}
+        for rel, text in pages.items():
+            if slug := front_matter(text).get("slug"):
+                slugs[slug.rstrip("/")] = rel
+        entries = _entries(menu_entries(nav_source, slugs), pages)
+        home = front_matter(pages.get(posixpath.join(posixpath.dirname(nav_path), "index.md"), ""))
+        title = home.get("title") or title
+        summary = home.get("description", "")
+    else:
+        settings, nav = parse_mkdocs(nav_source)
+        title = settings.get("site_name", title)
+        summary = settings.get("site_description", "")
+        base = posixpath.dirname(nav_path)
+        docs_dir = posixpath.normpath(posixpath.join(base, settings.get("docs_dir", "docs")))
+        entries = _entries(mkdocs_entries(nav, docs_dir), pages)
+    if not entries:
+        entries = _directory_entries(pages)
+
+    index = render_index(title, summary, entries, pages, budget)
+    full = render_full(title, summary, entries, pages, full_budget)
+    ctx.write_text(LLMS_TXT, index)
+    ctx.write_text(LLMS_FULL_TXT, full)
+    if cached is not None:
+        cached.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(cached / LLMS_TXT, index)
+        write_text_atomic(cached / LLMS_FULL_TXT, full)
+    log.info(
+        "[%s] 🗺️  Wrote llms.txt (%d pages, ~%d tokens) and llms-full.txt (~%d tokens)",
+        ctx.project.name,
+        len(entries),
+        tokens.estimate(index),
+        tokens.estimate(full),
+    )
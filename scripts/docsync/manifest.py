@@ -0,0 +1,163 @@
+"""Machine-readable ``.sync-manifest.json`` written into each synced project."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import subprocess
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .config import Project
+from .git import git
+from .hooks import HOOK_VERSIONS
+from .reconcile import write_text_atomic
+
+MANIFEST = ".sync-manifest.json"
+VERSION = 3
+
+
+@dataclass
+class FileEntry:
+    """One synced file, as published in the destination tree."""
+
+    path: str
+    size: int
+    sha256: str
+    blob: str
+    last_commit: str
+
+
+@dataclass
+class Manifest:
+    """What was synced into a project directory, and from which commit."""
+
+    repo: str
+    branch: str
+    commit: str
+    patterns: list[str]
+    synced_at: str
+    files: list[FileEntry] = field(default_factory=list)
+    tag: str | None = None
+    hooks: str = ""
+    version: int = VERSION
+
+    def is_current(self, project: Project, commit: str) -> bool:
+        """Whether this manifest already describes ``project`` at ``commit``."""
+        return (
+            self.version == VERSION
+            and self.repo == project.repo
+            and self.branch == project.branch
+            and self.tag == project.tag
+            and self.patterns == list(project.patterns)
+            and self.hooks == hooks_fingerprint(project)
+            and self.commit == commit
+        )
+
+    def by_path(self) -> dict[str, FileEntry]:
+        return {f.path: f for f in self.files}
+
+
+def hooks_fingerprint(project: Project) -> str:
+    """A digest of the project's hooks, their versions and options, in order.
+
+    Stored in the manifest so adding, removing, reconfiguring or upgrading a
+    hook re-runs the sync even when the upstream commit is unchanged.
+    """
+    specs = [[spec.name, HOOK_VERSIONS.get(spec.name), spec.options] for spec in project.hooks]
+    text = json.dumps(specs, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def load_manifest(dest: Path) -> Manifest | None:
+    """Read the manifest in ``dest``; ``None`` if it is missing or unreadable."""
+    try:
+        data = json.loads((dest / MANIFEST).read_text())
+        data["files"] = [FileEntry(**f) for f in data.get("files", [])]
+        return Manifest(**data)
+    except (FileNotFoundError, ValueError, TypeError):
+        return None
+
+
+def _iso(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _blob_ids(workdir: Path) -> dict[str, str]:
+    out = git("ls-tree", "-r", "-z", "--full-tree", "HEAD", cwd=workdir)
+    blobs = {}
+    for record in out.split("\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition("\t")
+        blobs[path] = meta.split()[2]
+    return blobs
+
+
+def _last_commit_times(workdir: Path, paths: set[str]) -> dict[str, int]:
+    """Walk history newest-first until every path's latest commit is known."""
+    times: dict[str, int] = {}
+    proc = subprocess.Popen(
+        ["git", "log", "--format=%x00%ct", "--name-only", "--no-renames", "HEAD"],
+        cwd=workdir,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    assert proc.stdout is not None
+    current = 0
+    try:
+        for line in proc.stdout:
+            line = line.rstrip("\n")
+            if line.startswith("\0"):
+                current = int(line[1:])
+            elif line in paths and line not in times:
+                times[line] = current
+                if len(times) == len(paths):
+                    break
+    finally:
+        proc.kill()
+        proc.wait()
+    return times
+
+
+def file_entries(
+    workdir: Path,
+    sizes: dict[str, int],
+    hashes: dict[str, str],
+    previous: Manifest | None,
+) -> list[FileEntry]:
+    """Describe every published file of the checkout in ``workdir``.
+
+    With full history the last-commit time is read from ``git log``. Shallow
+    checkouts only have the head commit, so files whose blob is unchanged
+    keep the time from the ``previous`` manifest and changed files get the
+    head commit's time, which is exact for a sync after every upstream push.
+    """
+    blobs = _blob_ids(workdir)
+    head_time = int(git("show", "-s", "--format=%ct", "HEAD", cwd=workdir))
+    shallow = git("rev-parse", "--is-shallow-repository", cwd=workdir).strip() == "true"
+    before = previous.by_path() if previous is not None else {}
+    if shallow:
+        times = {}
+    else:
+        times = _last_commit_times(workdir, set(hashes))
+
+    entries = []
+    for path in sorted(hashes):
+        blob = blobs.get(path, "")
+        if path in times:
+            last_commit = _iso(times[path])
+        elif path in before and before[path].blob == blob and blob:
+            last_commit = before[path].last_commit
+        else:
+            last_commit = _iso(head_time)
+        entries.append(FileEntry(path, sizes[path], hashes[path], blob, last_commit))
+    return entries
+
+
+def write_manifest(dest: Path, manifest: Manifest) -> None:
+    """Atomically write ``manifest`` into ``dest``."""
+    text = json.dumps(asdict(manifest), indent=2, sort_keys=True) + "\n"
+    write_text_atomic(dest / MANIFEST, text)
@@ -0,0 +1,318 @@
+"""Serve the synced docs to agents over MCP (stdio or streamable HTTP).
+
+Three tools are exposed: ``search`` (BM25 over heading sections),
+``get_section`` and ``list_pages``, plus ``server_stats`` with per-tool
+p50/p99 latencies. Lookups go through the memory-mapped search index and a
+bounded LRU of parsed pages (bytes plus chunks), so concurrent tool calls
+for hot pages never touch the disk; with ``--corpus`` page bytes come from
+a memory-mapped pack instead of the tree. Search hits and sections carry
+their token counts from the sidecar (see :mod:`docsync.tokens`).
+
+The ``mcp`` package is only needed to run the server; :class:`DocsService`
+works without it.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Generic, Hashable, TypeVar
+
+from .chunker import Chunk, ChunkCache
+from .config import SyncSettings
+from .corpus import Corpus
+from .index import INDEX_FILE, SearchIndex
+from .tokens import TokenCounts
+from .versions import published_trees
+
+log = logging.getLogger("docsync")
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class LRUCache(Generic[K, V]):
+    """A thread-safe, size-bounded least recently used cache."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key: K, load: Callable[[], V]) -> V:
+        """Return the cached value for ``key``, loading it on a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = load()  # outside the lock: a slow load must not block hits
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LatencyStats:
+    """Per-name latency samples over a sliding window, with percentiles."""
+
+    def __init__(self, window: int = 10_000) -> None:
+        self._samples: dict[str, deque[float]] = {}
+        self._counts: dict[str, int] = {}
+        self._window = window
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self._window)).append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """Decorator recording the wall time of every call under ``name``."""
+
+        def decorate(fn: F) -> F:
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorate
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """``{name: {calls, p50_ms, p99_ms, max_ms}}`` over the current window."""
+        with self._lock:
+            snapshot = {name: sorted(s) for name, s in self._samples.items()}
+            counts = dict(self._counts)
+        out = {}
+        for name, samples in snapshot.items():
+            out[name] = {
+                "calls": counts[name],
+                "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+                "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+                "max_ms": round(samples[-1] * 1000, 3),
+            }
+        return out
+
+
+def _percentile(ordered: list[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+@dataclass(frozen=True)
+class Page:
+    """A parsed markdown page held in the LRU cache."""
+
+    data: bytes
+    chunks: list[Chunk]
+    sha256: str = ""
+
+    def text(self, chunk: Chunk | None = None) -> str:
+        if chunk is None:
+            return self.data.decode("utf-8", "replace")
+        return self.data[chunk.offset : chunk.offset + chunk.length].decode("utf-8", "replace")
+
+
+class DocsService:
+    """The tool implementations, independent of any MCP transport.
+
+    The index is reopened transparently when a sync commits a new
+    ``index.json``; cached pages are dropped at the same time.
+    """
+
+    def __init__(
+        self,
+        settings: SyncSettings,
+        root: Path,
+        index_dir: Path,
+        corpus: Path | None = None,
+        cache_entries: int = 2048,
+    ) -> None:
+        self.settings = settings
+        self.root = root
+        self.index_dir = index_dir
+        self.corpus = Corpus(corpus) if corpus is not None else None
+        self.pages: LRUCache[tuple[str, str], Page] = LRUCache(cache_entries)
+        self.latency = LatencyStats()
+        self._chunker = ChunkCache(
+            root / settings.chunks if settings.chunks else None, max_entries=cache_entries
+        )
+        self._lock = threading.Lock()
+        self._index: SearchIndex | None = None
+        self._stamp = 0.0
+        self._files: dict[str, dict[str, str]] = {}
+        self._dests: dict[str, str] = {}
+        self.tokens = TokenCounts()
+        self._refresh()
+
+    def _refresh(self) -> SearchIndex:
+        stamp = (self.index_dir / INDEX_FILE).stat().st_mtime
+        with self._lock:
+            if self._index is None or stamp != self._stamp:
+                # The old index's mmaps are left to the garbage collector, since
+                # in-flight searches may still be reading them.
+                self._index = SearchIndex(self.index_dir)
+                self._stamp = stamp
+                trees = published_trees(self.settings.projects, self.root)
+                self._files = {p.name: {f.path: f.sha256 for f in m.files} for p, m in trees}
+                self._dests = dict(self._index.dests)
+                if self.settings.tokens:
+                    self.tokens = TokenCounts.load(self.root / self.settings.tokens)
+                self.pages.clear()
+            return self._index
+
+    def index(self) -> SearchIndex:
+        """The current search index, reopened if a sync has replaced it since."""
+        return self._refresh()
+
+    def page(self, project: str, path: str) -> Page:
+        """The bytes and chunks of a page, from the LRU cache when possible."""
+        files = self._files.get(project)
+        if files is None:
+            raise KeyError(f"unknown project {project!r}")
+        if path not in files:
+            raise KeyError(f"{path!r} is not a page of {project!r}")
+
+        def load() -> Page:
+            if self.corpus is not None and f"{project}/{path}" in self.corpus:
+                data = bytes(self.corpus.get(f"{project}/{path}"))
+            else:
+                data = (self.root / self._dests[project] / path).read_bytes()
+            return Page(data, self._chunker.chunks(data, files[path]), files[path])
+
+        return self.pages.get_or_load((project, path), load)
+
+    def section_tokens(self, project: str, path: str, offset: int, length: int) -> int:
+        """The size of a section: from the token sidecar, else estimated from its bytes."""
+        sha256 = self._files.get(project, {}).get(path)
+        found = self.tokens.section(sha256, offset) if sha256 else None
+        if found is None:
+            data = self.page(project, path).data[offset : offset + length]
+            found = self.tokens.estimator.estimate(data)
+        return found
+
+    def search(self, query: str, project: str | None = None, limit: int = 10) -> list[dict]:
+        index = self._refresh()
+        results = []
+        for hit in index.search(query, max(1, min(limit, 50)), project):
+            s = hit.section
+            page = self.page(s.project, s.path)
+            body = page.text(next((c for c in page.chunks if c.offset == s.offset), None))
+            if s.title:
+                body = body.partition("\n")[2]
+            snippet = " ".join(body.split())
+            results.append({
+                "project": s.project,
+                "path": s.path,
+                "anchor": s.anchor,
+                "title": s.title,
+                "breadcrumbs": list(s.breadcrumbs),
+                "score": round(hit.score, 4),
+                "tokens": self.section_tokens(s.project, s.path, s.offset, s.length),
+                "snippet": snippet[:240],
+            })
+        return results
+
+    def get_section(self, project: str, path: str, anchor: str | None = None) -> dict:
+        self._refresh()
+        page = self.page(project, path)
+        if not anchor:
+            tokens = self.tokens.page(page.sha256)
+            if tokens is None:
+                tokens = self.tokens.estimator.estimate(page.data)
+            return {"project": project, "path": path, "tokens": tokens, "text": page.text()}
+        parts = [c for c in page.chunks if c.anchor == anchor]
+        if not parts:
+            raise KeyError(f"no section #{anchor} in {project}/{path}")
+        return {
+            "project": project,
+            "path": path,
+            "anchor": anchor,
+            "title": parts[0].title,
+            "breadcrumbs": list(parts[0].breadcrumbs),
+            "tokens": sum(self.section_tokens(project, path, c.offset, c.length) for c in parts),
+            "text": "".join(page.text(c) for c in parts),
+        }
+
+    def list_pages(self, project: str, prefix: str = "") -> list[str]:
+        self._refresh()
+        files = self._files.get(project)
+        if files is None:
+            raise KeyError(f"unknown project {project!r}")
+        return sorted(p for p in files if p.endswith(".md") and p.startswith(prefix))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "latency": self.latency.summary(),
+            "page_cache": {
+                "entries": len(self.pages),
+                "capacity": self.pages.max_entries,
+                "hits": self.pages.hits,
+                "misses": self.pages.misses,
+            },
+            "projects": sorted(self._files),
+        }
+
+
+def build_server(service: DocsService) -> Any:
+    """Wrap ``service`` in an MCP server; needs the ``mcp`` package."""
+    from mcp.server.mcpserver import MCPServer
+
+    mcp = MCPServer(
+        "agent-docs",
+        instructions=(
+            "Search and read up-to-date documentation mirrored from upstream projects: "
+            + ", ".join(sorted(service.stats()["projects"]))
+        ),
+    )
+    timed = service.latency.timed
+
+    @mcp.tool()
+    @timed("search")
+    def search(query: str, project: str | None = None, limit: int = 10) -> list[dict]:
+        """Rank documentation sections for a query, best first. Optionally restrict to one project."""
+        return service.search(query, project, limit)
+
+    @mcp.tool()
+    @timed("get_section")
+    def get_section(project: str, path: str, anchor: str | None = None) -> dict:
+        """Return the markdown of one section (by heading anchor) or of a whole page."""
+        return service.get_section(project, path, anchor)
+
+    @mcp.tool()
+    @timed("list_pages")
+    def list_pages(project: str, prefix: str = "") -> list[str]:
+        """List the markdown pages of a project, optionally under a path prefix."""
+        return service.list_pages(project, prefix)
+
+    @mcp.tool()
+    def server_stats() -> dict:
+        """Per-tool call counts and p50/p99 latencies, and page cache hit rates."""
+        return service.stats()
+
+    return mcp
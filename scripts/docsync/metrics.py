@@ -0,0 +1,136 @@
+"""Structured per-project, per-phase sync metrics.
+
+A run's results are turned into one JSON document, which can also be
+rendered as a Prometheus textfile (for node_exporter's textfile collector)
+or as a Markdown table for the GitHub Actions job summary.
+"""
+
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .engine import SyncResult
+from .reconcile import write_text_atomic
+
+COUNTERS = ("bytes_received", "objects_fetched", "files_written", "files_deleted", "bytes_written")
+
+
+def _status(result: SyncResult) -> str:
+    return "failed" if not result.ok else "skipped" if result.skipped else "synced"
+
+
+def collect(results: list[SyncResult], run_at: datetime, wall: float) -> dict[str, Any]:
+    """Build the metrics document for one run."""
+    projects = []
+    for r in results:
+        phases = {}
+        for name, seconds in r.phases.items():
+            phase: dict[str, Any] = {"seconds": round(seconds, 4)}
+            phase.update(r.counters.get(name, {}))
+            phases[name] = phase
+        totals = {c: sum(p.get(c, 0) for p in phases.values()) for c in COUNTERS}
+        projects.append(
+            {
+                "project": r.project.name,
+                "status": _status(r),
+                "seconds": round(r.seconds, 4),
+                "commit": r.commit,
+                "error": r.error,
+                "phases": phases,
+                **totals,
+            }
+        )
+    return {
+        "run": run_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "timestamp": int(run_at.timestamp()),
+        "wall_seconds": round(wall, 4),
+        "projects": projects,
+    }
+
+
+_HELP = {
+    "docsync_last_run_timestamp_seconds": "Unix time the sync run started.",
+    "docsync_run_duration_seconds": "Wall-clock time of the whole sync run.",
+    "docsync_project_duration_seconds": "Time spent syncing a project.",
+    "docsync_project_status": "1 for the outcome of the project's last sync.",
+    "docsync_phase_duration_seconds": "Time spent in a sync phase.",
+    "docsync_phase_bytes_received": "Bytes of git objects received in a sync phase.",
+    "docsync_phase_objects_fetched": "Git objects received in a sync phase.",
+    "docsync_phase_files_written": "Files added or rewritten in a sync phase.",
+    "docsync_phase_files_deleted": "Files deleted in a sync phase.",
+    "docsync_phase_bytes_written": "Bytes of files written in a sync phase.",
+}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def to_prometheus(doc: dict[str, Any]) -> str:
+    """Render ``doc`` in the Prometheus text exposition format."""
+    samples: dict[str, list[str]] = {name: [] for name in _HELP}
+
+    def add(metric: str, value: float, **labels: str) -> None:
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        samples[metric].append(f"{metric}{{{body}}} {value}" if body else f"{metric} {value}")
+
+    add("docsync_last_run_timestamp_seconds", doc["timestamp"])
+    add("docsync_run_duration_seconds", doc["wall_seconds"])
+    for p in doc["projects"]:
+        name = p["project"]
+        add("docsync_project_duration_seconds", p["seconds"], project=name)
+        for status in ("synced", "skipped", "failed"):
+            add("docsync_project_status", int(p["status"] == status), project=name, status=status)
+        for phase, values in p["phases"].items():
+            add("docsync_phase_duration_seconds", values["seconds"], project=name, phase=phase)
+            for counter in COUNTERS:
+                if counter in values:
+                    add(f"docsync_phase_{counter}", values[counter], project=name, phase=phase)
+
+    lines = []
+    for metric, help_text in _HELP.items():
+        if samples[metric]:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge", *samples[metric]]
+    return "\n".join(lines) + "\n"
+
+
+def _human_bytes(n: int) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GiB"
+
+
+def to_markdown(doc: dict[str, Any]) -> str:
+    """Render ``doc`` as a Markdown timing table for job summaries."""
+    phases: list[str] = []
+    for p in doc["projects"]:
+        phases += [name for name in p["phases"] if name not in phases]
+    head = ["Project", "Status", "Total (s)", *[f"{name} (s)" for name in phases]]
+    head += ["Received", "Objects", "Files written"]
+    lines = ["| " + " | ".join(head) + " |", "|" + "---|" * len(head)]
+    for p in doc["projects"]:
+        row = [p["project"], p["status"], f"{p['seconds']:.2f}"]
+        row += [
+            f"{p['phases'][name]['seconds']:.2f}" if name in p["phases"] else "–" for name in phases
+        ]
+        row += [_human_bytes(p["bytes_received"]), str(p["objects_fetched"]), str(p["files_written"])]
+        lines.append("| " + " | ".join(row) + " |")
+    lines.append("")
+    lines.append(f"Wall time: {doc['wall_seconds']:.2f}s")
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(doc: dict[str, Any], json_path: Path | None, prom_path: Path | None) -> None:
+    """Write ``doc`` to whichever of the JSON and Prometheus paths are given."""
+    for path, text in (
+        (json_path, lambda: json.dumps(doc, indent=2) + "\n"),
+        (prom_path, lambda: to_prometheus(doc)),
+    ):
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(path, text())
@@ -0,0 +1,258 @@
+"""Single-file, seekable corpus pack of every synced tree.
+
+Layout::
+
+    b"DOCPACK1"
+    frame ...                 one compressed frame per distinct file content
+    index                     zlib-compressed JSON: codec, projects, file table
+    <Q offset><I length>b"DOCPACK1"   trailer locating the index
+
+Each document is compressed on its own (a zstd frame, or a zlib stream when
+``zstandard`` is not installed), so a reader seeks straight to one file and
+decompresses only that. Identical contents, e.g. a page unchanged across
+release snapshots, share one frame. Rebuilding a pack copies the frames of
+unchanged files from the previous pack instead of compressing them again.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import tempfile
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterable, Iterator
+
+from .config import ConfigError, Project
+from .manifest import Manifest
+
+log = logging.getLogger("docsync")
+
+MAGIC = b"DOCPACK1"
+FORMAT = 1
+CODECS = ("zstd", "zlib", "none")
+TRAILER = struct.Struct(f"<QI{len(MAGIC)}s")
+_DEFAULT_LEVEL = {"zstd": 19, "zlib": 9, "none": 0}
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def default_codec() -> str:
+    """``zstd`` when the ``zstandard`` package is available, else ``zlib``."""
+    return "zstd" if _zstd() is not None else "zlib"
+
+
+def _compressor(codec: str, level: int) -> Callable[[bytes], bytes]:
+    if codec == "zstd":
+        zstandard = _zstd()
+        if zstandard is None:
+            raise ConfigError("the zstd codec needs the 'zstandard' package")
+        return zstandard.ZstdCompressor(level=level).compress
+    if codec == "zlib":
+        return lambda data: zlib.compress(data, level)
+    if codec == "none":
+        return bytes
+    raise ConfigError(f"unknown pack codec {codec!r} (expected one of {', '.join(CODECS)})")
+
+
+def decompressor(codec: str) -> Callable[[bytes], bytes]:
+    if codec == "zstd":
+        zstandard = _zstd()
+        if zstandard is None:
+            raise ConfigError("reading a zstd pack needs the 'zstandard' package")
+        return zstandard.ZstdDecompressor().decompress
+    if codec == "zlib":
+        return zlib.decompress
+    if codec == "none":
+        return bytes
+    raise ValueError(f"unknown pack codec {codec!r}")
+
+
+@dataclass(frozen=True)
+class PackEntry:
+    """Where one document lives inside a pack."""
+
+    project: str
+    path: str
+    offset: int
+    length: int
+    size: int
+    sha256: str
+
+
+@dataclass
+class PackStats:
+    files: int = 0
+    frames: int = 0
+    reused: int = 0
+    raw_bytes: int = 0
+    packed_bytes: int = 0
+
+
+def parse_index(blob: bytes | memoryview) -> dict[str, Any]:
+    """Decode the index of a pack and validate its format version."""
+    index = json.loads(zlib.decompress(blob))
+    if index.get("format") != FORMAT:
+        raise ValueError(f"unsupported pack format {index.get('format')!r}")
+    index["files"] = [PackEntry(*row) for row in index["files"]]
+    return index
+
+
+def locate_index(trailer: bytes | memoryview) -> tuple[int, int]:
+    """Return ``(offset, length)`` of the index from the last bytes of a pack."""
+    offset, length, magic = TRAILER.unpack(trailer)
+    if magic != MAGIC:
+        raise ValueError("not a docsync pack (bad trailer)")
+    return offset, length
+
+
+class PackReader:
+    """Random access to the documents of a pack, by project and path."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._fh: BinaryIO = open(self.path, "rb")
+        try:
+            if self._fh.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a docsync pack")
+            self._fh.seek(-TRAILER.size, os.SEEK_END)
+            offset, length = locate_index(self._fh.read(TRAILER.size))
+            self._fh.seek(offset)
+            index = parse_index(self._fh.read(length))
+        except BaseException:
+            self._fh.close()
+            raise
+        self.codec: str = index["codec"]
+        self.level: int = index["level"]
+        self.created: str = index["created"]
+        self.projects: dict[str, dict[str, Any]] = index["projects"]
+        self.entries: dict[tuple[str, str], PackEntry] = {
+            (e.project, e.path): e for e in index["files"]
+        }
+        self._decompress = decompressor(self.codec)
+
+    def __enter__(self) -> PackReader:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._fh.close()
+
+    def frame(self, entry: PackEntry) -> bytes:
+        """The still-compressed bytes of ``entry``."""
+        self._fh.seek(entry.offset)
+        return self._fh.read(entry.length)
+
+    def read(self, project: str, path: str) -> bytes:
+        """Decompress one document; raises ``KeyError`` if it is not in the pack."""
+        return self._decompress(self.frame(self.entries[project, path]))
+
+    def __iter__(self) -> Iterator[PackEntry]:
+        return iter(self.entries.values())
+
+
+def write_pack(
+    out: Path,
+    trees: Iterable[tuple[Project, Manifest]],
+    root: Path,
+    codec: str | None = None,
+    level: int | None = None,
+) -> PackStats:
+    """Pack the files listed in each manifest into ``out``, atomically.
+
+    Contents are taken from the manifests' SHA-256, so nothing is re-hashed;
+    if ``out`` already holds a pack with the same codec and level, frames of
+    contents it already contains are copied over verbatim.
+    """
+    codec = codec or default_codec()
+    level = _DEFAULT_LEVEL[codec] if level is None else level
+    compress = _compressor(codec, level)
+    previous: PackReader | None = None
+    reusable: dict[str, PackEntry] = {}
+    if out.is_file():
+        try:
+            previous = PackReader(out)
+        except (OSError, ValueError, ConfigError) as exc:
+            log.warning("⚠️  Ignoring unreadable previous pack %s: %s", out, exc)
+        else:
+            if (previous.codec, previous.level) == (codec, level):
+                reusable = {e.sha256: e for e in previous}
+
+    stats = PackStats()
+    projects: dict[str, dict[str, Any]] = {}
+    rows: list[list[Any]] = []
+    frames: dict[str, tuple[int, int]] = {}
+    out.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=out.parent, prefix=f".{out.name}.")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(MAGIC)
+            for project, manifest in trees:
+                projects[project.name] = {
+                    "dest": project.dest,
+                    "repo": manifest.repo,
+                    "branch": manifest.branch,
+                    "tag": manifest.tag,
+                    "commit": manifest.commit,
+                    "synced_at": manifest.synced_at,
+                }
+                dest = root / project.dest
+                for entry in manifest.files:
+                    source = dest / entry.path
+                    if source.is_symlink() or not source.is_file():
+                        continue
+                    if entry.sha256 not in frames:
+                        if entry.sha256 in reusable:
+                            frame = previous.frame(reusable[entry.sha256])
+                            stats.reused += 1
+                        else:
+                            frame = compress(source.read_bytes())
+                        frames[entry.sha256] = (fh.tell(), len(frame))
+                        fh.write(frame)
+                        stats.frames += 1
+                        stats.packed_bytes += len(frame)
+                    offset, length = frames[entry.sha256]
+                    rows.append(
+                        [project.name, entry.path, offset, length, entry.size, entry.sha256]
+                    )
+                    stats.files += 1
+                    stats.raw_bytes += entry.size
+            index = zlib.compress(
+                json.dumps(
+                    {
+                        "format": FORMAT,
+                        "codec": codec,
+                        "level": level,
+                        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        "projects": projects,
+                        "files": rows,
+                    },
+                    separators=(",", ":"),
+                ).encode(),
+                9,
+            )
+            offset = fh.tell()
+            fh.write(index)
+            fh.write(TRAILER.pack(offset, len(index), MAGIC))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, out)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+    finally:
+        if previous is not None:
+            previous.close()
+    return stats
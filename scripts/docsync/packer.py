@@ -0,0 +1,212 @@
+"""Pack the most useful documentation sections into a prompt's token budget.
+
+Candidates are heading sections, taken either from a BM25 query over the
+search index or from an explicit list of pages (in the order given, each
+page's sections in document order). They are taken greedily, best first,
+skipping any that no longer fit, and a candidate is dropped as a duplicate
+when
+
+- another language copy of the same page was already packed:
+  ``docs/ja/handoffs.md`` and ``docs/handoffs.md`` share a key once the
+  language directory is removed, and only the first to be packed is kept;
+- its text is nearly identical to a packed section (Jaccard similarity of
+  word 3-shingles of at least ``similarity``), which catches boilerplate
+  repeated across pages.
+
+Section sizes come from the token sidecar (:mod:`docsync.tokens`), keyed
+by the page's content hash, so a candidate's cost is known without reading
+or tokenizing it; pages are only loaded, through the :class:`DocsService`
+LRU, for sections that fit. Packed sections are emitted grouped by page, in
+document order.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+from .mcp_server import DocsService
+from .tokens import estimate
+
+# Language directories used by the mirrored sites: openai-agents keeps
+# translations in docs/<lang>/, FastAPI-style sites in docs/<lang>/docs/.
+LANGUAGES = frozenset(
+    "ar bn cs de el en es fa fr he hi hu id it ja ko nl pl pt pt-br ru sv th tr uk vi "
+    "zh zh-hant zh-hans zh-tw".split()
+)
+_LANGUAGE_DIR_RE = re.compile(r"(?:^|/)docs/([a-z]{2}(?:-[a-z]{2,4})?)/")
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """A section worth ``score``, addressed by its page and byte range."""
+
+    score: float
+    project: str
+    path: str
+    offset: int
+    length: int
+
+
+@dataclass(frozen=True)
+class PackedSection:
+    project: str
+    path: str
+    title: str
+    anchor: str
+    breadcrumbs: tuple[str, ...]
+    offset: int
+    score: float
+    tokens: int
+    text: str
+
+    @property
+    def source(self) -> str:
+        return f"{self.project}/{self.path}" + (f"#{self.anchor}" if self.anchor else "")
+
+    def render(self) -> str:
+        return f"Source: {self.source}\n\n{self.text.strip()}\n"
+
+
+@dataclass
+class Packed:
+    """The outcome of one :meth:`ContextPacker.pack` call."""
+
+    budget: int
+    sections: list[PackedSection] = field(default_factory=list)
+    candidates: int = 0
+    translations: int = 0
+    duplicates: int = 0
+    too_large: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return sum(s.tokens for s in self.sections) + _SEPARATOR_TOKENS * max(
+            0, len(self.sections) - 1
+        )
+
+    def render(self) -> str:
+        return _SEPARATOR.join(s.render() for s in self.sections)
+
+
+_SEPARATOR = "\n---\n\n"
+_SEPARATOR_TOKENS = estimate(_SEPARATOR)
+
+
+def language_key(path: str) -> str:
+    """``path`` with its language directory removed, shared by all translations."""
+    match = _LANGUAGE_DIR_RE.search(path)
+    if match is None or match.group(1) not in LANGUAGES:
+        return path
+    return path[: match.start(1)] + path[match.end(1) + 1 :]
+
+
+def shingles(text: str, width: int = 3) -> frozenset[int]:
+    """Hashes of the lowercased word ``width``-grams of ``text``."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < width:
+        return frozenset((hash(tuple(words)),)) if words else frozenset()
+    return frozenset(hash(tuple(words[i : i + width])) for i in range(len(words) - width + 1))
+
+
+def _similar(a: frozenset[int], b: frozenset[int], threshold: float) -> bool:
+    if not a or not b:
+        return False
+    small, large = (a, b) if len(a) <= len(b) else (b, a)
+    # Jaccard can't reach the threshold when the sizes differ too much.
+    if len(small) < threshold * len(large):
+        return False
+    common = len(small & large)
+    return common >= threshold * (len(a) + len(b) - common)
+
+
+class ContextPacker:
+    """Greedy, deduplicating section selection on top of a :class:`DocsService`."""
+
+    def __init__(self, service: DocsService) -> None:
+        self.service = service
+
+    def query_candidates(
+        self, query: str, project: str | None = None, limit: int = 200
+    ) -> list[Candidate]:
+        """The ``limit`` best BM25 matches, scored by relevance."""
+        index = self.service.index()
+        found = []
+        for hit in index.search(query, limit, project):
+            s = hit.section
+            found.append(Candidate(hit.score, s.project, s.path, s.offset, s.length))
+        return found
+
+    def page_candidates(self, pages: list[str]) -> list[Candidate]:
+        """Every section of ``project/path[#anchor]`` pages, valued by list position."""
+        self.service.index()  # pick up a newer sync's pages
+        found = []
+        for spec in pages:
+            project, _, rest = spec.partition("/")
+            path, _, anchor = rest.partition("#")
+            page = self.service.page(project, path)
+            chunks = [c for c in page.chunks if not anchor or c.anchor == anchor]
+            if not chunks:
+                raise KeyError(f"no section #{anchor} in {project}/{path}")
+            found.extend((project, path, c.offset, c.length) for c in chunks)
+        return [Candidate(float(len(found) - rank), *where) for rank, where in enumerate(found)]
+
+    def pack(
+        self,
+        candidates: list[Candidate],
+        budget: int,
+        similarity: float = 0.8,
+    ) -> Packed:
+        """Fill ``budget`` tokens with the best non-duplicate ``candidates``."""
+        result = Packed(budget, candidates=len(candidates))
+        chosen: list[PackedSection] = []
+        seen: list[frozenset[int]] = []
+        languages: dict[tuple[str, str], str] = {}  # (project, language key) -> path
+        used = 0
+        for candidate in sorted(candidates, key=lambda c: -c.score):
+            project, path = candidate.project, candidate.path
+            key = (project, language_key(path))
+            if languages.get(key, path) != path:
+                result.translations += 1
+                continue
+            size = self.service.section_tokens(project, path, candidate.offset, candidate.length)
+            separator = _SEPARATOR_TOKENS if chosen else 0
+            # Without the header's anchor this is a lower bound; sections that
+            # cannot fit are rejected before their page is loaded.
+            if used + size + separator + self._header_tokens(project, path, "") > budget:
+                result.too_large += 1
+                continue
+            page = self.service.page(project, path)
+            chunk = next((c for c in page.chunks if c.offset == candidate.offset), None)
+            if chunk is None:
+                continue  # the page changed since the index was written
+            text = page.text(chunk)
+            tokens = size + self._header_tokens(project, path, chunk.anchor)
+            section = PackedSection(
+                project, path, chunk.title, chunk.anchor, chunk.breadcrumbs, chunk.offset,
+                candidate.score, tokens, text,
+            )
+            cost = tokens + separator
+            if used + cost > budget:
+                result.too_large += 1
+                continue
+            words = shingles(text)
+            if any(_similar(words, other, similarity) for other in seen):
+                result.duplicates += 1
+                continue
+            chosen.append(section)
+            seen.append(words)
+            languages[key] = path
+            used += cost
+
+        # Read like documentation: pages in the order they were first chosen,
+        # sections within a page in document order.
+        first: dict[tuple[str, str], int] = {}
+        for rank, s in enumerate(chosen):
+            first.setdefault((s.project, s.path), rank)
+        result.sections = sorted(chosen, key=lambda s: (first[s.project, s.path], s.offset))
+        return result
+
+    def _header_tokens(self, project: str, path: str, anchor: str) -> int:
+        return self.service.tokens.estimator.estimate(f"Source: {project}/{path}#{anchor}\n\n\n")
@@ -0,0 +1,108 @@
+"""Staged, atomic publication of synced trees with one-step rollback.
+
+A project's new tree is assembled in ``.<name>.next`` beside the live
+directory, starting as a hardlink clone of the live tree so unchanged files
+cost nothing. The staged tree is then swapped in with a single atomic
+``renameat2(RENAME_EXCHANGE)``; the previous generation is kept as
+``.<name>.prev`` so :func:`rollback` can swap it back.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import shutil
+from pathlib import Path
+
+_AT_FDCWD = -100
+_RENAME_EXCHANGE = 2
+
+_libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+_renameat2 = getattr(_libc, "renameat2", None)
+
+
+def staging_path(live: Path) -> Path:
+    return live.with_name(f".{live.name}.next")
+
+
+def previous_path(live: Path) -> Path:
+    return live.with_name(f".{live.name}.prev")
+
+
+def exchange(a: Path, b: Path) -> None:
+    """Atomically swap two existing paths.
+
+    Falls back to a pair of renames, with a brief window where ``b`` is
+    missing, on platforms without ``renameat2``.
+    """
+    if _renameat2 is not None:
+        rc = _renameat2(_AT_FDCWD, os.fsencode(a), _AT_FDCWD, os.fsencode(b), _RENAME_EXCHANGE)
+        if rc == 0:
+            return
+        err = ctypes.get_errno()
+        if err not in (errno.ENOSYS, errno.EINVAL, errno.ENOTSUP):
+            raise OSError(err, os.strerror(err), str(a), None, str(b))
+    tmp = a.with_name(a.name + ".swap")
+    os.rename(b, tmp)
+    os.rename(a, b)
+    os.rename(tmp, a)
+
+
+def clone_tree(src: Path, dest: Path) -> None:
+    """Recreate ``src`` at ``dest`` with every file hardlinked, not copied."""
+    dest.mkdir(parents=True)
+    for dirpath, dirnames, filenames in os.walk(src):
+        rel = Path(dirpath).relative_to(src)
+        for name in list(dirnames):
+            source = Path(dirpath, name)
+            if source.is_symlink():
+                dirnames.remove(name)
+                os.symlink(os.readlink(source), dest / rel / name)
+            else:
+                (dest / rel / name).mkdir()
+        for name in filenames:
+            source = Path(dirpath, name)
+            if source.is_symlink():
+                os.symlink(os.readlink(source), dest / rel / name)
+            else:
+                os.link(source, dest / rel / name)
+
+
+def stage(live: Path) -> Path:
+    """Prepare and return a fresh staging tree for ``live``."""
+    staged = staging_path(live)
+    if staged.exists():
+        shutil.rmtree(staged)
+    if live.is_dir():
+        clone_tree(live, staged)
+    else:
+        staged.mkdir(parents=True)
+    return staged
+
+
+def discard(live: Path) -> None:
+    """Remove any leftover staging tree for ``live``."""
+    shutil.rmtree(staging_path(live), ignore_errors=True)
+
+
+def publish(live: Path) -> None:
+    """Swap the staged tree in for ``live`` and keep the old one as previous."""
+    staged = staging_path(live)
+    prev = previous_path(live)
+    if not live.exists():
+        os.rename(staged, live)
+        return
+    exchange(staged, live)
+    if prev.exists():
+        shutil.rmtree(prev)
+    os.rename(staged, prev)
+
+
+def rollback(live: Path) -> None:
+    """Swap ``live`` with its previous generation."""
+    prev = previous_path(live)
+    if not prev.is_dir():
+        raise FileNotFoundError(f"no previous generation to roll back to: {prev}")
+    exchange(prev, live)
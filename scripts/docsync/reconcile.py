@@ -0,0 +1,182 @@
+"""Content-hash based reconciliation of a destination tree with a checkout.
+
+Only files whose content (or executable bit) differs are rewritten, removed
+files are deleted, and everything else is left untouched so its mtime and
+inode survive the sync.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from .store import BlobStore
+
+
+@dataclass
+class TreeDiff:
+    """Paths changed by :func:`reconcile`, relative to the destination."""
+
+    added: list[str] = field(default_factory=list)
+    modified: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    bytes_written: int = 0
+    hashes: dict[str, str] = field(default_factory=dict)
+    old_hashes: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.modified or self.deleted)
+
+    def summary(self) -> str:
+        return (
+            f"+{len(self.added)} added, ~{len(self.modified)} modified, "
+            f"-{len(self.deleted)} deleted, {self.unchanged} unchanged"
+        )
+
+
+def file_sha256(path: Path) -> str:
+    """Hex SHA-256 of a regular file, or of a symlink's target string."""
+    if path.is_symlink():
+        return hashlib.sha256(os.readlink(path).encode()).hexdigest()
+    with open(path, "rb") as fh:
+        return hashlib.file_digest(fh, "sha256").hexdigest()
+
+
+def collect_files(src: Path, selects: Callable[[str], bool] | None = None) -> dict[str, Path]:
+    """Map POSIX relative path to absolute path for every file under ``src``.
+
+    The top-level ``.git`` directory is skipped, as is any path rejected by
+    ``selects``.
+    """
+    files: dict[str, Path] = {}
+    for dirpath, dirnames, filenames in os.walk(src):
+        if dirpath == str(src):
+            dirnames[:] = [d for d in dirnames if d != ".git"]
+        rel_dir = Path(dirpath).relative_to(src)
+        # os.walk lists symlinks to directories as dirs; mirror them as links.
+        for name in [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]:
+            dirnames.remove(name)
+            filenames.append(name)
+        for name in filenames:
+            rel = (rel_dir / name).as_posix()
+            if selects is None or selects(rel):
+                files[rel] = Path(dirpath, name)
+    return files
+
+
+def _is_exec(path: Path) -> bool:
+    return bool(os.lstat(path).st_mode & stat.S_IXUSR)
+
+
+def _same(src: Path, dst: Path, src_hash: str) -> bool:
+    if src.is_symlink() or dst.is_symlink():
+        return src.is_symlink() and dst.is_symlink() and os.readlink(src) == os.readlink(dst)
+    if not dst.is_file():
+        return False
+    if os.path.getsize(src) != os.path.getsize(dst) or _is_exec(src) != _is_exec(dst):
+        return False
+    return file_sha256(dst) == src_hash
+
+
+def install_file(src: Path, dst: Path) -> None:
+    """Atomically place a copy of ``src`` at ``dst``.
+
+    The copy is written to a temporary sibling and renamed over ``dst``, so an
+    existing file is replaced rather than written through; anything still
+    holding the old inode is unaffected.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.is_dir() and not dst.is_symlink():
+        shutil.rmtree(dst)
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.name}.")
+    os.close(fd)
+    try:
+        if src.is_symlink():
+            os.unlink(tmp)
+            os.symlink(os.readlink(src), tmp)
+        else:
+            shutil.copyfile(src, tmp)
+            shutil.copymode(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Replace ``path`` with ``text`` via a temporary sibling and a rename."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            fh.write(text)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _prune_empty_dirs(root: Path, candidates: set[Path]) -> None:
+    for directory in sorted(candidates, key=lambda p: len(p.parts), reverse=True):
+        while directory != root and directory.is_dir() and not any(directory.iterdir()):
+            directory.rmdir()
+            directory = directory.parent
+
+
+def reconcile(
+    files: dict[str, Path],
+    dest: Path,
+    keep: frozenset[str] = frozenset(),
+    store: BlobStore | None = None,
+) -> TreeDiff:
+    """Make ``dest`` contain exactly ``files``, touching only what differs.
+
+    ``keep`` lists destination-relative paths that are not part of the
+    upstream tree (such as sync metadata) and must never be deleted. With a
+    ``store``, new and changed regular files are hardlinked from it instead
+    of copied, so identical content is stored once.
+    """
+    diff = TreeDiff()
+    dest.mkdir(parents=True, exist_ok=True)
+
+    for rel in sorted(files):
+        src = files[rel]
+        digest = file_sha256(src)
+        diff.hashes[rel] = digest
+        dst = dest / rel
+        if os.path.lexists(dst):
+            if _same(src, dst, digest):
+                diff.unchanged += 1
+                continue
+            diff.modified.append(rel)
+            if not dst.is_dir() or dst.is_symlink():
+                diff.old_hashes[rel] = file_sha256(dst)
+        else:
+            diff.added.append(rel)
+        if store is not None and not src.is_symlink():
+            store.install(src, digest, dst)
+        else:
+            install_file(src, dst)
+        diff.bytes_written += os.lstat(dst).st_size
+
+    emptied: set[Path] = set()
+    for rel, path in sorted(collect_files(dest).items()):
+        if rel in files or rel in keep:
+            continue
+        diff.old_hashes[rel] = file_sha256(path)
+        path.unlink()
+        diff.deleted.append(rel)
+        emptied.add(path.parent)
+    _prune_empty_dirs(dest, emptied)
+    return diff
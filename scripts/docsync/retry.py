@@ -0,0 +1,74 @@
+"""Timeouts and jittered exponential backoff for upstream network operations."""
+
+from __future__ import annotations
+
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+from .git import GitError
+
+log = logging.getLogger("docsync")
+
+T = TypeVar("T")
+
+# Failures that another attempt cannot fix.
+_PERMANENT = (
+    "not found",
+    "does not appear to be a git repository",
+    "authentication failed",
+    "couldn't find remote ref",
+    "could not read username",
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to try one network operation."""
+
+    attempts: int = 4
+    timeout: float = 300.0
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+
+    def delay(self, attempt: int, rng: random.Random | None = None) -> float:
+        """Full-jitter backoff before retry number ``attempt`` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return (rng or random).uniform(0, cap)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether ``exc`` looks transient (timeouts, resets, 5xx) rather than permanent."""
+    if not isinstance(exc, GitError):
+        return False
+    if exc.timed_out:
+        return True
+    return not any(marker in exc.stderr.lower() for marker in _PERMANENT)
+
+
+def retry(
+    fn: Callable[[], T],
+    policy: RetryPolicy,
+    what: str,
+    on_retry: Callable[[int, BaseException], None] | None = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> T:
+    """Call ``fn`` until it succeeds, a permanent error occurs, or attempts run out."""
+    attempt = 1
+    while True:
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= policy.attempts or not is_retryable(exc):
+                raise
+            wait = policy.delay(attempt)
+            log.warning(
+                "%s failed (attempt %d/%d): %s; retrying in %.1fs",
+                what, attempt, policy.attempts, exc, wait,
+            )
+            if on_retry is not None:
+                on_retry(attempt, exc)
+            sleep(wait)
+            attempt += 1
@@ -0,0 +1,149 @@
+"""Include/exclude path rules and their compilation into sparse-checkout rules.
+
+Rules are repository-relative. An entry ending in ``/`` names a directory and
+everything below it; an entry containing ``*``, ``?`` or ``[`` is a glob
+(``**`` crosses directories); anything else names a single file.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Callable
+
+_GLOB_CHARS = "*?["
+
+
+def is_glob(rule: str) -> bool:
+    return any(c in rule for c in _GLOB_CHARS)
+
+
+def _glob_regex(glob: str) -> re.Pattern[str]:
+    out = []
+    i = 0
+    while i < len(glob):
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif glob[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif glob[i] == "?":
+            out.append("[^/]")
+            i += 1
+        elif glob[i] == "[":
+            end = glob.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(glob[i]))
+                i += 1
+            else:
+                out.append("[" + glob[i + 1 : end].replace("!", "^", 1) + "]")
+                i = end + 1
+        else:
+            out.append(re.escape(glob[i]))
+            i += 1
+    return re.compile("".join(out) + "(?:/.*)?")
+
+
+def _matcher(rule: str) -> Callable[[str], bool]:
+    if rule.endswith("/"):
+        return lambda path: path.startswith(rule)
+    if is_glob(rule):
+        return _glob_regex(rule).fullmatch  # type: ignore[return-value]
+    return lambda path: path == rule
+
+
+@dataclass(frozen=True)
+class SparseSpec:
+    """Which repository paths a project publishes."""
+
+    include: tuple[str, ...]
+    exclude: tuple[str, ...] = ()
+
+    @classmethod
+    def from_patterns(cls, patterns: tuple[str, ...] | list[str]) -> SparseSpec:
+        """Build a spec from legacy sparse-checkout patterns (``docs/*``, ``!docs/img``)."""
+        include: list[str] = []
+        exclude: list[str] = []
+        for pattern in patterns:
+            target = exclude if pattern.startswith("!") else include
+            rule = pattern.lstrip("!").lstrip("/")
+            if rule.endswith("/*") or rule.endswith("/**"):
+                rule = rule.rsplit("/", 1)[0] + "/"
+            elif target is exclude and not is_glob(rule) and not rule.endswith("/"):
+                rule += "/"
+            target.append(rule)
+        return cls(tuple(include), tuple(exclude))
+
+    @cached_property
+    def _include(self) -> list[Callable[[str], bool]]:
+        return [_matcher(r) for r in self.include]
+
+    @cached_property
+    def _exclude(self) -> list[Callable[[str], bool]]:
+        return [_matcher(r) for r in self.exclude]
+
+    def selects(self, path: str) -> bool:
+        """Whether the repository-relative POSIX ``path`` is published."""
+        return any(m(path) for m in self._include) and not any(m(path) for m in self._exclude)
+
+    @property
+    def patterns(self) -> tuple[str, ...]:
+        """Equivalent non-cone sparse-checkout patterns, includes first."""
+        return tuple(f"/{r}" for r in self.include) + tuple(f"!/{r}" for r in self.exclude)
+
+    def cone(self, list_dirs: Callable[[str], list[str]] | None = None) -> tuple[str, ...] | None:
+        """Compile to cone-mode directories, or ``None`` if cone mode can't express the spec.
+
+        Cone mode checks out whole directories, plus the files directly inside
+        every parent of one. Included directories with excluded subdirectories
+        are therefore split into their remaining children, which needs
+        ``list_dirs(dir)`` to name a directory's subdirectories (for example
+        from already-fetched trees). Included files must sit at the root,
+        which cone mode always checks out. Extra files cone mode brings along
+        are dropped afterwards with :meth:`selects`.
+        """
+        if any(is_glob(r) for r in self.include + self.exclude):
+            return None
+        dirs = [r.rstrip("/") for r in self.include if r.endswith("/")]
+        if any("/" in r for r in self.include if not r.endswith("/")):
+            return None
+        excluded = [r.rstrip("/") for r in self.exclude if r.endswith("/")]
+        if len(excluded) != len(self.exclude):
+            return None
+        if excluded and list_dirs is None:
+            return None
+
+        def expand(directory: str) -> list[str] | None:
+            below = [e for e in excluded if e.startswith(directory + "/")]
+            if not below:
+                return [directory]
+            assert list_dirs is not None
+            result: list[str] = []
+            for child in list_dirs(directory):
+                path = f"{directory}/{child}"
+                if path in excluded:
+                    continue
+                if any(e.startswith(path + "/") for e in below):
+                    sub = expand(path)
+                    if sub is None:
+                        return None
+                    result += sub
+                else:
+                    result.append(path)
+            # Files directly in ``directory`` only come along with a child.
+            return result or None
+
+        cone: list[str] = []
+        for directory in dirs:
+            if directory in excluded:
+                continue
+            expanded = expand(directory)
+            if expanded is None:
+                return None
+            cone += expanded
+        return tuple(cone)
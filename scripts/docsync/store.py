@@ -0,0 +1,117 @@
+"""Content-addressed object store that synced trees are hardlinked from.
+
+Every published file is stored once under ``objects/<aa>/<sha256>`` (with an
+``.x`` suffix for executables, since hardlinks share a mode) and linked into
+each destination that contains it. Identical files across projects, and
+across versions of the same project, then cost one inode. Objects are made
+read-only so an accidental in-place edit cannot silently change every tree
+that shares them; the reconciler always replaces files by rename.
+"""
+
+from __future__ import annotations
+
+import errno
+import logging
+import os
+import shutil
+import stat
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+log = logging.getLogger("docsync")
+
+_LINK_FALLBACK = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP}
+
+
+@dataclass
+class StoreStats:
+    objects: int = 0
+    bytes: int = 0
+    links: int = 0
+    linked_bytes: int = 0
+
+
+class BlobStore:
+    """A directory of immutable, hash-named file objects."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root).expanduser()
+        self.objects = self.root / "objects"
+
+    def path_for(self, sha256: str, executable: bool = False) -> Path:
+        return self.objects / sha256[:2] / (sha256 + (".x" if executable else ""))
+
+    def add(self, src: Path, sha256: str, executable: bool = False) -> Path:
+        """Store a copy of ``src`` under ``sha256`` unless already present."""
+        obj = self.path_for(sha256, executable)
+        if obj.exists():
+            return obj
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=obj.parent, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(src, tmp)
+            os.chmod(tmp, 0o555 if executable else 0o444)
+            os.replace(tmp, obj)
+        except BaseException:
+            if os.path.lexists(tmp):
+                os.unlink(tmp)
+            raise
+        return obj
+
+    def link(self, obj: Path, dst: Path) -> bool:
+        """Atomically make ``dst`` a hardlink to ``obj``.
+
+        Falls back to a copy, and returns ``False``, when the filesystem
+        can't hardlink (e.g. the store is on another device).
+        """
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f".{dst.name}.{os.getpid()}.link")
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        try:
+            os.link(obj, tmp)
+            linked = True
+        except OSError as exc:
+            if exc.errno not in _LINK_FALLBACK:
+                raise
+            shutil.copyfile(obj, tmp)
+            shutil.copymode(obj, tmp)
+            linked = False
+        if dst.is_dir() and not dst.is_symlink():
+            shutil.rmtree(dst)
+        os.replace(tmp, dst)
+        return linked
+
+    def install(self, src: Path, sha256: str, dst: Path) -> bool:
+        """Store ``src`` and link it at ``dst``; see :meth:`link`."""
+        executable = bool(os.stat(src).st_mode & stat.S_IXUSR)
+        return self.link(self.add(src, sha256, executable), dst)
+
+    def _iter_objects(self):
+        if not self.objects.is_dir():
+            return
+        for bucket in self.objects.iterdir():
+            for obj in bucket.iterdir():
+                if not obj.name.startswith(".tmp-"):
+                    yield obj
+
+    def stats(self) -> StoreStats:
+        stats = StoreStats()
+        for obj in self._iter_objects():
+            st = obj.stat()
+            stats.objects += 1
+            stats.bytes += st.st_size
+            stats.links += st.st_nlink - 1
+            stats.linked_bytes += st.st_size * (st.st_nlink - 1)
+        return stats
+
+    def gc(self) -> int:
+        """Delete objects no tree links to any more; returns how many."""
+        removed = 0
+        for obj in self._iter_objects():
+            if obj.stat().st_nlink == 1:
+                obj.unlink()
+                removed += 1
+        return removed
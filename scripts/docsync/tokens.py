@@ -0,0 +1,234 @@
+"""Token counts for budgeting how much documentation fits in a prompt.
+
+There are two ways to count:
+
+- exactly, with a BPE tokenizer (``tiktoken``; ``o200k_base`` by default),
+  which is only needed to build the sidecar with ``exact=True``;
+- :class:`Estimator`, a byte-based linear model with one tokens-per-byte
+  rate for ASCII and one for other UTF-8 bytes, since CJK and other
+  non-Latin text packs far fewer bytes into a token. Out of the box it
+  assumes about four ASCII bytes per token; :func:`calibrate` fits both
+  rates to exact counts.
+
+:class:`TokenCounts` is the sidecar: the size of every section of every
+synced markdown page, keyed by the page's content SHA-256.
+:func:`update_token_counts` brings it up to date after each sync, counting
+only pages whose hash is new. With exact counts the estimator is refitted
+against the whole corpus on every update, so lookups that miss the sidecar
+still get calibrated estimates.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable
+
+from .chunker import VERSION as CHUNKER_VERSION, ChunkCache
+from .reconcile import write_text_atomic
+
+if TYPE_CHECKING:
+    from .config import Project
+    from .manifest import Manifest
+
+# Bump when the sidecar layout changes, so old files are rebuilt.
+VERSION = 1
+BYTES_PER_TOKEN = 4.0
+DEFAULT_ENCODING = "o200k_base"
+
+_HIGH = bytes(range(128, 256))
+
+
+def _other_bytes(data: bytes) -> int:
+    """Bytes of ``data`` outside ASCII, counted in C by deleting the rest."""
+    return len(data) - len(data.translate(None, _HIGH))
+
+
+@dataclass(frozen=True)
+class Estimator:
+    """``tokens ≈ ascii × ASCII bytes + other × non-ASCII bytes``."""
+
+    ascii: float = 1 / BYTES_PER_TOKEN
+    other: float = 1 / 3
+
+    def estimate(self, text: str | bytes) -> int:
+        data = text.encode("utf-8") if isinstance(text, str) else text
+        return self.estimate_sizes(len(data), _other_bytes(data))
+
+    def estimate_sizes(self, size: int, other: int) -> int:
+        """The estimate for ``size`` bytes of which ``other`` are non-ASCII."""
+        return math.ceil(self.ascii * (size - other) + self.other * other)
+
+
+DEFAULT_ESTIMATOR = Estimator()
+
+
+def estimate(text: str | bytes) -> int:
+    """Approximate number of tokens in ``text``, with the uncalibrated estimator."""
+    return DEFAULT_ESTIMATOR.estimate(text)
+
+
+def calibrate(samples: Iterable[tuple[int, int, int]]) -> Estimator:
+    """Least-squares rates for ``(size, non-ASCII bytes, exact tokens)`` samples."""
+    xx = xy = yy = xt = yt = 0.0
+    for size, other, tokens in samples:
+        x, y = size - other, other
+        xx, xy, yy = xx + x * x, xy + x * y, yy + y * y
+        xt, yt = xt + x * tokens, yt + y * tokens
+    det = xx * yy - xy * xy
+    if xx and yy and det > 1e-9 * xx * yy:
+        return Estimator((xt * yy - yt * xy) / det, (yt * xx - xt * xy) / det)
+    if xx:
+        # No non-ASCII text to fit: keep the default rate for it.
+        return Estimator((xt - DEFAULT_ESTIMATOR.other * xy) / xx, DEFAULT_ESTIMATOR.other)
+    return DEFAULT_ESTIMATOR
+
+
+def exact_counter(encoding: str = DEFAULT_ENCODING) -> Callable[[list[bytes]], list[int]]:
+    """A batch counter for ``encoding``; needs the ``tiktoken`` package."""
+    from .config import ConfigError
+
+    try:
+        import tiktoken
+    except ImportError:
+        raise ConfigError("exact token counts need the 'tiktoken' package") from None
+    try:
+        enc = tiktoken.get_encoding(encoding)
+    except ValueError as exc:
+        raise ConfigError(str(exc)) from None
+
+    def count(texts: list[bytes]) -> list[int]:
+        decoded = [t.decode("utf-8", "replace") for t in texts]
+        return [len(ids) for ids in enc.encode_ordinary_batch(decoded)]
+
+    return count
+
+
+@dataclass
+class TokenStats:
+    pages: int = 0
+    sections: int = 0
+    counted: int = 0
+    removed: int = 0
+    tokens: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class TokenCounts:
+    """Section sizes by page SHA-256: ``{sha256: [[offset, length, other, tokens], ...]}``.
+
+    ``encoding`` names the tokenizer the counts came from, or is ``None``
+    when they are estimates. ``other`` is the section's non-ASCII byte
+    count, kept so the estimator can be refitted without rereading pages.
+    """
+
+    encoding: str | None = None
+    estimator: Estimator = DEFAULT_ESTIMATOR
+    pages: dict[str, list[list[int]]] = field(default_factory=dict)
+    _offsets: dict[str, dict[int, int]] = field(default_factory=dict, init=False, repr=False)
+
+    @classmethod
+    def load(cls, path: Path) -> TokenCounts:
+        """The sidecar at ``path``, or an empty one if it is missing or outdated."""
+        try:
+            data = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return cls()
+        if data.get("version") != VERSION or data.get("chunker") != CHUNKER_VERSION:
+            return cls()
+        return cls(data["encoding"], Estimator(**data["estimator"]), data["pages"])
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": VERSION,
+            "chunker": CHUNKER_VERSION,
+            "encoding": self.encoding,
+            "estimator": {"ascii": self.estimator.ascii, "other": self.estimator.other},
+            "pages": self.pages,
+        }
+        write_text_atomic(path, json.dumps(data, separators=(",", ":"), sort_keys=True))
+
+    def section(self, sha256: str, offset: int) -> int | None:
+        """The size of the section at ``offset`` in page ``sha256``, if known."""
+        offsets = self._offsets.get(sha256)
+        if offsets is None:
+            rows = self.pages.get(sha256)
+            if rows is None:
+                return None
+            offsets = self._offsets[sha256] = {row[0]: row[3] for row in rows}
+        return offsets.get(offset)
+
+    def page(self, sha256: str) -> int | None:
+        """The size of a whole page: the sum of its sections."""
+        rows = self.pages.get(sha256)
+        return sum(row[3] for row in rows) if rows is not None else None
+
+
+def update_token_counts(
+    trees: Iterable[tuple[Project, Manifest]],
+    root: Path,
+    path: Path,
+    chunks: ChunkCache | None = None,
+    exact: bool | None = None,
+    encoding: str = DEFAULT_ENCODING,
+    rebuild: bool = False,
+) -> TokenStats:
+    """Bring the sidecar at ``path`` up to date with the synced markdown.
+
+    Only pages whose SHA-256 is not in the sidecar are read and counted, and
+    hashes no longer referenced by any tree are dropped. ``exact=None`` keeps
+    the mode the sidecar was built with; switching modes or encodings
+    recounts everything.
+    """
+    start = time.monotonic()
+    stats = TokenStats()
+    chunks = chunks or ChunkCache()
+    counts = TokenCounts() if rebuild else TokenCounts.load(path)
+    if exact is None:
+        exact = counts.encoding is not None
+        encoding = counts.encoding or encoding
+    counter = exact_counter(encoding) if exact else None
+    if counts.encoding != (encoding if exact else None):
+        counts = TokenCounts(encoding if exact else None)
+
+    current: dict[str, Path] = {}
+    for project, manifest in trees:
+        for f in manifest.files:
+            if f.path.endswith(".md"):
+                current.setdefault(f.sha256, root / project.dest / f.path)
+    for sha256 in [s for s in counts.pages if s not in current]:
+        del counts.pages[sha256]
+        stats.removed += 1
+
+    for sha256, source in current.items():
+        if sha256 in counts.pages or source.is_symlink() or not source.is_file():
+            continue
+        data = source.read_bytes()
+        found = chunks.chunks(data, sha256)
+        spans = [data[c.offset : c.offset + c.length] for c in found]
+        others = [_other_bytes(span) for span in spans]
+        if counter is not None:
+            sizes = counter(spans)
+        else:
+            sizes = [counts.estimator.estimate_sizes(len(s), o) for s, o in zip(spans, others)]
+        counts.pages[sha256] = [
+            [c.offset, c.length, other, size] for c, other, size in zip(found, others, sizes)
+        ]
+        stats.counted += 1
+
+    if counter is not None and (stats.counted or stats.removed):
+        counts.estimator = calibrate(
+            (row[1], row[2], row[3]) for rows in counts.pages.values() for row in rows
+        )
+    if stats.counted or stats.removed or not path.exists():
+        counts.save(path)
+    stats.pages = len(counts.pages)
+    stats.sections = sum(len(rows) for rows in counts.pages.values())
+    stats.tokens = sum(row[3] for rows in counts.pages.values() for row in rows)
+    stats.seconds = time.monotonic() - start
+    return stats
@@ -0,0 +1,147 @@
+"""Release snapshots: mirror the newest matching tags of a project side by side."""
+
+from __future__ import annotations
+
+import fnmatch
+import logging
+import re
+import shutil
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from . import publish
+from .config import Project, SyncSettings
+from .git import git, timeout
+from .manifest import Manifest, load_manifest
+from .reconcile import TreeDiff
+from .retry import retry
+
+log = logging.getLogger("docsync")
+
+_RELEASE_RE = re.compile(r"^v?\d+(\.\d+)*$")
+
+
+@dataclass
+class SnapshotPlan:
+    """What one project's ``versions`` table needs this run."""
+
+    project: Project
+    tags: list[str] = field(default_factory=list)
+    pending: list[Project] = field(default_factory=list)
+    stale: list[str] = field(default_factory=list)
+    error: str | None = None
+
+
+def remote_tags(project: Project) -> dict[str, str]:
+    """Map every tag of ``project.repo`` to the commit it points at."""
+    tags: dict[str, str] = {}
+    for line in git("ls-remote", "--tags", project.repo).splitlines():
+        sha, _, ref = line.partition("\t")
+        name = ref.removeprefix("refs/tags/")
+        if name.endswith("^{}"):
+            tags[name[:-3]] = sha  # peeled annotated tag wins
+        else:
+            tags.setdefault(name, sha)
+    return tags
+
+
+def version_key(tag: str) -> tuple[int, ...]:
+    """Numeric sort key for a release tag: ``v2.10.1`` -> ``(2, 10, 1)``."""
+    return tuple(int(n) for n in re.findall(r"\d+", tag))
+
+
+def select_tags(tags: list[str], pattern: str, keep: int, prereleases: bool = False) -> list[str]:
+    """The newest ``keep`` tags matching ``pattern``, newest first."""
+    matching = [
+        t for t in tags
+        if fnmatch.fnmatchcase(t, pattern) and (prereleases or _RELEASE_RE.match(t))
+    ]
+    return sorted(matching, key=lambda t: (version_key(t), t), reverse=True)[:keep]
+
+
+def snapshot(project: Project, tag: str) -> Project:
+    """The derived project that mirrors ``tag`` into ``<versions.dest>/<tag>``."""
+    assert project.versions is not None
+    return replace(
+        project,
+        name=f"{project.name}@{tag}",
+        dest=f"{project.versions.dest}/{tag}",
+        versions=None,
+        tag=tag,
+    )
+
+
+def plan(project: Project, root: Path, settings: SyncSettings) -> SnapshotPlan:
+    """Discover tags and work out which snapshots to fetch and which to drop.
+
+    Tags are treated as immutable: a snapshot whose manifest already records
+    the tag's commit is left alone without any further network traffic, so
+    only tags that are new since the last run are fetched.
+    """
+    spec = project.versions
+    assert spec is not None
+    result = SnapshotPlan(project)
+    try:
+        with timeout(settings.retry.timeout):
+            tags = retry(
+                lambda: remote_tags(project), settings.retry, f"[{project.name}] ⚠️  tags"
+            )
+    except Exception as exc:
+        result.error = str(exc)
+        log.error("[%s] ❌ Tag discovery failed: %s", project.name, exc)
+        return result
+    result.tags = select_tags(list(tags), spec.tags, spec.keep, spec.prereleases)
+    for tag in result.tags:
+        derived = snapshot(project, tag)
+        manifest = load_manifest(root / derived.dest)
+        if settings.force or manifest is None or not manifest.is_current(derived, tags[tag]):
+            result.pending.append(derived)
+    versions_dir = root / spec.dest
+    if versions_dir.is_dir():
+        result.stale = sorted(
+            d.name for d in versions_dir.iterdir()
+            if d.is_dir() and not d.name.startswith(".") and d.name not in result.tags
+        )
+    log.info(
+        "[%s] 🏷️  Tracking %s (%d new, %d to prune)",
+        project.name, ", ".join(result.tags) or "no tags", len(result.pending), len(result.stale),
+    )
+    return result
+
+
+def prune(project: Project, tag: str, root: Path) -> tuple[TreeDiff, str | None]:
+    """Remove the snapshot of a tag that dropped out of the kept window.
+
+    Returns the deletions and the commit the snapshot was at, for the change feed.
+    """
+    dest = root / snapshot(project, tag).dest
+    manifest = load_manifest(dest)
+    old = {f.path: f.sha256 for f in manifest.files} if manifest is not None else {}
+    shutil.rmtree(dest)
+    for leftover in (publish.staging_path(dest), publish.previous_path(dest)):
+        shutil.rmtree(leftover, ignore_errors=True)
+    log.info("[%s] 🗑️  Pruned snapshot %s", project.name, tag)
+    commit = manifest.commit if manifest is not None else None
+    return TreeDiff(deleted=sorted(old), old_hashes=old), commit
+
+
+def published_trees(
+    projects: Iterable[Project], root: Path
+) -> Iterator[tuple[Project, Manifest]]:
+    """Yield every synced tree under ``root`` with its manifest, snapshots included."""
+    for project in projects:
+        manifest = load_manifest(root / project.dest)
+        if manifest is not None:
+            yield project, manifest
+        if project.versions is None:
+            continue
+        versions_dir = root / project.versions.dest
+        if not versions_dir.is_dir():
+            continue
+        tags = [d.name for d in versions_dir.iterdir() if d.is_dir() and not d.name.startswith(".")]
+        for tag in sorted(tags, key=lambda t: (version_key(t), t), reverse=True):
+            derived = snapshot(project, tag)
+            manifest = load_manifest(root / derived.dest)
+            if manifest is not None:
+                yield derived, manifest
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+_IDENTITY = {
+    "GIT_AUTHOR_NAME": "docsync",
+    "GIT_AUTHOR_EMAIL": "docsync@example.invalid",
+    "GIT_COMMITTER_NAME": "docsync",
+    "GIT_COMMITTER_EMAIL": "docsync@example.invalid",
+}
+
+
+@pytest.fixture
+def bare_repo(tmp_path: Path) -> Path:
+    """A directory holding ``up.git``, a bare repository with one commit."""
+    work = tmp_path / "work"
+    work.mkdir()
+    (work / "README.md").write_text("# Hello\n")
+    env = {**os.environ, **_IDENTITY}
+    for args in (["init", "-q", "-b", "main"], ["add", "."], ["commit", "-q", "-m", "init"]):
+        subprocess.run(["git", *args], cwd=work, env=env, check=True)
+    repos = tmp_path / "repos"
+    subprocess.run(
+        ["git", "clone", "-q", "--bare", str(work), str(repos / "up.git")], check=True
+    )
+    return repos
+
+
+@pytest.fixture
+def push(bare_repo: Path, tmp_path: Path) -> Callable[[dict[str, str | None]], None]:
+    """Commit files to ``up.git``: text to write, or ``None`` to delete."""
+    clone = tmp_path / "push"
+    env = {**os.environ, **_IDENTITY}
+    subprocess.run(["git", "clone", "-q", str(bare_repo / "up.git"), str(clone)], check=True)
+
+    def commit(files: dict[str, str | None]) -> None:
+        for rel, text in files.items():
+            path = clone / rel
+            if text is None:
+                path.unlink()
+            else:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(text)
+        for args in (["add", "-A"], ["commit", "-q", "-m", "update"], ["push", "-q"]):
+            subprocess.run(["git", *args], cwd=clone, env=env, check=True)
+
+    return commit
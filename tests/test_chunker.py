@@ -0,0 +1,43 @@
+"""Chunk anchors match the ids Python-Markdown renders; the chunk cache stays bounded."""
+
+from __future__ import annotations
+
+import pytest
+
+from docsync.chunker import ChunkCache, chunk_markdown, slugify
+
+
+# Expected values produced by markdown.extensions.toc.slugify(title, "-").
+@pytest.mark.parametrize(
+    ("title", "anchor"),
+    [
+        ("Foo - Bar", "foo-bar"),
+        ("Café au lait", "cafe-au-lait"),
+        ("Über  --  größe", "uber-groe"),
+        ("`Field()` and *more*", "field-and-more"),
+        ("a_b c", "a_b-c"),
+        ("FastAPI + SQLModel: 🚀", "fastapi-sqlmodel"),
+    ],
+)
+def test_slugify_matches_python_markdown(title: str, anchor: str) -> None:
+    assert slugify(title) == anchor
+
+
+def test_repeated_and_custom_anchors() -> None:
+    source = (
+        b"# Intro\n\n## Setup\n\n## Setup\n\n## [Link](http://x) &amp; <b>tag</b>\n\n"
+        b"## Setup_1 {#custom}\n\n## Setup\n"
+    )
+    anchors = [c.anchor for c in chunk_markdown(source)]
+    assert anchors == ["intro", "setup", "setup_1", "link-tag", "custom", "setup_2"]
+
+
+def test_chunk_cache_is_bounded() -> None:
+    cache = ChunkCache(max_entries=2)
+    pages = [f"# Page {n}\n".encode() for n in range(3)]
+    for data in pages:
+        cache.chunks(data)
+    cache.chunks(pages[2])
+    cache.chunks(pages[0])  # evicted: chunked again
+    assert (cache.hits, cache.misses) == (1, 4)
+    assert len(cache._memory) == 2
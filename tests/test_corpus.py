@@ -0,0 +1,51 @@
+"""An uncompressed pack is served as zero-copy views of one mapping."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from docsync.config import Project, SyncSettings
+from docsync.corpus import Corpus
+from docsync.engine import sync_project
+from docsync.manifest import load_manifest
+from docsync.pack import write_pack
+from docsync.sparse import SparseSpec
+
+
+def test_uncompressed_pack_returns_views_of_the_mapping(
+    bare_repo: Path, tmp_path: Path, push: Callable[[dict[str, str | None]], None]
+) -> None:
+    project = Project(
+        name="demo",
+        repo=(bare_repo / "up.git").as_uri(),
+        branch="main",
+        dest="demo",
+        sparse=SparseSpec(include=("docs/",)),
+    )
+    root = tmp_path / "root"
+    push({"docs/a.md": "# A\n\nÀ propos.\n", "docs/guide/b.md": "# B\n" * 100})
+    assert sync_project(project, root, SyncSettings(jobs=1)).ok
+    manifest = load_manifest(root / "demo")
+    assert manifest is not None
+    out = tmp_path / "agent-docs.corpus"
+    write_pack(out, [(project, manifest)], root, "none")
+
+    corpus = Corpus(out)
+    assert corpus.zero_copy
+    for rel in ("docs/a.md", "docs/guide/b.md"):
+        body = corpus.get(f"demo/{rel}")
+        assert isinstance(body, memoryview) and body.readonly
+        assert body == (root / "demo" / rel).read_bytes()
+        body.release()
+    assert [path for path, _ in corpus.iter("demo")] == sorted(
+        f.path for f in manifest.files
+    )
+
+    held = corpus.get("demo/docs/a.md")
+    with pytest.raises(BufferError):
+        corpus.close()
+    held.release()
+    corpus.close()
@@ -0,0 +1,22 @@
+"""``{* ... *}`` include directives."""
+
+from __future__ import annotations
+
+from docsync.includes import expand
+
+SOURCE = "import fastapi\n\napp = fastapi.FastAPI()\n"
+
+
+def test_directives_are_expanded_outside_fences_only() -> None:
+    page = (
+        "Intro\n\n"
+        "{* ../../docs_src/app.py hl[3] *}\n\n"
+        "Write it like this:\n\n"
+        "````markdown\n"
+        "{* ../../docs_src/app.py *}\n"
+        "````\n"
+    )
+    text, count = expand(page, "docs/en", {"docs_src/app.py": SOURCE})
+    assert count == 1
+    assert '```python title="docs_src/app.py" hl_lines="3"\nimport fastapi\n' in text
+    assert "````markdown\n{* ../../docs_src/app.py *}\n````\n" in text
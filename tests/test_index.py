@@ -0,0 +1,125 @@
+"""Incremental index updates tombstone stale sections; merges drop them."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from docsync.config import Project, SyncSettings
+from docsync.engine import sync_project
+from docsync.index import IndexState, IndexStats, SearchIndex, merge_segments, update_index
+from docsync.manifest import load_manifest
+from docsync.sparse import SparseSpec
+
+Push = Callable[[dict[str, str | None]], None]
+
+
+class Mirror:
+    """``up.git`` synced into ``root / "demo"`` and indexed into ``root / "index"``."""
+
+    def __init__(self, repos: Path, root: Path) -> None:
+        self.project = Project(
+            name="demo",
+            repo=(repos / "up.git").as_uri(),
+            branch="main",
+            dest="demo",
+            sparse=SparseSpec(include=("docs/",)),
+        )
+        self.root = root
+        self.tree = root / "demo"
+        self.index_dir = root / "index"
+
+    def sync(self) -> None:
+        result = sync_project(self.project, self.root, SyncSettings(jobs=1))
+        assert result.ok, result.error
+
+    def index(self) -> IndexStats:
+        manifest = load_manifest(self.tree)
+        assert manifest is not None
+        return update_index([(self.project, manifest)], self.root, self.index_dir)
+
+    def search(self, query: str) -> list[str]:
+        with SearchIndex(self.index_dir) as index:
+            return sorted({hit.section.path for hit in index.search(query, 50)})
+
+
+@pytest.fixture
+def mirror(bare_repo: Path, tmp_path: Path) -> Mirror:
+    return Mirror(bare_repo, tmp_path / "root")
+
+
+def _page(title: str, word: str) -> str:
+    return f"# {title}\n\nAll about {word}.\n\n## More\n\nStill {word}.\n"
+
+
+def test_modified_page_replaces_its_sections(mirror: Mirror, push: Push) -> None:
+    push({"docs/a.md": _page("A", "aardvark"), "docs/b.md": _page("B", "badger")})
+    mirror.sync()
+    assert mirror.index().documents == 2
+    assert mirror.search("aardvark") == ["docs/a.md"]
+
+    push({"docs/a.md": _page("A", "anteater")})
+    mirror.sync()
+    stats = mirror.index()
+    assert (stats.documents, stats.unchanged) == (1, 1)
+    assert mirror.search("aardvark") == []
+    assert mirror.search("anteater") == ["docs/a.md"]
+    assert mirror.search("badger") == ["docs/b.md"]
+
+
+def test_deleted_page_disappears(mirror: Mirror, push: Push) -> None:
+    push({"docs/a.md": _page("A", "aardvark"), "docs/b.md": _page("B", "badger")})
+    mirror.sync()
+    mirror.index()
+
+    push({"docs/a.md": None})
+    mirror.sync()
+    assert mirror.index().deleted == 1
+    assert mirror.search("aardvark") == []
+    assert mirror.search("badger") == ["docs/b.md"]
+
+
+def test_unreadable_changed_page_disappears(mirror: Mirror, push: Push) -> None:
+    push({"docs/a.md": _page("A", "aardvark"), "docs/b.md": _page("B", "badger")})
+    mirror.sync()
+    mirror.index()
+
+    push({"docs/a.md": _page("A", "anteater")})
+    mirror.sync()
+    page = mirror.tree / "docs/a.md"
+    page.unlink()
+    page.symlink_to("b.md")
+    stats = mirror.index()
+    assert (stats.documents, stats.deleted) == (0, 1)
+    assert mirror.search("aardvark") == []
+    assert mirror.search("anteater") == []
+    assert mirror.search("badger") == ["docs/b.md"]
+
+
+def test_tiered_merge_drops_dead_sections(mirror: Mirror, push: Push) -> None:
+    words = ["aardvark", "badger", "camel", "dingo", "eland", "ferret", "gecko", "heron"]
+    push({f"docs/{w}.md": _page(w, w) for w in words})
+    mirror.sync()
+    mirror.index()
+    # Three more one-page segments: with the first, a full tier of MERGE_FACTOR.
+    for word in words[:3]:
+        push({f"docs/{word}.md": _page(word, f"{word} zebra")})
+        mirror.sync()
+        mirror.index()
+    state = IndexState.load(mirror.index_dir)
+    assert state is not None and len(state.segments) == 4
+    assert len(state.tombstones[state.segments[0]]) == 3
+
+    assert merge_segments(mirror.index_dir) == 1
+    state = IndexState.load(mirror.index_dir)
+    assert state is not None
+    assert len(state.segments) == 1 and not state.tombstones
+    [segment] = state.segments
+    rows = json.loads((mirror.index_dir / segment / "sections.json").read_text())
+    assert len(rows) == 2 * len(words)  # two sections per page, none of them stale
+    assert [p.name for p in mirror.index_dir.glob("seg-*")] == [segment]
+    assert mirror.search("zebra") == [f"docs/{w}.md" for w in words[:3]]
+    assert mirror.search("dingo") == ["docs/dingo.md"]
@@ -0,0 +1,34 @@
+"""llms.txt keeps the navigation's order and sectioning."""
+
+from __future__ import annotations
+
+from docsync.llmstxt import _entries, mkdocs_entries, parse_mkdocs, render_index
+
+MKDOCS = """\
+site_name: Demo
+nav:
+  - Home: index.md
+  - Features: features.md
+  - Tutorial:
+    - tutorial/index.md
+    - First steps: tutorial/first.md
+  - Release notes: release.md
+  - Reference:
+    - reference/api.md
+"""
+
+
+def test_index_follows_the_nav() -> None:
+    paths = [
+        "index.md", "features.md", "tutorial/index.md", "tutorial/first.md", "release.md",
+        "reference/api.md",
+    ]
+    pages = {f"docs/{p}": f"# {p}\n\nAbout {p}.\n" for p in paths}
+    _, nav = parse_mkdocs(MKDOCS)
+    entries = _entries(mkdocs_entries(nav, "docs"), pages)
+    text = render_index("Demo", "", entries, pages, 10_000)
+    headings = [line for line in text.splitlines() if line.startswith("## ")]
+    assert headings == ["## Home", "## Tutorial", "## Release notes", "## Reference"]
+    lines = text.splitlines()
+    links = [line.split("](")[1].split(")")[0] for line in lines if line.startswith("- [")]
+    assert links == [f"docs/{p}" for p in paths]
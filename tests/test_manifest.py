@@ -0,0 +1,52 @@
+"""A published tree is only current for the same commit, patterns and hooks."""
+
+from __future__ import annotations
+
+import pytest
+
+from docsync.config import HookSpec, Project
+from docsync.hooks import HOOK_VERSIONS
+from docsync.manifest import Manifest, hooks_fingerprint
+from docsync.sparse import SparseSpec
+
+COMMIT = "0" * 40
+
+
+def _project(**options: object) -> Project:
+    return Project(
+        name="demo",
+        repo="https://example.invalid/demo.git",
+        branch="main",
+        dest="demo",
+        sparse=SparseSpec(include=("docs/",)),
+        hooks=(HookSpec("llms-txt", dict(options)),),
+    )
+
+
+def _manifest(project: Project) -> Manifest:
+    return Manifest(
+        repo=project.repo,
+        branch=project.branch,
+        commit=COMMIT,
+        patterns=list(project.patterns),
+        synced_at="2026-01-01T00:00:00Z",
+        hooks=hooks_fingerprint(project),
+    )
+
+
+def test_unchanged_project_is_current() -> None:
+    project = _project()
+    assert _manifest(project).is_current(project, COMMIT)
+    assert not _manifest(project).is_current(project, "1" * 40)
+
+
+def test_hook_options_change_the_fingerprint() -> None:
+    manifest = _manifest(_project())
+    assert not manifest.is_current(_project(budget=1000), COMMIT)
+
+
+def test_hook_version_bump_makes_the_manifest_stale(monkeypatch: pytest.MonkeyPatch) -> None:
+    project = _project()
+    manifest = _manifest(project)
+    monkeypatch.setitem(HOOK_VERSIONS, "llms-txt", HOOK_VERSIONS["llms-txt"] + 1)
+    assert not manifest.is_current(project, COMMIT)
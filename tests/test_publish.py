@@ -0,0 +1,97 @@
+"""Staged trees are swapped in atomically, kept for rollback, or discarded."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+from docsync import engine, publish
+from docsync.config import Project, SyncSettings
+from docsync.sparse import SparseSpec
+
+
+@pytest.fixture(params=["renameat2", "rename"])
+def live(request: pytest.FixtureRequest, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A published tree; also run with the two-rename fallback of :func:`exchange`."""
+    if request.param == "rename":
+        monkeypatch.setattr(publish, "_renameat2", None)
+    tree = tmp_path / "demo"
+    (tree / "docs").mkdir(parents=True)
+    (tree / "docs/a.md").write_text("old a\n")
+    (tree / "docs/b.md").write_text("b\n")
+    return tree
+
+
+def _files(tree: Path) -> dict[str, str]:
+    return {
+        p.relative_to(tree).as_posix(): p.read_text() for p in tree.rglob("*") if p.is_file()
+    }
+
+
+def test_publish_swaps_in_the_staged_tree_and_keeps_the_old_one(live: Path) -> None:
+    staged = publish.stage(live)
+    assert staged == publish.staging_path(live)
+    assert os.stat(staged / "docs/b.md").st_ino == os.stat(live / "docs/b.md").st_ino
+    (staged / "docs/a.md").unlink()  # replaced, not written through the hardlink
+    (staged / "docs/a.md").write_text("new a\n")
+    (staged / "docs/c.md").write_text("c\n")
+
+    publish.publish(live)
+    assert _files(live) == {"docs/a.md": "new a\n", "docs/b.md": "b\n", "docs/c.md": "c\n"}
+    assert _files(publish.previous_path(live)) == {"docs/a.md": "old a\n", "docs/b.md": "b\n"}
+    assert not staged.exists()
+
+
+def test_rollback_restores_the_previous_tree(live: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        publish.rollback(live)
+    staged = publish.stage(live)
+    (staged / "docs/b.md").unlink()
+    publish.publish(live)
+    assert _files(live) == {"docs/a.md": "old a\n"}
+
+    publish.rollback(live)
+    assert _files(live) == {"docs/a.md": "old a\n", "docs/b.md": "b\n"}
+    assert _files(publish.previous_path(live)) == {"docs/a.md": "old a\n"}
+
+
+def test_first_publish_has_no_previous_tree(tmp_path: Path) -> None:
+    live = tmp_path / "demo"
+    (publish.stage(live) / "index.md").write_text("hello\n")
+    publish.publish(live)
+    assert _files(live) == {"index.md": "hello\n"}
+    assert not publish.previous_path(live).exists()
+
+
+def test_failure_before_publish_leaves_the_live_tree_alone(
+    bare_repo: Path,
+    tmp_path: Path,
+    push: Callable[[dict[str, str | None]], None],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    project = Project(
+        name="demo",
+        repo=(bare_repo / "up.git").as_uri(),
+        branch="main",
+        dest="demo",
+        sparse=SparseSpec(include=("docs/",)),
+    )
+    root = tmp_path / "root"
+    live = root / "demo"
+    push({"docs/a.md": "# Old\n"})
+    assert engine.sync_project(project, root, SyncSettings(jobs=1)).ok
+    before = _files(live)
+
+    def broken(*args: object, **kwargs: object) -> None:
+        raise RuntimeError("disk full")
+
+    push({"docs/a.md": "# New\n", "docs/b.md": "# B\n"})
+    monkeypatch.setattr(engine, "write_manifest", broken)
+    result = engine.sync_project(project, root, SyncSettings(jobs=1))
+    assert not result.ok and result.error == "disk full"
+    assert _files(live) == before
+    assert not publish.staging_path(live).exists()
+    assert not publish.previous_path(live).exists()
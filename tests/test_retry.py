@@ -0,0 +1,98 @@
+"""Retry and timeout behaviour against the fault-injecting git HTTP server."""
+
+from __future__ import annotations
+
+import http.client
+import random
+import time
+from pathlib import Path
+
+import pytest
+
+from docsync.faultserver import Faults, GitFaultServer
+from docsync.git import GitError, git, timeout
+from docsync.retry import RetryPolicy, retry
+
+
+def _ls_remote(url: str) -> str:
+    return git("ls-remote", url, "refs/heads/main")
+
+
+def test_transient_failures_are_retried(bare_repo: Path) -> None:
+    faults = Faults(fail_first=2)
+    sleeps: list[float] = []
+    retries: list[int] = []
+    policy = RetryPolicy(attempts=4, base_delay=0.5, max_delay=1.0)
+    with GitFaultServer(bare_repo, {"up.git": faults}) as server:
+        out = retry(
+            lambda: _ls_remote(server.url("up.git")), policy, "ls-remote",
+            on_retry=lambda attempt, exc: retries.append(attempt), sleep=sleeps.append,
+        )
+    assert "refs/heads/main" in out
+    assert retries == [1, 2]
+    assert faults.failures == 2
+    assert len(sleeps) == 2
+    assert all(0 <= s <= min(1.0, 0.5 * 2**i) for i, s in enumerate(sleeps))
+
+
+def test_attempts_are_bounded(bare_repo: Path) -> None:
+    faults = Faults(fail_first=100)
+    sleeps: list[float] = []
+    with GitFaultServer(bare_repo, {"up.git": faults}) as server:
+        with pytest.raises(GitError):
+            retry(
+                lambda: _ls_remote(server.url("up.git")), RetryPolicy(attempts=3),
+                "ls-remote", sleep=sleeps.append,
+            )
+    assert faults.failures == 3
+    assert len(sleeps) == 2
+
+
+def test_permanent_failures_are_not_retried(bare_repo: Path) -> None:
+    retries: list[int] = []
+    with GitFaultServer(bare_repo) as server:
+        with pytest.raises(GitError):
+            retry(
+                lambda: _ls_remote(server.url("missing.git")), RetryPolicy(attempts=4),
+                "ls-remote", on_retry=lambda attempt, exc: retries.append(attempt),
+                sleep=lambda s: None,
+            )
+    assert retries == []
+
+
+@pytest.mark.parametrize("attempt", range(1, 9))
+def test_backoff_stays_within_the_capped_window(attempt: int) -> None:
+    policy = RetryPolicy(base_delay=2.0, max_delay=60.0)
+    cap = min(60.0, 2.0 * 2 ** (attempt - 1))
+    rng = random.Random(attempt)
+    delays = [policy.delay(attempt, rng) for _ in range(500)]
+    assert all(0 <= d <= cap for d in delays)
+    assert max(delays) > cap / 2  # full jitter spans the window
+
+
+def test_timeout_kills_a_hung_git(bare_repo: Path) -> None:
+    with GitFaultServer(bare_repo, {"up.git": Faults(latency=30)}) as server:
+        start = time.monotonic()
+        with timeout(0.5), pytest.raises(GitError) as raised:
+            _ls_remote(server.url("up.git"))
+        elapsed = time.monotonic() - start
+    assert raised.value.timed_out
+    assert elapsed < 5
+
+
+def test_injected_failure_keeps_the_connection_usable(bare_repo: Path) -> None:
+    with GitFaultServer(bare_repo, {"up.git": Faults(fail_first=1)}) as server:
+        conn = http.client.HTTPConnection(*server.server_address)
+        conn.request(
+            "POST", "/up.git/git-upload-pack", body=b"0000" * 1000,
+            headers={"Content-Type": "application/x-git-upload-pack-request"},
+        )
+        first = conn.getresponse()
+        first.read()
+        conn.request("GET", "/up.git/info/refs?service=git-upload-pack")
+        second = conn.getresponse()
+        body = second.read()
+        conn.close()
+    assert first.status == 503
+    assert second.status == 200
+    assert b"refs/heads/main" in body